@@ -1,17 +1,20 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 import uvicorn
 from typing import Dict, Any
+import time
 import database  # Para crear las tablas
+import metrics
 
 
 # Importar el gestor de módulos
 from modules.module_manager import ModuleManager
 from modules.example_module import ExampleModule
 from modules.job_scheduler_module import JobSchedulerModule
+from modules.scheduler import is_worker_process
 
 
 
@@ -21,6 +24,31 @@ app = FastAPI(title="Dashboard Modular")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Métricas HTTP y del pool de conexiones (expuestas en /metrics)
+metrics.instrument_engine(database.engine)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP", ["method", "route"]
+)
+http_requests_total = metrics.counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ["method", "route", "status"]
+)
+
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Mide la latencia de cada petición agrupando por plantilla de ruta (no por URL)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        http_request_duration.observe(time.perf_counter() - started, method=request.method, route=route_path)
+        http_requests_total.inc(method=request.method, route=route_path, status=status)
+
 # Inicializar el gestor de módulos
 module_manager = ModuleManager(app)
 
@@ -39,8 +67,11 @@ example_module = ExampleModule()
 module_manager.register_module(example_module)
 
 
-job_scheduler = JobSchedulerModule()
-module_manager.register_module(job_scheduler)
+# Los workers de jobs con execution_mode = "process" vuelven a importar este
+# fichero como __mp_main__: en ellos no se monta el scheduler
+if not is_worker_process():
+    job_scheduler = JobSchedulerModule()
+    module_manager.register_module(job_scheduler)
 
 
 
@@ -70,6 +101,11 @@ async def add_module(module: DashboardModule):
             status_code=400
         )
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Métricas de la aplicación y del scheduler en formato de texto de Prometheus"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     print("🚀 Dashboard Modular iniciado")
     print("📍 Abre http://localhost:8000 en tu navegador")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de la caché de expresiones cron del scheduler
+Uso: python benchmarks/cron_cache.py [num_schedules]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from croniter import croniter
+from modules.scheduler.schedules import CronSchedule, calculate_next_run, get_cron_schedule
+
+EXPRESSIONS = [
+    "* * * * *", "*/5 * * * *", "*/15 * * * *", "0 * * * *", "30 * * * *",
+    "0 */2 * * *", "0 0 * * *", "0 6 * * *", "0 9 * * 1-5", "15 3 * * 0",
+    "0 0 1 * *", "45 23 * * 6", "0 12 * * 1", "*/10 8-18 * * 1-5", "5 4 * * *"
+]
+
+
+def naive(schedules):
+    """Lo que hacía el scheduler antes: parsear y crear un croniter por fila"""
+    return [croniter(expr, last_run).get_next(datetime) for expr, last_run in schedules]
+
+
+def cached(schedules):
+    return [calculate_next_run("cron", expr, last_run) for expr, last_run in schedules]
+
+
+def windowed(max_windows):
+    """CronSchedule por expresión con `max_windows` ventanas (1 = comportamiento anterior)"""
+    def run(schedules):
+        compiled = {}
+        result = []
+        for expr, dt in schedules:
+            schedule = compiled.get(expr)
+            if schedule is None:
+                schedule = compiled[expr] = CronSchedule(expr, max_windows=max_windows)
+            result.append(schedule.next_after(dt))
+        return result
+    return run
+
+
+def mixed_workload(count, now):
+    """
+    Consultas intercaladas en zonas alejadas (next_run atrasados, recuperaciones
+    de hace días, jobs al día) y recorridos hacia delante como el del histograma
+    intercalados con consultas en `now`
+    """
+    zones = [now - timedelta(days=30), now - timedelta(days=7), now - timedelta(hours=6), now]
+    schedules = []
+    for i in range(count // 2):
+        zone = zones[i % len(zones)]
+        schedules.append((random.choice(EXPRESSIONS), zone - timedelta(seconds=random.randint(0, 1800))))
+    
+    per_expression = max(1, count // 2 // len(EXPRESSIONS))
+    for expr in EXPRESSIONS:
+        cron = croniter(expr, now)
+        for _ in range(per_expression // 2):
+            schedules.append((expr, cron.get_next(datetime)))
+            schedules.append((expr, now))
+    return schedules
+
+
+def bench(fn, schedules, rounds=3):
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn(schedules)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    now = datetime.now().replace(microsecond=0)
+    random.seed(42)
+    schedules = [
+        (random.choice(EXPRESSIONS), now - timedelta(seconds=random.randint(0, 3600)))
+        for _ in range(count)
+    ]
+    
+    print(f"⏱️  Evaluando {count} programaciones cron ({len(EXPRESSIONS)} expresiones distintas)")
+    
+    naive_time, naive_result = bench(naive, schedules)
+    get_cron_schedule.cache_clear()
+    cold_time, _ = bench(cached, schedules, rounds=1)
+    warm_time, cached_result = bench(cached, schedules)
+    
+    if naive_result != cached_result:
+        print("❌ Los resultados no coinciden")
+        sys.exit(1)
+    
+    print(f"   croniter por fila:   {naive_time * 1000:8.1f} ms")
+    print(f"   caché (fría):        {cold_time * 1000:8.1f} ms")
+    print(f"   caché (caliente):    {warm_time * 1000:8.1f} ms")
+    print(f"✅ Mejora: x{naive_time / warm_time:.1f} con resultados idénticos")
+    
+    mixed = mixed_workload(count, now)
+    print(f"⏱️  Consultas intercaladas y recorridos: {len(mixed)} consultas")
+    
+    naive_time, naive_result = bench(naive, mixed)
+    single_time, single_result = bench(windowed(1), mixed)
+    multi_time, multi_result = bench(windowed(8), mixed)
+    
+    if not naive_result == single_result == multi_result:
+        print("❌ Los resultados no coinciden")
+        sys.exit(1)
+    
+    print(f"   croniter por fila:   {naive_time * 1000:8.1f} ms")
+    print(f"   una ventana:         {single_time * 1000:8.1f} ms")
+    print(f"   varias ventanas:     {multi_time * 1000:8.1f} ms")
+    print(f"✅ Mejora: x{naive_time / multi_time:.1f} frente a croniter, x{single_time / multi_time:.1f} frente a una ventana")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las utilidades de lectura/escritura por lotes para jobs
+(modules/jobs/job_data.py) frente al código fila a fila
+Uso: python benchmarks/job_data.py [num_filas] [batch_size]
+
+Se ejecuta sobre SQLite (fichero temporal) y sobre el MySQL de database.py
+si está accesible.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from modules.jobs.job_data import execute_batches, stream_rows
+
+TABLE = "bench_job_data"
+INSERT = f"INSERT INTO {TABLE} (id, name, amount) VALUES (:id, :name, :amount)"
+SELECT = f"SELECT id, name, amount FROM {TABLE} ORDER BY id"
+
+
+def make_rows(count):
+    return [{"id": i, "name": f"fila-{i:08d}", "amount": i * 0.5} for i in range(count)]
+
+
+def reset_table(session_factory):
+    with session_factory() as db:
+        db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        db.execute(text(f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, name VARCHAR(50), amount DOUBLE)"))
+        db.commit()
+
+
+def naive_write(db, rows, batch_size):
+    """Un INSERT (un viaje a la base de datos) por fila"""
+    for row in rows:
+        db.execute(text(INSERT), row)
+    db.commit()
+
+
+def batched_write(db, rows, batch_size):
+    execute_batches(db, INSERT, rows, batch_size=batch_size)
+    db.commit()
+
+
+def naive_read(db, batch_size):
+    """fetchall(): todo el resultado en memoria antes de procesarlo"""
+    total = 0.0
+    for row in db.execute(text(SELECT)).fetchall():
+        total += row.amount
+    return total
+
+
+def streamed_read(db, batch_size):
+    total = 0.0
+    for chunk in stream_rows(db, SELECT, chunk_size=batch_size):
+        for row in chunk:
+            total += row.amount
+    return total
+
+
+def bench_write(session_factory, fn, rows, batch_size):
+    reset_table(session_factory)
+    with session_factory() as db:
+        start = time.perf_counter()
+        fn(db, rows, batch_size)
+        elapsed = time.perf_counter() - start
+        count = db.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar()
+    return elapsed, count
+
+
+def bench_read(session_factory, fn, batch_size):
+    with session_factory() as db:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn(db, batch_size)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), result
+
+
+def run(label, engine, rows, batch_size):
+    session_factory = sessionmaker(bind=engine)
+    print(f"\n🗄️  {label}")
+
+    naive_time, naive_count = bench_write(session_factory, naive_write, rows, batch_size)
+    batched_time, batched_count = bench_write(session_factory, batched_write, rows, batch_size)
+    if naive_count != len(rows) or batched_count != len(rows):
+        print("❌ No se insertaron todas las filas")
+        sys.exit(1)
+
+    print(f"   escritura fila a fila:        {naive_time * 1000:9.1f} ms")
+    print(f"   escritura por lotes:          {batched_time * 1000:9.1f} ms   (x{naive_time / batched_time:.1f})")
+
+    naive_time, naive_peak, naive_total = bench_read(session_factory, naive_read, batch_size)
+    streamed_time, streamed_peak, streamed_total = bench_read(session_factory, streamed_read, batch_size)
+    if naive_total != streamed_total:
+        print("❌ Los resultados de lectura no coinciden")
+        sys.exit(1)
+
+    print(f"   lectura fetchall():           {naive_time * 1000:9.1f} ms   pico {naive_peak:7.1f} MB")
+    print(f"   lectura en streaming:         {streamed_time * 1000:9.1f} ms   pico {streamed_peak:7.1f} MB")
+
+    with session_factory() as db:
+        db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        db.commit()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rows = make_rows(count)
+
+    print(f"⏱️  {count} filas, lotes de {batch_size}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        run("SQLite", engine, rows, batch_size)
+        engine.dispose()
+
+    try:
+        from database import SQLALCHEMY_DATABASE_URL
+        engine = create_engine(SQLALCHEMY_DATABASE_URL)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        print(f"\n⚠️  MySQL no disponible, se omite: {e.__class__.__name__}")
+        return
+    run("MySQL", engine, rows, batch_size)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -80,6 +80,8 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from .base_job import BaseJob
+from .job_data import BatchWriter, execute_batches, stream_rows
+from ..scheduler.policies import RetryPolicy, MisfirePolicy, RateLimit, FairShare
 import os
 import time
 
@@ -88,6 +90,25 @@ class {class_name}(BaseJob):
     {job_description}
     """
     
+    # Descomentar para ejecutar en un proceso worker (jobs CPU-bound)
+    # execution_mode = "process"
+    
+    # Descomentar para reintentar tras un fallo y limitar las ejecuciones
+    # retry_policy = RetryPolicy(max_attempts=3, backoff_seconds=30)
+    # rate_limit = RateLimit(rate_per_minute=10)
+    
+    # Descomentar para reutilizar durante 5 minutos el resultado de la misma configuración
+    # cache_ttl_seconds = 300
+    
+    # Descomentar para lanzarlo cuando terminen con éxito otros jobs (pipeline)
+    # depends_on = ("otro_job",)
+    
+    # Ejecuciones perdidas tras una caída: "skip", "coalesce" (por defecto) o "backfill"
+    # misfire_policy = MisfirePolicy(mode="backfill", max_backfill_runs=24)
+    
+    # Prioridad en la cola de workers ("high", "normal", "low") y grupo de reparto
+    # fair_share = FairShare(priority="low", group="informes", weight=1)
+    
     def get_job_id(self) -> str:
         return "{job_id}"
     
@@ -126,6 +147,18 @@ class {class_name}(BaseJob):
         
         # Ejemplo de operaciones comunes:
         
+        # Muchas filas: leer en streaming y escribir por lotes en vez de fetchall() e INSERT por fila
+        # for chunk in stream_rows(db, "SELECT id, importe FROM origen", chunk_size=5000):
+        #     ...
+        # execute_batches(db, "INSERT INTO destino (id, total) VALUES (:id, :total)", filas, batch_size=1000)
+        
+        # Trabajo largo por lotes que se reanuda tras un fallo o un reinicio:
+        # checkpoint = self.checkpoint()
+        # last_id = checkpoint.get("last_id", 0)
+        # ... procesar el lote con id > last_id ...
+        # checkpoint.update(last_id=ultimo_id_del_lote)
+        # db.commit()  # guarda los datos del lote y el checkpoint juntos
+        
 
         # try:
         #     response = requests.get("https://api.example.com/data", timeout=30)
@@ -25,6 +25,22 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Engine async para jobs con `async def execute` (requiere aiomysql)
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    
+    async_engine = create_async_engine(
+        f"mysql+aiomysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}",
+        pool_pre_ping=True,
+        pool_recycle=300,
+        echo=False
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+except ImportError:
+    async_engine = None
+    AsyncSessionLocal = None
+    print("⚠️  aiomysql no instalado: los jobs async se ejecutarán sin sesión de BD")
+
 # Modelo para guardar JSON
 class JsonData(Base):
     __tablename__ = "json_data"
@@ -0,0 +1,216 @@
+"""
+Métricas en memoria con exposición en formato de texto de Prometheus.
+
+Contadores, gauges e histogramas con etiquetas; cada operación es un
+incremento bajo un lock, sin dependencias externas. Las métricas se
+declaran a nivel de módulo con counter(), gauge() e histogram() y
+GET /metrics devuelve REGISTRY.render().
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+
+from sqlalchemy import event
+
+# Buckets por defecto (segundos), los mismos que usa el cliente oficial
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Métrica con nombre, ayuda y etiquetas; cada tipo genera sus muestras"""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Líneas de muestra en formato de texto de Prometheus"""
+        pass
+
+
+class _Value(_Metric):
+    """
+    Métrica de un solo valor por combinación de etiquetas
+
+    Con `collect` el valor se calcula al exponer las métricas: la función
+    devuelve [(etiquetas, valor)] y no hay que actualizar nada en caliente.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 collect: Optional[Callable[[], List[Tuple[Dict[str, str], float]]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self._values: Dict[LabelValues, float] = {}
+
+    def _samples(self) -> List[str]:
+        if self.collect:
+            try:
+                values = [(self._key(labels), value) for labels, value in self.collect()]
+            except Exception:
+                values = []
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Counter(_Value):
+    """Valor que solo crece"""
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Value):
+    """Valor que sube y baja"""
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribución de observaciones en buckets acumulativos"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [conteo por bucket (+Inf incluido), suma, total]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(series[0]), series[1], series[2]) for key, series in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuestas en /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Registra una métrica; si ya existe una con el mismo nombre se devuelve esa"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = (), collect=None) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames, collect))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = (), collect=None) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, collect))
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (),
+              buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def instrument_engine(engine, name: str = "default"):
+    """
+    Métricas del pool de conexiones de un engine de SQLAlchemy: checkouts,
+    tiempo que se retiene cada conexión y ocupación del pool en cada scrape
+    """
+    checkouts = counter("db_pool_checkouts_total", "Conexiones sacadas del pool", ["engine"])
+    hold_seconds = histogram(
+        "db_pool_connection_hold_seconds", "Tiempo entre checkout y checkin de una conexión", ["engine"]
+    )
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_time"] = time.perf_counter()
+        checkouts.inc(engine=name)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_time", None)
+        if started is not None:
+            hold_seconds.observe(time.perf_counter() - started, engine=name)
+
+    def collect():
+        pool = engine.pool
+        stats = [({"engine": name, "state": "checked_out"}, pool.checkedout())]
+        # QueuePool expone tamaño y overflow; otros pools (SQLite, NullPool) no
+        if hasattr(pool, "size") and hasattr(pool, "overflow"):
+            stats.append(({"engine": name, "state": "size"}, pool.size()))
+            stats.append(({"engine": name, "state": "overflow"}, pool.overflow()))
+            stats.append(({"engine": name, "state": "checked_in"}, pool.checkedin()))
+        return stats
+
+    gauge("db_pool_connections", "Estado del pool de conexiones", ["engine", "state"], collect=collect)
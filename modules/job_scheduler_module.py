@@ -1,21 +1,54 @@
 # modules/job_scheduler_module.py
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from collections import Counter, defaultdict
+from dataclasses import replace
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Set, Tuple
 import json
 import asyncio
+import atexit
+import os
+import re
+import socket
 import threading
 import time
-from croniter import croniter
+import traceback
+import uuid
 from .base_module import BaseModule, ModuleConfig
-from fastapi import Depends, HTTPException, BackgroundTasks
+from .scheduler import (
+    SchedulerEngine, ScheduleEntry, JobExecutor, ExecutorFullError,
+    ProcessJobPool, AsyncJobRunner, RunHistoryWriter, EventBroadcaster, HeartbeatWriter, ShardCoordinator, JobGraph, PartitionProgress, ResourceMeter, ResultCache, TokenBucket,
+    as_datetime, calculate_next_run, config_hash, install_sql_listeners, missed_runs, predict_fire_times, shard_of, spread_offset
+)
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from database import get_db
+import metrics
 from pydantic import BaseModel
+from .jobs.base_job import CancellationToken, PartitionedJob
 
 # Importar jobs
 from .jobs.base_job import BaseJob
 from .jobs.test import TestJob
+
+# Retraso entre la hora programada de un job y el momento en que empieza a ejecutarse
+DUE_LAG_SECONDS = metrics.histogram(
+    "scheduler_due_lag_seconds", "Retraso entre next_run y el inicio real de la ejecución",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+)
+RUN_DURATION_SECONDS = metrics.histogram(
+    "job_run_duration_seconds", "Duración de las ejecuciones de jobs", ["job_id", "status"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+)
+SCHEDULER_WORKERS = metrics.gauge(
+    "scheduler_workers", "Ocupación de los ejecutores del scheduler", ["pool", "state"]
+)
+RESULT_CACHE_LOOKUPS = metrics.counter(
+    "scheduler_result_cache_lookups_total", "Consultas a la caché de resultados", ["result"]
+)
+
 class JobConfig(BaseModel):
     job_id: str
     config_json: str
@@ -27,14 +60,147 @@ class JobExecuteRequest(BaseModel):
     job_id: str
     config_json: Optional[str] = None
 
+class JobInstanceConfig(BaseModel):
+    name: str
+    config_json: str
+    schedule_type: str = "manual"
+    schedule_value: Optional[str] = None
+    is_active: bool = True
+
 class JobSchedulerModule(BaseModule):
+    # Cada cuánto se recarga desde BD la ventana de próximas ejecuciones
+    REFILL_INTERVAL_SECONDS = 60
+    # Hasta dónde mira hacia delante cada recarga
+    LOOKAHEAD_SECONDS = 120
+    # Workers concurrentes: cada uno usa una conexión, mantener <= pool_size + max_overflow de SQLAlchemy
+    MAX_WORKERS = 4
+    # Ejecuciones pendientes admitidas antes de rechazar, y espera de un job
+    # programado que vence con la cola llena antes de volver a intentarlo
+    MAX_QUEUE_SIZE = 100
+    QUEUE_FULL_RETRY_SECONDS = 2
+    # Espera máxima en cola antes de adelantar una ejecución a cualquier prioridad
+    STARVATION_SECONDS = 60
+    # Procesos worker para jobs con execution_mode = "process"; cada uno se recicla
+    # tras PROCESS_WORKER_MAX_RUNS ejecuciones o si supera PROCESS_WORKER_MAX_RSS_MB
+    MAX_PROCESS_WORKERS = 2
+    PROCESS_WORKER_MAX_RUNS = 500
+    PROCESS_WORKER_MAX_RSS_MB = 1024
+    # Particiones de PartitionedJob en ejecución a la vez (entre todos los jobs); en modo
+    # thread cada una usa una conexión, igual que los workers
+    MAX_PARTITION_WORKERS = 4
+    # Jobs async concurrentes en el event loop del scheduler
+    MAX_ASYNC_JOBS = 200
+    # Duración del lease al reclamar un job; los heartbeats lo renuevan mientras se ejecuta
+    # y, si dejan de llegar, pasado este tiempo el reaper recupera la fila
+    LEASE_SECONDS = 60
+    # Cada cuánto se renuevan los leases de las ejecuciones en curso (y el heartbeat
+    # del nodo en scheduler_nodes; un nodo sin heartbeat en LEASE_SECONDS sale del reparto)
+    HEARTBEAT_INTERVAL_SECONDS = 10
+    # Cada cuánto busca el reaper ejecuciones sin heartbeat (en la recarga que toque);
+    # antes de LEASE_SECONDS ningún lease puede haber expirado desde la última pasada
+    REAP_INTERVAL_SECONDS = 60
+    # Shards en que se reparten los jobs entre los procesos scheduler; debe ser igual
+    # en todos los nodos y cambiarlo exige recalcular scheduled_jobs.shard
+    NUM_SHARDS = 256
+    # Resultados cacheados (jobs con cache_ttl_seconds) antes de expulsar los más antiguos
+    RESULT_CACHE_MAX_ENTRIES = 256
+    # Días de historial detallado en job_runs antes de compactar en job_run_daily
+    RUN_HISTORY_RETENTION_DAYS = 30
+    # Intervalo de keepalive en el stream SSE
+    SSE_KEEPALIVE_SECONDS = 15
+    # Jobs recuperando ejecuciones perdidas (misfire "backfill") a la vez, y espera si no hay hueco
+    MAX_BACKFILL_JOBS = 2
+    BACKFILL_WAIT_SECONDS = 5
+    # Margen para que un job cancelado termine antes de abandonar su thread
+    CANCEL_GRACE_SECONDS = 10
+    CANCEL_POLL_SECONDS = 0.5
+    # Separador entre la clase y el nombre de una instancia: "informe:cliente_42"
+    INSTANCE_SEPARATOR = ":"
+    # Filas por página en los listados de jobs programados e instancias, y
+    # máximo de instancias creadas o actualizadas en una sola petición
+    MAX_PAGE_SIZE = 5000
+    # Ventana máxima del histograma de ejecuciones previstas y jobs que recorre como mucho
+    HISTOGRAM_MAX_WINDOW_MINUTES = 1440
+    HISTOGRAM_MAX_JOBS = 20000
+    INSTANCE_NAME_PATTERN = re.compile(r"^[\w.-]+$")
+    
     def __init__(self):
         super().__init__()
         self.jobs_registry: Dict[str, BaseJob] = {}
-        self.scheduler_thread = None
+        # Tokens de cancelación de las ejecuciones en curso en este proceso
+        self._active_runs: Dict[str, CancellationToken] = {}
+        self._runs_lock = threading.Lock()
+        self._abandoned_threads = 0
+        # Threads abandonados que siguen vivos, por job: mientras vivan el job conserva su lease
+        self._zombies: Dict[str, List[Future]] = {}
+        # Token buckets de los jobs con rate_limit
+        self._rate_limiters: Dict[str, TokenBucket] = {}
+        self._rate_limited = 0
+        self._queue_full_deferred = 0
+        self._reaped = 0
+        self._next_reap = 0.0
+        # Jobs ejecutando ahora una ocurrencia perdida en modo backfill
+        self._backfilling: Set[str] = set()
+        # Dependencias entre jobs; último éxito y último disparo vistos por este proceso
+        # (cubren los jobs manuales sin fila en scheduled_jobs)
+        self.dag = JobGraph({})
+        self._dag_lock = threading.Lock()
+        self._dag_succeeded: Dict[str, datetime] = {}
+        self._dag_triggered: Dict[str, datetime] = {}
+        # Identificador de este proceso como propietario de leases
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.scheduler = SchedulerEngine(
+            on_due=self._dispatch_job,
+            refill=self._refill,
+            refill_interval=self.REFILL_INTERVAL_SECONDS
+        )
+        self.executor = JobExecutor(
+            max_workers=self.MAX_WORKERS,
+            max_queue_size=self.MAX_QUEUE_SIZE,
+            starvation_seconds=self.STARVATION_SECONDS
+        )
+        self.process_pool = ProcessJobPool(
+            max_workers=self.MAX_PROCESS_WORKERS,
+            max_runs_per_worker=self.PROCESS_WORKER_MAX_RUNS,
+            max_rss_mb=self.PROCESS_WORKER_MAX_RSS_MB
+        )
+        self.async_runner = AsyncJobRunner(max_concurrency=self.MAX_ASYNC_JOBS)
+        self.partition_executor = ThreadPoolExecutor(
+            max_workers=self.MAX_PARTITION_WORKERS, thread_name_prefix="partition"
+        )
+        # Progreso de la última ejecución de cada job particionado
+        self._partition_progress: Dict[str, PartitionProgress] = {}
+        self.events = EventBroadcaster()
+        self.result_cache = ResultCache(max_entries=self.RESULT_CACHE_MAX_ENTRIES)
+        self.heartbeats = HeartbeatWriter(
+            session_factory=self._session_factory,
+            owner=self.node_id,
+            active_jobs=self._active_job_ids,
+            interval=self.HEARTBEAT_INTERVAL_SECONDS,
+            ttl=self.LEASE_SECONDS
+        )
+        self.run_history = RunHistoryWriter(
+            session_factory=self._session_factory,
+            retention_days=self.RUN_HISTORY_RETENTION_DAYS
+        )
+        self.shards = ShardCoordinator(
+            session_factory=self._session_factory,
+            node_id=self.node_id,
+            num_shards=self.NUM_SHARDS,
+            interval=self.HEARTBEAT_INTERVAL_SECONDS,
+            ttl=self.LEASE_SECONDS,
+            on_change=self._rebalance
+        )
         self.scheduler_running = False
+        install_sql_listeners()
+        # Estas métricas se leen de los get_stats() en cada scrape de /metrics
+        SCHEDULER_WORKERS.collect = self._worker_metrics
+        RESULT_CACHE_LOOKUPS.collect = self._result_cache_metrics
         self._discover_jobs()
-        self._start_scheduler()
+        # Threads, procesos worker y alta en scheduler_nodes arrancan con la aplicación,
+        # no al importar: los procesos hijos que importan app.py no deben arrancar nada
+        self.router.add_event_handler("startup", self._start_scheduler)
+        self.router.add_event_handler("shutdown", self._stop_scheduler)
     
     def get_config(self) -> ModuleConfig:
         return ModuleConfig(
@@ -62,203 +228,1236 @@ class JobSchedulerModule(BaseModule):
     
     def register_job(self, job: BaseJob):
         """Registra un job en el sistema"""
+        dependencies = {job_id: registered.depends_on for job_id, registered in self.jobs_registry.items()}
+        dependencies[job.job_id] = job.depends_on
+        try:
+            self.dag = JobGraph(dependencies)
+        except ValueError as e:
+            print(f"❌ Job {job.job_id} no registrado: {e}")
+            return
+        
         self.jobs_registry[job.job_id] = job
         print(f"✅ Job registrado: {job.name} ({job.job_id})")
     
+    def _class_id(self, job_id: str) -> str:
+        """Job registrado al que pertenece una instancia ("informe:cliente_42" -> "informe")"""
+        return job_id.split(self.INSTANCE_SEPARATOR, 1)[0]
+    
+    def _job_for(self, job_id: str) -> Optional[BaseJob]:
+        """
+        Job registrado que ejecuta una instancia
+        
+        Cada fila de scheduled_jobs es una instancia con su propia configuración y
+        programación; la instancia por defecto de un job usa su mismo job_id.
+        """
+        return self.jobs_registry.get(self._class_id(job_id))
+    
     def _start_scheduler(self):
-        """Inicia el scheduler en un thread separado"""
+        """Inicia el motor del scheduler en un thread separado (evento startup de la aplicación)"""
         if not self.scheduler_running:
             self.scheduler_running = True
-            self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
-            self.scheduler_thread.start()
+            self._backfill_shards()
+            self._backfill_next_run()
+            self.shards.start()
+            self._start_process_pool()
+            self.executor.start()
+            self.async_runner.start()
+            self.run_history.start()
+            self.heartbeats.start()
+            # Por si el proceso termina sin evento shutdown
+            atexit.register(self._stop_scheduler)
+            self.scheduler.start()
             print("🕐 Scheduler iniciado")
     
-    def _scheduler_loop(self):
-        """Loop principal del scheduler - ejecuta cada 30 segundos"""
-        while self.scheduler_running:
-            try:
-                # Usar run_in_executor para evitar bloqueos
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(self._check_and_run_jobs())
-                loop.close()
-            except Exception as e:
-                print(f"❌ Error en scheduler loop: {e}")
-            
-            # Esperar 30 segundos antes de la siguiente verificación
-            time.sleep(5)
-    
-    async def _check_and_run_jobs(self):
-        """Verifica y ejecuta jobs programados"""
+    def _stop_scheduler(self):
+        """Detiene el motor, abandona el grupo de schedulers y vuelca el historial (evento shutdown)"""
+        if not self.scheduler_running:
+            return
+        self.scheduler_running = False
+        self.scheduler.stop()
+        self.heartbeats.stop()
+        self.shards.stop()
+        self.run_history.flush()
+        self.process_pool.shutdown()
+        print("🛑 Scheduler detenido")
+    
+    def _start_process_pool(self):
+        """
+        Precarga los jobs registrados en los procesos worker; solo se arrancan
+        por adelantado si algún job usa execution_mode = "process"
+        """
+        jobs = list(self.jobs_registry.values())
+        try:
+            self.process_pool.start(
+                [(type(job).__module__, type(job).__name__) for job in jobs],
+                prestart=any(job.execution_mode == "process" for job in jobs)
+            )
+        except Exception as e:
+            print(f"❌ Error arrancando el pool de procesos: {e}")
+    
+    def _backfill_next_run(self):
+        """Calcula next_run para filas programadas que aún no lo tienen"""
         from database import SessionLocal
         db = SessionLocal()
         
         try:
-            now = datetime.now()
-            print(f"🔍 Verificando jobs programados a las {now.strftime('%H:%M:%S')}")
-            
-            # Buscar jobs que necesitan ejecutarse
-            query = text("""
-                SELECT job_id, config_json, schedule_type, schedule_value, last_run 
+            rows = db.execute(text("""
+                SELECT job_id, schedule_type, schedule_value, last_run 
                 FROM scheduled_jobs 
                 WHERE is_active = TRUE 
                 AND schedule_type != 'manual'
-                AND (last_status != 'running' OR last_status IS NULL)
-            """)
+                AND next_run IS NULL
+            """)).fetchall()
             
-            result = db.execute(query)
-            jobs_to_check = result.fetchall()
+            for job_id, schedule_type, schedule_value, last_run in rows:
+                db.execute(
+                    text("UPDATE scheduled_jobs SET next_run = :next_run WHERE job_id = :job_id"),
+                    {
+                        "next_run": calculate_next_run(
+                            schedule_type, schedule_value, as_datetime(last_run), self._schedule_offset(job_id)
+                        ),
+                        "job_id": job_id
+                    }
+                )
+            db.commit()
             
-            for job_row in jobs_to_check:
-                job_id = job_row[0]
-                config_json = job_row[1]
-                schedule_type = job_row[2]
-                schedule_value = job_row[3]
-                last_run = job_row[4]
-                
-                # Verificar si debe ejecutarse
-                should_run = self._should_job_run(schedule_type, schedule_value, last_run, now)
-                
-                if should_run and job_id in self.jobs_registry:
-                    print(f"🚀 Ejecutando job programado: {job_id}")
-                    # Ejecutar en un thread separado para no bloquear
-                    threading.Thread(
-                        target=self._execute_job_sync,
-                        args=(job_id, config_json),
-                        daemon=True
-                    ).start()
-        
+            if rows:
+                print(f"📅 next_run calculado para {len(rows)} jobs programados")
         except Exception as e:
-            print(f"❌ Error verificando jobs: {e}")
+            print(f"❌ Error calculando next_run: {e}")
         finally:
             db.close()
     
-    def _should_job_run(self, schedule_type: str, schedule_value: str, last_run: datetime, now: datetime) -> bool:
-        """Determina si un job debe ejecutarse basado en su programación"""
-        if not last_run:
-            # Si nunca se ha ejecutado, ejecutar ahora
-            return True
+    def _backfill_shards(self):
+        """Asigna su shard a las filas creadas antes del reparto entre schedulers"""
+        db = self._session_factory()
+        try:
+            rows = db.execute(text("SELECT job_id FROM scheduled_jobs WHERE shard IS NULL")).fetchall()
+            if rows:
+                db.execute(
+                    text("UPDATE scheduled_jobs SET shard = :shard WHERE job_id = :job_id"),
+                    [{"shard": shard_of(row[0], self.NUM_SHARDS), "job_id": row[0]} for row in rows]
+                )
+                db.commit()
+                print(f"🧩 Shard asignado a {len(rows)} jobs programados")
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error asignando shards: {e}")
+        finally:
+            db.close()
+    
+    def _rebalance(self, owned: Set[int]):
+        """Suelta del motor los jobs de shards que ya no son de este nodo y recarga los nuevos"""
+        dropped = self.scheduler.retain(self.shards.owns)
+        if dropped:
+            print(f"🧩 Rebalanceo: {dropped} jobs pasan a otro scheduler")
+        self.scheduler.request_refill()
+    
+    def _refill(self):
+        """Recarga periódica del motor: recupera ejecuciones huérfanas y carga las próximas"""
+        if time.monotonic() >= self._next_reap:
+            self._next_reap = time.monotonic() + self.REAP_INTERVAL_SECONDS
+            self._reap_stale_runs()
+        self._load_due_jobs()
+    
+    def _reap_stale_runs(self):
+        """
+        Recupera las filas en 'running' cuyo lease ha expirado
         
-        if schedule_type == "interval" and schedule_value:
-            try:
-                minutes = int(schedule_value)
-                next_run = last_run + timedelta(minutes=minutes)
-                return now >= next_run
-            except:
-                return False
+        El proceso que las ejecutaba murió o dejó de enviar heartbeats. Se marcan
+        como failed; un job programado conserva su next_run ya vencido y se vuelve
+        a ejecutar en la siguiente recarga, salvo que su retry_policy diga otra cosa.
+        Cada nodo revisa solo sus shards, por rango sobre idx_running.
+        """
+        from database import SessionLocal
+        db = SessionLocal()
+        
+        try:
+            shards = self.shards.owned_shards()
+            if shards == []:
+                return
+            now = datetime.now()
+            # Los heartbeats renuevan heartbeat_at y locked_until a la vez: sin heartbeat
+            # en LEASE_SECONDS el lease ya ha expirado
+            query = text(f"""
+                SELECT job_id, schedule_type, schedule_value, is_active, retry_attempt,
+                       next_run, locked_by, started_at, heartbeat_at
+                FROM scheduled_jobs 
+                WHERE last_status = 'running'
+                AND (heartbeat_at IS NULL OR heartbeat_at < :stale_before)
+                AND (locked_until IS NULL OR locked_until < :now)
+                {"AND shard IN :shards" if shards is not None else ""}
+            """)
+            params = {"stale_before": now - timedelta(seconds=self.LEASE_SECONDS), "now": now}
+            if shards is not None:
+                query = query.bindparams(bindparam("shards", expanding=True))
+                params["shards"] = shards
+            rows = db.execute(query, params).fetchall()
+            
+            for row in rows:
+                job_id, owner, started_at = row[0], row[6], as_datetime(row[7])
+                schedule = (*row[1:5], as_datetime(row[5]))
+                next_run, retry_attempt = schedule[4], 0
+                job = self._job_for(job_id)
+                if job and job.retry_policy:
+                    next_run, retry_attempt = self._plan_next_run(job_id, schedule, "failed", now)
                 
-        elif schedule_type == "cron" and schedule_value:
-            try:
-                # Usar last_run como base para calcular la próxima ejecución
-                cron = croniter(schedule_value, last_run)
-                next_run = cron.get_next(datetime)
-                # Si la próxima ejecución calculada desde last_run es menor o igual a ahora, ejecutar
-                return next_run <= now
-            except:
-                return False
+                last_seen = as_datetime(row[8]) or started_at
+                error = f"Ejecución interrumpida: sin heartbeat de {owner or 'un proceso anterior'}"
+                if last_seen:
+                    error += f" desde {last_seen}"
                 
-        elif schedule_type == "daily":
-            next_run = last_run + timedelta(days=1)
-            return now >= next_run
+                # Condicional: otro nodo puede estar recuperando la misma fila
+                result = db.execute(
+                    text("""
+                        UPDATE scheduled_jobs 
+                        SET last_status = 'failed',
+                            last_output = :output,
+                            next_run = :next_run,
+                            retry_attempt = :retry_attempt,
+                            locked_by = NULL,
+                            locked_until = NULL
+                        WHERE job_id = :job_id
+                        AND last_status = 'running'
+                        AND (locked_until IS NULL OR locked_until < :now)
+                    """),
+                    {
+                        "output": json.dumps({"error": error, "timestamp": now.isoformat()}),
+                        "next_run": next_run,
+                        "retry_attempt": retry_attempt,
+                        "job_id": job_id,
+                        "now": now
+                    }
+                )
+                db.commit()
+                if result.rowcount != 1:
+                    continue
+                
+                with self._runs_lock:
+                    self._reaped += 1
+                print(f"🧹 Job {job_id} recuperado: {error}")
+                self._record_run(job_id, started_at or now, now, "failed", self._attempt_of(schedule), error, node_id=owner)
+                self.events.publish("job_status", {
+                    "job_id": job_id,
+                    "last_status": "failed",
+                    "next_run": next_run.isoformat() if next_run else None
+                })
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error recuperando ejecuciones huérfanas: {e}")
+        finally:
+            db.close()
+    
+    def _load_due_jobs(self):
+        """Carga en el heap los jobs cuya próxima ejecución cae en la ventana actual"""
+        from database import SessionLocal
+        db = SessionLocal()
+        
+        try:
+            # Con varios schedulers cada uno carga solo sus shards (rango sobre
+            # idx_shard_due); si este nodo los tiene todos, rango sobre idx_due
+            shards = self.shards.owned_shards()
+            if shards == []:
+                return
+            query = text(f"""
+                SELECT job_id, config_json, schedule_type, schedule_value, next_run 
+                FROM scheduled_jobs 
+                WHERE is_active = TRUE 
+                AND next_run <= :until
+                AND (locked_until IS NULL OR locked_until < :now)
+                {"AND shard IN :shards" if shards is not None else ""}
+            """)
+            params = {"until": datetime.now() + timedelta(seconds=self.LOOKAHEAD_SECONDS), "now": datetime.now()}
+            if shards is not None:
+                query = query.bindparams(bindparam("shards", expanding=True))
+                params["shards"] = shards
+            result = db.execute(query, params)
             
-        elif schedule_type == "weekly":
-            next_run = last_run + timedelta(weeks=1)
-            return now >= next_run
+            for job_id, config_json, schedule_type, schedule_value, next_run in result.fetchall():
+                if self._job_for(job_id):
+                    self.scheduler.upsert(job_id, schedule_type, schedule_value, config_json, as_datetime(next_run))
+        finally:
+            db.close()
+    
+    def _dispatch_job(self, entry: ScheduleEntry):
+        """Callback del motor cuando un job programado vence"""
+        job = self._job_for(entry.job_id)
+        if not job:
+            self.scheduler.remove(entry.job_id)
+            return
+        
+        now = datetime.now()
+        backfill = False
+        if job.misfire_policy.is_misfire(entry.next_run, now):
+            if job.misfire_policy.mode == "skip":
+                self._skip_missed_runs(entry, now)
+                return
+            if job.misfire_policy.mode == "backfill":
+                # Limitar cuántos jobs recuperan a la vez para no saturar MySQL tras una caída
+                if not self._enter_backfill(entry.job_id):
+                    self.scheduler.defer(entry.job_id, now + timedelta(seconds=self.BACKFILL_WAIT_SECONDS))
+                    return
+                self._trim_backfill(entry, job.misfire_policy.max_backfill_runs, now)
+                backfill = True
+        
+        # Sin token disponible se aplaza en el heap hasta que lo haya
+        wait = self._rate_limit_wait(job, entry.job_id)
+        if wait > 0:
+            print(f"⏳ Job {entry.job_id} limitado por rate limit, se aplaza {wait:.1f}s")
+            self._leave_backfill(entry.job_id)
+            self.scheduler.defer(entry.job_id, now + timedelta(seconds=wait))
+            return
+        
+        if backfill:
+            print(f"⏪ Recuperando ejecución perdida de {entry.job_id} ({entry.next_run})")
+        else:
+            print(f"🚀 Ejecutando job programado: {entry.job_id}")
+        # Encolar; si la cola está llena se aplaza en el heap sin esperar a la próxima recarga
+        try:
+            self._submit_job(entry.job_id, entry.config_json, scheduled=True)
+        except ExecutorFullError:
+            self._leave_backfill(entry.job_id)
+            with self._runs_lock:
+                self._queue_full_deferred += 1
+            self.scheduler.defer(entry.job_id, now + timedelta(seconds=self.QUEUE_FULL_RETRY_SECONDS))
+        except Exception:
+            self._leave_backfill(entry.job_id)
+            raise
+    
+    def _skip_missed_runs(self, entry: ScheduleEntry, now: datetime):
+        """Descarta las ocurrencias perdidas de un job y lo reprograma en la próxima futura"""
+        next_run = calculate_next_run(
+            entry.schedule_type, entry.schedule_value, now, self._schedule_offset(entry.job_id)
+        )
+        db = self._session_factory()
+        try:
+            db.execute(
+                text("""
+                    UPDATE scheduled_jobs 
+                    SET next_run = :next_run
+                    WHERE job_id = :job_id
+                    AND next_run <= :now
+                    AND (locked_until IS NULL OR locked_until < :now)
+                """),
+                {"next_run": next_run, "job_id": entry.job_id, "now": now}
+            )
+            db.commit()
+        finally:
+            db.close()
+        
+        print(f"⏭️  Ejecuciones perdidas de {entry.job_id} descartadas, próxima: {next_run}")
+        self.events.publish("job_status", {
+            "job_id": entry.job_id,
+            "next_run": next_run.isoformat() if next_run else None
+        })
+        self.scheduler.mark_finished(entry.job_id, next_run)
+    
+    def _trim_backfill(self, entry: ScheduleEntry, limit: int, now: datetime):
+        """Descarta las ocurrencias perdidas más antiguas y deja solo las `limit` más recientes"""
+        pending = missed_runs(
+            entry.schedule_type, entry.schedule_value, entry.next_run, now, limit,
+            self._schedule_offset(entry.job_id)
+        )
+        if not pending or pending[0] <= entry.next_run:
+            return
+        
+        db = self._session_factory()
+        try:
+            db.execute(
+                text("""
+                    UPDATE scheduled_jobs 
+                    SET next_run = :next_run
+                    WHERE job_id = :job_id
+                    AND next_run < :next_run
+                    AND (locked_until IS NULL OR locked_until < :now)
+                """),
+                {"next_run": pending[0], "job_id": entry.job_id, "now": now}
+            )
+            db.commit()
+        finally:
+            db.close()
         
-        return False
+        print(f"⏭️  Backfill de {entry.job_id} limitado a {limit} ejecuciones, desde {pending[0]}")
+        entry.next_run = pending[0]
     
-    def _execute_job_sync(self, job_id: str, config_json: str):
+    def _enter_backfill(self, job_id: str) -> bool:
+        """Reserva un hueco de backfill para el job; False si ya hay MAX_BACKFILL_JOBS"""
+        with self._runs_lock:
+            if job_id not in self._backfilling and len(self._backfilling) >= self.MAX_BACKFILL_JOBS:
+                return False
+            self._backfilling.add(job_id)
+            return True
+    
+    def _leave_backfill(self, job_id: str):
+        with self._runs_lock:
+            self._backfilling.discard(job_id)
+    
+    def _execute_job_sync(self, job_id: str, config_json: str, scheduled: bool = False):
         """Ejecuta un job de forma síncrona"""
         from database import SessionLocal
         db = SessionLocal()
+        schedule = None
+        next_run = None
+        started_at = datetime.now()
+        token = None
         
         try:
-            job = self.jobs_registry.get(job_id)
+            job = self._job_for(job_id)
             if not job:
                 print(f"❌ Job {job_id} no encontrado en el registro")
                 return
             
             print(f"🔄 Iniciando ejecución de job: {job_id}")
-            
-            # Marcar como running
-            db.execute(
-                text("UPDATE scheduled_jobs SET last_status = 'running' WHERE job_id = :job_id"),
-                {"job_id": job_id}
-            )
-            db.commit()
+            self.scheduler.mark_running(job_id)
+            claimed, schedule = self._begin_execution(db, job_id, scheduled)
+            if not claimed:
+                return
+            started_at = datetime.now()
+            token = self._register_run(job_id)
             
             # Ejecutar job - aquí es donde se ejecuta el código específico del job
-            result = job.run(config_json or "{}", db)
+            cache_key, result = self._cached_result(job, config_json or "{}")
+            if result is None:
+                result = self._run_job(job, job_id, config_json or "{}", token)
+                self._store_result(job, cache_key, result)
+            next_run = self._save_result(db, job_id, schedule, result, started_at)
             
-            print(f"📊 Resultado de {job_id}: {result.get('status', 'unknown')}")
+        except Exception as e:
+            next_run = self._save_failure(db, job_id, schedule, e, started_at)
+        finally:
+            self._unregister_run(job_id, token)
+            db.close()
+            # Reprogramar en el heap con el next_run persistido
+            self._reschedule(job_id, schedule, config_json, next_run)
+    
+    async def _execute_job_async(self, job_id: str, config_json: str, scheduled: bool = False):
+        """Ejecuta un job async en el event loop del scheduler"""
+        schedule = None
+        next_run = None
+        started_at = datetime.now()
+        token = None
+        
+        try:
+            job = self._job_for(job_id)
+            if not job:
+                print(f"❌ Job {job_id} no encontrado en el registro")
+                return
+            
+            print(f"🔄 Iniciando ejecución async de job: {job_id}")
+            self.scheduler.mark_running(job_id)
+            # Las escrituras de estado son cortas y síncronas: van a un thread
+            claimed, schedule = await asyncio.to_thread(self._with_session, self._begin_execution, job_id, scheduled)
+            if not claimed:
+                return
+            started_at = datetime.now()
+            token = self._register_run(job_id)
+            
+            cache_key, result = self._cached_result(job, config_json or "{}")
+            if result is None:
+                # La tarea del job se cancela por timeout o desde la API de cancelación
+                run_task = asyncio.ensure_future(self._run_job_async(job, config_json or "{}", token))
+                loop = asyncio.get_running_loop()
+                token.add_callback(lambda: loop.call_soon_threadsafe(run_task.cancel))
+                try:
+                    result = await asyncio.wait_for(run_task, job.timeout_seconds)
+                except asyncio.TimeoutError:
+                    token.cancel(f"timeout de {job.timeout_seconds}s superado")
+                    result = {"status": "failed", "error": f"Timeout: superados {job.timeout_seconds}s"}
+                except asyncio.CancelledError:
+                    if not token.cancelled:
+                        raise
+                    result = {"status": "failed", "error": f"Ejecución cancelada: {token.reason}"}
+                self._store_result(job, cache_key, result)
+            
+            next_run = await asyncio.to_thread(
+                self._with_session, self._save_result, job_id, schedule, result, started_at
+            )
             
-            # Guardar resultado
-            status = result.get("status", "failed")
-            output_summary = {
+        except Exception as e:
+            next_run = await asyncio.to_thread(
+                self._with_session, self._save_failure, job_id, schedule, e, started_at
+            )
+        finally:
+            self._unregister_run(job_id, token)
+            self._reschedule(job_id, schedule, config_json, next_run)
+    
+    def _register_run(self, job_id: str) -> CancellationToken:
+        """Crea el token de cancelación de la ejecución en curso de un job"""
+        token = CancellationToken()
+        with self._runs_lock:
+            self._active_runs[job_id] = token
+        return token
+    
+    def _unregister_run(self, job_id: str, token: Optional[CancellationToken]):
+        with self._runs_lock:
+            if token is not None and self._active_runs.get(job_id) is token:
+                del self._active_runs[job_id]
+    
+    def _active_job_ids(self) -> List[str]:
+        """Jobs con una ejecución en curso o un thread abandonado vivo en este proceso (para los heartbeats)"""
+        with self._runs_lock:
+            return list(set(self._active_runs) | set(self._zombies))
+    
+    def _abandon(self, job_id: str, finished: List[Future]):
+        """
+        Registra los threads abandonados de una ejecución
+        
+        Un thread no se puede matar y sigue usando su sesión, así que el job
+        conserva el lease (los heartbeats lo renuevan) y no se vuelve a lanzar
+        hasta que terminen todos; así nunca se solapa con la siguiente ejecución.
+        """
+        with self._runs_lock:
+            self._abandoned_threads += len(finished)
+            self._zombies.setdefault(job_id, []).extend(finished)
+        for future in finished:
+            future.add_done_callback(lambda _: self._zombie_finished(job_id))
+    
+    def _has_zombies(self, job_id: str) -> bool:
+        """True si queda vivo algún thread abandonado del job"""
+        with self._runs_lock:
+            return any(not future.done() for future in self._zombies.get(job_id, []))
+    
+    def _zombie_finished(self, job_id: str):
+        """Libera el lease y reprograma el job cuando termina su último thread abandonado"""
+        with self._runs_lock:
+            if any(not future.done() for future in self._zombies.get(job_id, [])):
+                return
+            if self._zombies.pop(job_id, None) is None:
+                return
+        
+        print(f"🔓 Threads abandonados de {job_id} terminados, se libera su lease")
+        db = self._session_factory()
+        try:
+            db.execute(
+                text("""
+                    UPDATE scheduled_jobs
+                    SET locked_by = NULL,
+                        locked_until = NULL
+                    WHERE job_id = :job_id
+                    AND locked_by = :owner
+                """),
+                {"job_id": job_id, "owner": self.node_id}
+            )
+            db.commit()
+            self._upsert_from_db(db, job_id)
+        except Exception as e:
+            print(f"❌ Error liberando el lease de {job_id}: {e}")
+        finally:
+            db.close()
+    
+    def _reschedule(self, job_id: str, schedule, config_json: str, next_run: Optional[datetime]):
+        """Libera el job en el motor y lo reprograma en next_run"""
+        self._leave_backfill(job_id)
+        # Una ejecución manual puede correr en cualquier nodo, pero solo el dueño del shard la programa
+        if not self.shards.owns(job_id):
+            self.scheduler.mark_finished(job_id, None)
+            return
+        self.scheduler.mark_finished(job_id, next_run)
+        # Los jobs manuales solo están en el heap si tienen un reintento pendiente
+        if next_run is not None and schedule and schedule[0] == "manual":
+            self.scheduler.upsert(job_id, schedule[0], schedule[1], config_json, next_run)
+    
+    def _rate_limit_wait(self, job: BaseJob, job_id: str) -> float:
+        """Consume un token del rate limit de la instancia; devuelve 0 o los segundos hasta el siguiente"""
+        if not job.rate_limit:
+            return 0.0
+        with self._runs_lock:
+            bucket = self._rate_limiters.get(job_id)
+            if bucket is None:
+                bucket = self._rate_limiters[job_id] = TokenBucket(job.rate_limit)
+        acquired, wait = bucket.try_acquire()
+        if acquired:
+            return 0.0
+        with self._runs_lock:
+            self._rate_limited += 1
+        return wait
+    
+    def _cached_result(self, job: BaseJob, config_json: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Busca en caché el resultado de una ejecución con la misma configuración
+        
+        Returns:
+            (cache_key, result): cache_key es None si el job no usa caché y
+            result es None si no hay un resultado vigente
+        """
+        if not job.cache_ttl_seconds:
+            return None, None
+        cache_key = config_hash(config_json)
+        if cache_key is None:
+            return None, None
+        
+        cached = self.result_cache.get(job.job_id, cache_key)
+        if cached is None:
+            return cache_key, None
+        
+        print(f"💾 Resultado de {job.job_id} servido desde caché")
+        result = {key: value for key, value in cached.items() if key != "resources"}
+        return cache_key, {**result, "cached": True, "cached_at": cached.get("finished_at"), "duration_seconds": 0}
+    
+    def _store_result(self, job: BaseJob, cache_key: Optional[str], result: Dict[str, Any]):
+        """Guarda en caché los resultados correctos"""
+        if cache_key and result.get("status") == "success":
+            self.result_cache.put(job.job_id, cache_key, result, job.cache_ttl_seconds)
+    
+    def _session_factory(self) -> Session:
+        from database import SessionLocal
+        return SessionLocal()
+    
+    def _with_session(self, fn, *args):
+        """Ejecuta fn(db, *args) con una sesión propia"""
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    
+    def _begin_execution(self, db: Session, job_id: str, scheduled: bool = False):
+        """
+        Reclama el job con un lease y lo marca como running
+        
+        El UPDATE condicional es atómico: si varios procesos o nodos intentan
+        reclamar el mismo job solo uno obtiene rowcount = 1.
+        
+        Returns:
+            (claimed, schedule) con schedule = (schedule_type, schedule_value, is_active, retry_attempt, next_run)
+        """
+        # Cubre también los jobs manuales sin fila, que no tienen lease
+        if self._has_zombies(job_id):
+            print(f"⏭️  Job {job_id} tiene threads abandonados todavía vivos, se omite")
+            return False, None
+        
+        schedule = db.execute(
+            text("""
+                SELECT schedule_type, schedule_value, is_active, retry_attempt, next_run 
+                FROM scheduled_jobs WHERE job_id = :job_id
+            """),
+            {"job_id": job_id}
+        ).fetchone()
+        
+        # Sin fila en BD (job manual nunca guardado): no hay nada que reclamar
+        if not schedule:
+            return True, None
+        schedule = (*schedule[:4], as_datetime(schedule[4]))
+        
+        # Los heartbeats renuevan el lease mientras la ejecución siga viva
+        now = datetime.now()
+        result = db.execute(
+            text(f"""
+                UPDATE scheduled_jobs 
+                SET last_status = 'running',
+                    locked_by = :owner,
+                    locked_until = :locked_until,
+                    started_at = :now,
+                    heartbeat_at = :now
+                WHERE job_id = :job_id
+                AND (locked_until IS NULL OR locked_until < :now)
+                {"AND is_active = TRUE AND next_run <= :now" if scheduled else ""}
+            """),
+            {
+                "owner": self.node_id,
+                "locked_until": now + timedelta(seconds=self.LEASE_SECONDS),
+                "now": now,
+                "job_id": job_id
+            }
+        )
+        db.commit()
+        
+        if result.rowcount != 1:
+            print(f"⏭️  Job {job_id} ya reclamado por otro proceso, se omite")
+            return False, schedule
+        
+        if scheduled and schedule[4]:
+            DUE_LAG_SECONDS.observe(max((now - schedule[4]).total_seconds(), 0.0))
+        
+        self.events.publish("job_status", {
+            "job_id": job_id,
+            "last_status": "running",
+            "attempt": self._attempt_of(schedule)
+        })
+        return True, schedule
+    
+    def _save_result(self, db: Session, job_id: str, schedule, result: Dict[str, Any],
+                     started_at: datetime) -> Optional[datetime]:
+        """Guarda el resultado de una ejecución y devuelve la próxima"""
+        print(f"📊 Resultado de {job_id}: {result.get('status', 'unknown')}")
+        
+        # Guardar resultado
+        status = result.get("status", "failed")
+        output_summary = {
+            "status": status,
+            "timestamp": datetime.now().isoformat(),
+            "duration_seconds": result.get("duration_seconds", 0)
+        }
+        
+        # Incluir toda la salida del job
+        if "output" in result:
+            output_summary["summary"] = str(result["output"])[:500]
+        if "error" in result:
+            output_summary["error"] = result["error"]
+        
+        # Incluir otros campos del resultado
+        for key, value in result.items():
+            if key not in ["status", "started_at", "finished_at", "duration_seconds", "output", "error"]:
+                output_summary[key] = value
+        
+        # Actualizar con el resultado y la próxima ejecución
+        last_run = datetime.now()
+        next_run, retry_attempt = self._plan_next_run(job_id, schedule, status, last_run)
+        keep_lease = self._has_zombies(job_id)
+        db.execute(
+            text(f"""
+                UPDATE scheduled_jobs 
+                SET last_run = :last_run, 
+                    next_run = :next_run,
+                    last_status = :status,
+                    last_output = :output,
+                    {"" if keep_lease else "locked_by = NULL, locked_until = NULL,"}
+                    retry_attempt = :retry_attempt
+                WHERE job_id = :job_id
+            """),
+            {
+                "last_run": last_run,
+                "next_run": next_run,
+                "retry_attempt": retry_attempt,
                 "status": status,
-                "timestamp": datetime.now().isoformat(),
-                "duration_seconds": result.get("duration_seconds", 0)
+                "output": json.dumps(output_summary),
+                "job_id": job_id
             }
+        )
+        db.commit()
+        
+        self._record_run(
+            job_id, started_at, last_run, status, self._attempt_of(schedule),
+            output_summary.get("summary") or output_summary.get("error"),
+            resources=result.get("resources")
+        )
+        self.events.publish("job_status", {
+            "job_id": job_id,
+            "last_status": status,
+            "retry_attempt": retry_attempt,
+            "last_run": last_run.isoformat(),
+            "next_run": next_run.isoformat() if next_run else None
+        })
+        
+        print(f"✅ Job {job_id} completado con estado: {status}")
+        if status == "success":
+            self._trigger_downstream(db, job_id)
+        # Con threads abandonados vivos no se reprograma: lo hace _zombie_finished al liberar el lease
+        return None if keep_lease else next_run
+    
+    def _trigger_downstream(self, db: Session, job_id: str):
+        """
+        Lanza los jobs downstream de job_id cuyas dependencias ya están satisfechas
+        
+        Un downstream está listo cuando todos sus upstream terminaron con éxito
+        después de su última ejecución; las ramas independientes se encolan a la
+        vez y corren en paralelo en el executor. Las dependencias se declaran entre
+        jobs registrados, así que solo participan sus instancias por defecto.
+        """
+        if job_id not in self.dag.nodes:
+            return
+        with self._dag_lock:
+            self._dag_succeeded[job_id] = datetime.now()
+        
+        for child in self.dag.downstream(job_id):
+            parents = self.dag.upstream(child)
             
-            # Incluir toda la salida del job
-            if "output" in result:
-                output_summary["summary"] = str(result["output"])[:500]
-            if "error" in result:
-                output_summary["error"] = result["error"]
+            with self._dag_lock:
+                rows = db.execute(
+                    text("""
+                        SELECT job_id, is_active, last_status, last_run, config_json
+                        FROM scheduled_jobs
+                        WHERE job_id IN :job_ids
+                    """).bindparams(bindparam("job_ids", expanding=True)),
+                    {"job_ids": [child] + parents}
+                ).fetchall()
+                state = {r[0]: (*r[:3], as_datetime(r[3]), r[4]) for r in rows}
+                own = state.get(child)
+                if own and not own[1]:
+                    continue
+                
+                # Último arranque conocido del downstream: su último fin o el último disparo desde aquí
+                since = max(filter(None, [own[3] if own else None, self._dag_triggered.get(child)]), default=None)
+                ready = True
+                for parent in parents:
+                    row = state.get(parent)
+                    succeeded = max(filter(None, [
+                        row[3] if row and row[2] == "success" else None,
+                        self._dag_succeeded.get(parent)
+                    ]), default=None)
+                    if succeeded is None or (since is not None and succeeded <= since):
+                        ready = False
+                        break
+                if not ready:
+                    continue
+                self._dag_triggered[child] = datetime.now()
             
-            # Incluir otros campos del resultado
-            for key, value in result.items():
-                if key not in ["status", "started_at", "finished_at", "duration_seconds", "output", "error"]:
-                    output_summary[key] = value
+            # El dependiente respeta su rate limit igual que una ejecución programada
+            child_job = self._job_for(child)
+            wait = self._rate_limit_wait(child_job, child) if child_job else 0.0
+            if wait > 0:
+                print(f"⏳ Dependiente {child} limitado por rate limit, se aplaza {wait:.1f}s")
+                self._defer_downstream(db, child, datetime.now() + timedelta(seconds=wait))
+                continue
             
-            # Actualizar con el resultado
+            print(f"🔗 {job_id} completado, lanzando dependiente: {child}")
+            try:
+                self._submit_job(child, own[4] if own else "{}")
+            except ExecutorFullError as e:
+                print(f"❌ No se pudo lanzar {child}: {e}")
+                with self._runs_lock:
+                    self._queue_full_deferred += 1
+                self._defer_downstream(db, child, datetime.now() + timedelta(seconds=self.QUEUE_FULL_RETRY_SECONDS))
+    
+    def _defer_downstream(self, db: Session, job_id: str, until: datetime):
+        """
+        Aplaza el disparo de un downstream adelantando su next_run hasta `until`
+        
+        Igual que un reintento: la ejecución aplazada pasa por el heap como una
+        programada más (rate limit y claim incluidos) y después el job vuelve a
+        su schedule normal. Si ya tenía una ejecución antes de `until`, esa
+        ocurrencia cubre el disparo.
+        """
+        db.execute(
+            text("""
+                UPDATE scheduled_jobs
+                SET next_run = :until
+                WHERE job_id = :job_id
+                AND (next_run IS NULL OR next_run > :until)
+            """),
+            {"job_id": job_id, "until": until}
+        )
+        db.commit()
+        self._upsert_from_db(db, job_id)
+    
+    def _upsert_from_db(self, db: Session, job_id: str):
+        """Programa en el heap el next_run persistido de un job activo"""
+        row = db.execute(
+            text("""
+                SELECT schedule_type, schedule_value, config_json, next_run
+                FROM scheduled_jobs
+                WHERE job_id = :job_id AND is_active = TRUE
+            """),
+            {"job_id": job_id}
+        ).fetchone()
+        # Sin fila no hay nada que programar; el dueño del shard lo recoge en su próxima recarga
+        if row and row[3] and self.shards.owns(job_id):
+            self.scheduler.upsert(job_id, row[0], row[1], row[2], as_datetime(row[3]))
+    
+    def _save_failure(self, db: Session, job_id: str, schedule, e: Exception,
+                      started_at: datetime) -> Optional[datetime]:
+        """Marca una ejecución como failed y devuelve la próxima"""
+        print(f"❌ Error ejecutando job {job_id}: {e}")
+        tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+        print(tb)
+        
+        # Marcar como failed y reprogramar desde ahora (o reintentar)
+        next_run, retry_attempt = self._plan_next_run(job_id, schedule, "failed", datetime.now())
+        keep_lease = self._has_zombies(job_id)
+        try:
+            db.rollback()
             db.execute(
-                text("""
+                text(f"""
                     UPDATE scheduled_jobs 
-                    SET last_run = :last_run, 
-                        last_status = :status,
-                        last_output = :output
+                    SET last_status = 'failed',
+                        next_run = :next_run,
+                        last_output = :output,
+                        {"" if keep_lease else "locked_by = NULL, locked_until = NULL,"}
+                        retry_attempt = :retry_attempt
                     WHERE job_id = :job_id
                 """),
                 {
-                    "last_run": datetime.now(),
-                    "status": status,
-                    "output": json.dumps(output_summary),
+                    "next_run": next_run,
+                    "retry_attempt": retry_attempt,
+                    "output": json.dumps({
+                        "error": str(e), 
+                        "timestamp": datetime.now().isoformat(),
+                        "traceback": tb
+                    }),
                     "job_id": job_id
                 }
             )
             db.commit()
+        except:
+            pass
+        
+        self._record_run(job_id, started_at, datetime.now(), "failed", self._attempt_of(schedule), str(e))
+        self.events.publish("job_status", {
+            "job_id": job_id,
+            "last_status": "failed",
+            "retry_attempt": retry_attempt,
+            "next_run": next_run.isoformat() if next_run else None
+        })
+        return None if keep_lease else next_run
+    
+    def _record_run(self, job_id: str, started_at: datetime, finished_at: datetime, status: str,
+                    attempt: int, output: Optional[str], node_id: Optional[str] = None,
+                    resources: Optional[Dict[str, Any]] = None):
+        """Añade la ejecución al historial (se inserta por lotes)"""
+        resources = resources or {}
+        # Etiqueta por job registrado, no por instancia, para acotar las series
+        RUN_DURATION_SECONDS.observe(
+            (finished_at - started_at).total_seconds(), job_id=self._class_id(job_id), status=status
+        )
+        self.run_history.record({
+            "job_id": job_id,
+            "node_id": node_id or self.node_id,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "duration_seconds": (finished_at - started_at).total_seconds(),
+            "status": status,
+            "attempt": attempt,
+            "output": output[:500] if output else None,
+            "cpu_seconds": resources.get("cpu_seconds"),
+            "peak_rss_mb": resources.get("peak_rss_mb"),
+            "sql_count": resources.get("sql_count"),
+            "sql_seconds": resources.get("sql_seconds"),
+            "rows_touched": resources.get("rows_touched")
+        })
+    
+    def _worker_metrics(self) -> List[Tuple[Dict[str, str], float]]:
+        """Cola y workers ocupados de cada ejecutor, para /metrics"""
+        executor = self.executor.get_stats()
+        processes = self.process_pool.get_stats()
+        async_jobs = self.async_runner.get_stats()
+        return [
+            ({"pool": "thread", "state": "queued"}, executor["queue_depth"]),
+            ({"pool": "thread", "state": "active"}, executor["active_workers"]),
+            ({"pool": "process", "state": "busy"}, processes["busy_workers"]),
+            ({"pool": "process", "state": "idle"}, processes["idle_workers"]),
+            ({"pool": "async", "state": "queued"}, async_jobs["waiting"]),
+            ({"pool": "async", "state": "active"}, async_jobs["running"])
+        ]
+    
+    def _result_cache_metrics(self) -> List[Tuple[Dict[str, str], float]]:
+        stats = self.result_cache.get_stats()
+        return [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])]
+    
+    def _run_job(self, job: BaseJob, job_id: str, config_json: str, token: CancellationToken) -> Dict[str, Any]:
+        """Ejecuta job.run() en un thread o en el pool de procesos según su execution_mode"""
+        if isinstance(job, PartitionedJob):
+            return self._run_partitioned(job, job_id, config_json, token)
+        if job.execution_mode == "process":
+            # Timeout y cancelación matan el proceso worker
+            return self.process_pool.run(
+                type(job).__module__, type(job).__name__, config_json,
+                timeout=job.timeout_seconds, cancel_token=token, instance_id=job_id
+            )
+        return self._run_in_thread(job, config_json, token, job_id)
+    
+    def _run_in_thread(self, job: BaseJob, config_json: str, token: CancellationToken,
+                       instance_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Ejecuta job.run() en un thread vigilado por el worker
+        
+        Al vencer el timeout se cancela el token (cancelación cooperativa); si el
+        job no termina en CANCEL_GRACE_SECONDS se abandona su thread y el worker
+        queda libre; el job conserva su lease hasta que el thread termine. Un
+        thread no se puede matar: solo el modo "process" garantiza que el trabajo
+        se detiene de verdad.
+        """
+        outcome: Dict[str, Any] = {}
+        finished = Future()
+        
+        def target():
+            db = self._session_factory()
+            try:
+                with ResourceMeter().track() as meter:
+                    outcome["result"] = job.run(config_json, db, token, instance_id)
+                outcome["result"]["resources"] = meter.to_dict()
+            finally:
+                db.close()
+                finished.set_result(None)
+        
+        runner = threading.Thread(target=target, name=f"job-{job.job_id}", daemon=True)
+        runner.start()
+        deadline = time.monotonic() + job.timeout_seconds if job.timeout_seconds else None
+        
+        while True:
+            runner.join(self.CANCEL_POLL_SECONDS)
+            if not runner.is_alive():
+                return outcome.get("result") or {"status": "failed", "error": "El job terminó sin resultado"}
             
-            print(f"✅ Job {job_id} completado con estado: {status}")
+            if deadline is not None and time.monotonic() >= deadline:
+                token.cancel(f"timeout de {job.timeout_seconds}s superado")
             
+            if token.cancelled and (datetime.now() - token.cancelled_at).total_seconds() >= self.CANCEL_GRACE_SECONDS:
+                self._abandon(instance_id or job.job_id, [finished])
+                return {
+                    "status": "failed",
+                    "error": f"Ejecución abandonada: {token.reason} y sin respuesta tras {self.CANCEL_GRACE_SECONDS}s"
+                }
+    
+    def _run_partitioned(self, job: PartitionedJob, job_id: str, config_json: str,
+                         token: CancellationToken) -> Dict[str, Any]:
+        """
+        Ejecuta las particiones de un PartitionedJob en paralelo y combina sus resultados
+        
+        Se mantienen como mucho max_parallel_partitions particiones en el pool
+        compartido; al vencer el timeout o cancelar no se lanzan más, y las que
+        no respondan en CANCEL_GRACE_SECONDS se abandonan.
+        """
+        start_time = datetime.now()
+        try:
+            config = json.loads(config_json) if config_json else {}
+            invalid = job._check_config(config, start_time)
+            if invalid:
+                return invalid
+            partitions = list(job.get_partitions(config))
         except Exception as e:
-            print(f"❌ Error ejecutando job {job_id}: {e}")
-            import traceback
-            traceback.print_exc()
+            return job._failure_result(e, start_time)
+        
+        progress = PartitionProgress(job_id, len(partitions))
+        self._partition_progress[job_id] = progress
+        meter = ResourceMeter()
+        limit = max(1, job.max_parallel_partitions or self.MAX_PARTITION_WORKERS)
+        deadline = time.monotonic() + job.timeout_seconds if job.timeout_seconds else None
+        results: List[Optional[Dict[str, Any]]] = [None] * len(partitions)
+        queue = iter(enumerate(partitions))
+        pending = set()
+        
+        def fill():
+            while len(pending) < limit and not token.cancelled:
+                item = next(queue, None)
+                if item is None:
+                    return
+                pending.add(self.partition_executor.submit(
+                    self._run_partition, job, config_json, item, token, progress, meter
+                ))
+        
+        fill()
+        while pending:
+            done, pending = wait(pending, timeout=self.CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, result = future.result()
+                results[index] = result
             
-            # Marcar como failed
+            if deadline is not None and time.monotonic() >= deadline:
+                token.cancel(f"timeout de {job.timeout_seconds}s superado")
+            if token.cancelled and (datetime.now() - token.cancelled_at).total_seconds() >= self.CANCEL_GRACE_SECONDS:
+                self._abandon(job_id, list(pending))
+                break
+            fill()
+        
+        progress.close()
+        self.events.publish("job_progress", progress.summary())
+        
+        failed = [
+            {"index": i, "error": (r or {}).get("error", "sin resultado")}
+            for i, r in enumerate(results) if not r or r.get("status") != "success"
+        ]
+        if token.cancelled or failed:
+            if token.cancelled:
+                error = f"Ejecución cancelada: {token.reason}"
+            else:
+                error = f"{len(failed)} de {len(partitions)} particiones fallaron"
+            return {
+                "status": "failed",
+                "error": error,
+                "completed_partitions": len(partitions) - len(failed),
+                "failed_partitions": failed[:20],
+                "started_at": start_time.isoformat(),
+                "finished_at": datetime.now().isoformat(),
+                "duration_seconds": (datetime.now() - start_time).total_seconds(),
+                "resources": meter.to_dict()
+            }
+        
+        try:
+            with meter.track():
+                result = job._success_result(job.reduce(config, results), start_time)
+        except Exception as e:
+            result = job._failure_result(e, start_time)
+        result["resources"] = meter.to_dict()
+        return result
+    
+    def _run_partition(self, job: PartitionedJob, config_json: str, item, token: CancellationToken,
+                       progress: PartitionProgress, meter: ResourceMeter):
+        """Ejecuta una partición en un thread del pool o en un proceso worker"""
+        index, partition = item
+        progress.start(index)
+        if job.execution_mode == "process":
+            result = self.process_pool.run(
+                type(job).__module__, type(job).__name__, config_json,
+                cancel_token=token, partition=partition
+            )
+            meter.merge(result.pop("resources", None))
+        else:
+            db = self._session_factory()
             try:
-                db.execute(
-                    text("""
-                        UPDATE scheduled_jobs 
-                        SET last_status = 'failed',
-                            last_output = :output
-                        WHERE job_id = :job_id
-                    """),
-                    {
-                        "output": json.dumps({
-                            "error": str(e), 
-                            "timestamp": datetime.now().isoformat(),
-                            "traceback": traceback.format_exc()
-                        }),
-                        "job_id": job_id
-                    }
+                with meter.track():
+                    result = job.run_partition(config_json, partition, db, token)
+            finally:
+                db.close()
+        
+        progress.finish(index, result)
+        self.events.publish("job_progress", progress.summary())
+        return index, result
+    
+    async def _run_job_async(self, job: BaseJob, config_json: str, token: CancellationToken) -> Dict[str, Any]:
+        """Ejecuta job.run_async() con una sesión async si está disponible"""
+        from database import AsyncSessionLocal
+        # La CPU del event loop es compartida: solo se mide el SQL
+        with ResourceMeter().track(cpu=False) as meter:
+            if AsyncSessionLocal is None:
+                result = await job.run_async(config_json, None, token)
+            else:
+                async with AsyncSessionLocal() as db:
+                    result = await job.run_async(config_json, db, token)
+        result["resources"] = meter.to_dict()
+        return result
+    
+    def _submit_job(self, job_id: str, config_json: str, scheduled: bool = False):
+        """Envía una ejecución al event loop (jobs async) o al pool de workers"""
+        job = self._job_for(job_id)
+        if job.is_async:
+            self.async_runner.submit(self._execute_job_async, job_id, config_json, scheduled)
+        else:
+            # Sin grupo explícito, todas las instancias de un job comparten su cuota
+            share = job.fair_share if job.fair_share.group else replace(job.fair_share, group=job.job_id)
+            self.executor.submit(job_id, self._execute_job_sync, job_id, config_json, scheduled, share=share)
+    
+    def _next_run_for(self, schedule, last_run: datetime, offset_seconds: float = 0.0) -> Optional[datetime]:
+        """Próxima ejecución de una fila (schedule_type, schedule_value, is_active, ...)"""
+        if not schedule or not schedule[2]:
+            return None
+        return calculate_next_run(schedule[0], schedule[1], last_run, offset_seconds)
+    
+    def _schedule_offset(self, job_id: str) -> float:
+        """Desplazamiento fijo de la instancia dentro del schedule_spread_seconds de su job"""
+        job = self._job_for(job_id)
+        return spread_offset(job_id, job.schedule_spread_seconds) if job else 0.0
+    
+    def _next_scheduled_run(self, job: Optional[BaseJob], job_id: str, schedule, now: datetime) -> Optional[datetime]:
+        """
+        Próxima ocurrencia tras una ejecución según la misfire_policy del job
+        
+        En modo backfill se avanza desde la ocurrencia recién ejecutada (no desde
+        ahora), así que mientras queden ocurrencias perdidas el job sigue vencido.
+        """
+        offset = self._schedule_offset(job_id) if job else 0.0
+        slot = schedule[4] if schedule else None
+        if not job or job.misfire_policy.mode != "backfill" or not slot or slot > now:
+            return self._next_run_for(schedule, now, offset)
+        
+        return self._next_run_for(schedule, slot, offset)
+    
+    def _attempt_of(self, schedule) -> int:
+        """Número de intento de la ejecución en curso (1 = primera)"""
+        return (schedule[3] or 0) + 1 if schedule else 1
+    
+    def _plan_next_run(self, job_id: str, schedule, status: str, now: datetime):
+        """
+        Decide la próxima ejecución tras terminar un intento
+        
+        Si el intento falló y la retry_policy del job lo permite, se reintenta con
+        backoff exponencial (sin pasar de la siguiente ejecución programada).
+        
+        Returns:
+            (next_run, retry_attempt) con retry_attempt = intentos fallidos acumulados
+        """
+        job = self._job_for(job_id)
+        next_run = self._next_scheduled_run(job, job_id, schedule, now)
+        policy = job.retry_policy if job else None
+        attempt = self._attempt_of(schedule)
+        
+        if status != "failed" or not policy or not schedule or not schedule[2] or not policy.should_retry(attempt):
+            return next_run, 0
+        
+        retry_at = now + timedelta(seconds=policy.delay_for(attempt))
+        print(f"🔁 Reintento {attempt + 1}/{policy.max_attempts} de {job_id} a las {retry_at.strftime('%H:%M:%S')}")
+        return (min(retry_at, next_run) if next_run else retry_at), attempt
+    
+    def _check_instance_id(self, job_id: str) -> Optional[str]:
+        """Mensaje de error si job_id no es un nombre de instancia válido, None si lo es"""
+        if len(job_id) > 100:
+            return "El identificador de la instancia no puede superar 100 caracteres"
+        if self.INSTANCE_SEPARATOR in job_id:
+            name = job_id.split(self.INSTANCE_SEPARATOR, 1)[1]
+            if not self.INSTANCE_NAME_PATTERN.match(name):
+                return f"Nombre de instancia inválido: '{name}' (letras, números, '_', '.' o '-')"
+        return None
+    
+    def _save_instances(self, db: Session, job: BaseJob, instances: List[Tuple[str, JobConfig]]) -> int:
+        """
+        Crea o actualiza en bloque instancias de un job y las programa en el motor
+        
+        Una lectura para saber cuáles existen y una escritura por lotes para las
+        nuevas y otra para las existentes, sea cual sea el número de instancias.
+        La configuración ya debe estar validada.
+        """
+        existing = {
+            job_id: as_datetime(last_run)
+            for job_id, last_run in db.execute(
+                text("SELECT job_id, last_run FROM scheduled_jobs WHERE job_id IN :job_ids")
+                .bindparams(bindparam("job_ids", expanding=True)),
+                {"job_ids": [job_id for job_id, _ in instances]}
+            ).fetchall()
+        }
+        
+        now = datetime.now()
+        inserts, updates, scheduled = [], [], []
+        for job_id, config in instances:
+            # Calcular y persistir la próxima ejecución
+            next_run = None
+            if config.is_active:
+                next_run = calculate_next_run(
+                    config.schedule_type, config.schedule_value, existing.get(job_id), self._schedule_offset(job_id)
                 )
-                db.commit()
-            except:
-                pass
-        finally:
-            db.close()
+            params = {
+                "job_id": job_id,
+                "config_json": config.config_json,
+                "schedule_type": config.schedule_type,
+                "schedule_value": config.schedule_value,
+                "is_active": config.is_active,
+                "next_run": next_run
+            }
+            if job_id in existing:
+                updates.append({**params, "updated_at": now})
+            else:
+                name = job_id.split(self.INSTANCE_SEPARATOR, 1)[1] if self.INSTANCE_SEPARATOR in job_id else None
+                inserts.append({
+                    **params,
+                    "job_class": job.job_id,
+                    "shard": shard_of(job_id, self.NUM_SHARDS),
+                    "job_name": f"{job.name} ({name})" if name else job.name,
+                    "description": job.description
+                })
+            scheduled.append((job_id, config, next_run))
+        
+        if updates:
+            db.execute(
+                text("""
+                    UPDATE scheduled_jobs 
+                    SET config_json = :config_json,
+                        schedule_type = :schedule_type,
+                        schedule_value = :schedule_value,
+                        is_active = :is_active,
+                        next_run = :next_run,
+                        retry_attempt = 0,
+                        updated_at = :updated_at
+                    WHERE job_id = :job_id
+                """),
+                updates
+            )
+        if inserts:
+            db.execute(
+                text("""
+                    INSERT INTO scheduled_jobs 
+                    (job_id, job_class, shard, job_name, description, config_json, schedule_type, schedule_value, is_active, next_run)
+                    VALUES (:job_id, :job_class, :shard, :job_name, :description, :config_json, :schedule_type, :schedule_value, :is_active, :next_run)
+                """),
+                inserts
+            )
+        db.commit()
+        
+        # Despertar al motor con la nueva programación; las instancias de shards de
+        # otros nodos las cargará su dueño en su próxima recarga
+        for job_id, config, next_run in scheduled:
+            if not self.shards.owns(job_id):
+                continue
+            self.scheduler.upsert(job_id, config.schedule_type, config.schedule_value, config.config_json, next_run)
+        return len(scheduled)
     
     def setup_routes(self):
         """Configura las rutas del módulo"""
@@ -273,30 +1472,34 @@ class JobSchedulerModule(BaseModule):
         @self.router.get(f"{self.config.endpoint}/jobs/{{job_id}}")
         async def get_job_config(job_id: str, db: Session = Depends(get_db)):
             result = db.execute(
-                text("SELECT * FROM scheduled_jobs WHERE job_id = :job_id"),
+                text("""
+                    SELECT job_id, job_name, description, config_json, schedule_type, schedule_value,
+                           is_active, last_run, next_run, last_status, last_output
+                    FROM scheduled_jobs WHERE job_id = :job_id
+                """),
                 {"job_id": job_id}
             ).fetchone()
             
             if result:
                 return {
-                    "job_id": result[1],
-                    "job_name": result[2],
-                    "description": result[3],
-                    "config_json": result[4],
-                    "schedule_type": result[5],
-                    "schedule_value": result[6],
-                    "is_active": result[7],
-                    "last_run": result[8],
-                    "next_run": result[9],
-                    "last_status": result[10],
-                    "last_output": result[11]
+                    "job_id": result[0],
+                    "job_name": result[1],
+                    "description": result[2],
+                    "config_json": result[3],
+                    "schedule_type": result[4],
+                    "schedule_value": result[5],
+                    "is_active": result[6],
+                    "last_run": result[7],
+                    "next_run": result[8],
+                    "last_status": result[9],
+                    "last_output": result[10]
                 }
             
             # Si no existe, retornar configuración por defecto
-            job = self.jobs_registry.get(job_id)
+            job = self._job_for(job_id)
             if job:
                 return {
-                    "job_id": job.job_id,
+                    "job_id": job_id,
                     "job_name": job.name,
                     "description": job.description,
                     "config_json": json.dumps(job.default_config),
@@ -309,9 +1512,12 @@ class JobSchedulerModule(BaseModule):
         # Guardar configuración de un job
         @self.router.post(f"{self.config.endpoint}/jobs/{{job_id}}/config")
         async def save_job_config(job_id: str, config: JobConfig, db: Session = Depends(get_db)):
-            job = self.jobs_registry.get(job_id)
+            job = self._job_for(job_id)
             if not job:
                 raise HTTPException(status_code=404, detail="Job no encontrado")
+            invalid_id = self._check_instance_id(job_id)
+            if invalid_id:
+                raise HTTPException(status_code=400, detail=invalid_id)
             
             # Validar configuración JSON
             try:
@@ -322,65 +1528,83 @@ class JobSchedulerModule(BaseModule):
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="JSON inválido")
             
-            # Buscar si existe
-            existing = db.execute(
-                text("SELECT id FROM scheduled_jobs WHERE job_id = :job_id"),
-                {"job_id": job_id}
-            ).fetchone()
+            self._save_instances(db, job, [(job_id, config)])
+            self.events.publish("job_config", {"job_id": job_id, "action": "saved"})
             
-            if existing:
-                # Actualizar
-                db.execute(
-                    text("""
-                        UPDATE scheduled_jobs 
-                        SET config_json = :config_json,
-                            schedule_type = :schedule_type,
-                            schedule_value = :schedule_value,
-                            is_active = :is_active,
-                            updated_at = :updated_at
-                        WHERE job_id = :job_id
-                    """),
-                    {
-                        "job_id": job_id,
-                        "config_json": config.config_json,
-                        "schedule_type": config.schedule_type,
-                        "schedule_value": config.schedule_value,
-                        "is_active": config.is_active,
-                        "updated_at": datetime.now()
-                    }
-                )
-            else:
-                # Insertar nuevo
-                db.execute(
-                    text("""
-                        INSERT INTO scheduled_jobs 
-                        (job_id, job_name, description, config_json, schedule_type, schedule_value, is_active)
-                        VALUES (:job_id, :job_name, :description, :config_json, :schedule_type, :schedule_value, :is_active)
-                    """),
+            return {"status": "success", "message": "Configuración guardada"}
+        
+        # Instancias de un job (paginadas por job_id)
+        @self.router.get(f"{self.config.endpoint}/jobs/{{job_id}}/instances")
+        async def list_job_instances(job_id: str, after: str = "", limit: int = 500, db: Session = Depends(get_db)):
+            if job_id not in self.jobs_registry:
+                raise HTTPException(status_code=404, detail="Job no encontrado")
+            
+            limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+            # Rango sobre idx_class (job_class, job_id): coste por página, no por total
+            results = db.execute(
+                text("""
+                    SELECT job_id, schedule_type, schedule_value, is_active, last_run, next_run, last_status
+                    FROM scheduled_jobs
+                    WHERE job_class = :job_class
+                    AND job_id > :after
+                    ORDER BY job_id
+                    LIMIT :limit
+                """),
+                {"job_class": job_id, "after": after, "limit": limit}
+            ).fetchall()
+            
+            return {
+                "instances": [
                     {
-                        "job_id": job_id,
-                        "job_name": job.name,
-                        "description": job.description,
-                        "config_json": config.config_json,
-                        "schedule_type": config.schedule_type,
-                        "schedule_value": config.schedule_value,
-                        "is_active": config.is_active
+                        "job_id": r[0],
+                        "schedule_type": r[1],
+                        "schedule_value": r[2],
+                        "is_active": r[3],
+                        "last_run": r[4],
+                        "next_run": r[5] if r[3] else None,
+                        "last_status": r[6]
                     }
-                )
+                    for r in results
+                ],
+                # Valor de `after` para pedir la página siguiente
+                "next_after": results[-1][0] if len(results) == limit else None
+            }
+        
+        # Crear o actualizar instancias de un job en bloque
+        @self.router.post(f"{self.config.endpoint}/jobs/{{job_id}}/instances")
+        async def save_job_instances(job_id: str, instances: List[JobInstanceConfig], db: Session = Depends(get_db)):
+            job = self.jobs_registry.get(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail="Job no encontrado")
+            if len(instances) > self.MAX_PAGE_SIZE:
+                raise HTTPException(status_code=400, detail=f"Máximo {self.MAX_PAGE_SIZE} instancias por petición")
             
-            db.commit()
+            pending = []
+            for instance in instances:
+                instance_id = f"{job_id}{self.INSTANCE_SEPARATOR}{instance.name}"
+                invalid = self._check_instance_id(instance_id)
+                if not invalid:
+                    try:
+                        is_valid, error = job.validate_config(json.loads(instance.config_json))
+                        invalid = None if is_valid else error
+                    except json.JSONDecodeError:
+                        invalid = "JSON inválido"
+                if invalid:
+                    raise HTTPException(status_code=400, detail=f"{instance.name}: {invalid}")
+                pending.append((instance_id, JobConfig(job_id=instance_id, **instance.dict(exclude={"name"}))))
             
-            return {"status": "success", "message": "Configuración guardada"}
+            saved = self._save_instances(db, job, pending)
+            self.events.publish("job_config", {"job_id": job_id, "action": "instances_saved", "count": saved})
+            return {"status": "success", "message": f"{saved} instancias guardadas"}
         
         # Ejecutar job manualmente
         @self.router.post(f"{self.config.endpoint}/jobs/{{job_id}}/execute")
         async def execute_job(
             job_id: str, 
             request: JobExecuteRequest,
-            background_tasks: BackgroundTasks,
             db: Session = Depends(get_db)
         ):
-            job = self.jobs_registry.get(job_id)
+            job = self._job_for(job_id)
             if not job:
                 raise HTTPException(status_code=404, detail="Job no encontrado")
             
@@ -393,11 +1617,139 @@ class JobSchedulerModule(BaseModule):
                 ).fetchone()
                 config_json = result[0] if result else "{}"
             
-            # Ejecutar en background
-            background_tasks.add_task(self._execute_job_sync, job_id, config_json)
+            wait = self._rate_limit_wait(job, job_id)
+            if wait > 0:
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Límite de ejecuciones de {job_id} alcanzado, reintentar en {wait:.0f}s",
+                    headers={"Retry-After": str(int(wait) + 1)}
+                )
+            
+            # Encolar en el pool compartido de workers
+            try:
+                self._submit_job(job_id, config_json)
+            except ExecutorFullError as e:
+                raise HTTPException(status_code=503, detail=str(e))
             
             return {"status": "started", "message": f"Job {job_id} iniciado"}
         
+        # Stream SSE con los cambios de estado de los jobs ejecutados en este
+        # proceso (ver EventBroadcaster: los de otros procesos no llegan por aquí)
+        @self.router.get(f"{self.config.endpoint}/events")
+        async def stream_events(request: Request):
+            queue = self.events.subscribe()
+            
+            async def event_stream():
+                try:
+                    yield "retry: 5000\n\n"
+                    while not await request.is_disconnected():
+                        try:
+                            event = await asyncio.wait_for(queue.get(), timeout=self.SSE_KEEPALIVE_SECONDS)
+                            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+                        except asyncio.TimeoutError:
+                            # Comentario SSE para mantener viva la conexión
+                            yield ": keepalive\n\n"
+                finally:
+                    self.events.unsubscribe(queue)
+            
+            return StreamingResponse(
+                event_stream(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
+        # Historial de ejecuciones de un job
+        @self.router.get(f"{self.config.endpoint}/jobs/{{job_id}}/runs")
+        async def get_job_runs(job_id: str, limit: int = 50, db: Session = Depends(get_db)):
+            results = db.execute(
+                text("""
+                    SELECT id, node_id, started_at, finished_at, duration_seconds, status, attempt, output,
+                           cpu_seconds, peak_rss_mb, sql_count, sql_seconds, rows_touched
+                    FROM job_runs
+                    WHERE job_id = :job_id
+                    ORDER BY started_at DESC
+                    LIMIT :limit
+                """),
+                {"job_id": job_id, "limit": min(limit, 500)}
+            ).fetchall()
+            
+            return [
+                {
+                    "id": r[0],
+                    "node_id": r[1],
+                    "started_at": r[2],
+                    "finished_at": r[3],
+                    "duration_seconds": r[4],
+                    "status": r[5],
+                    "attempt": r[6],
+                    "output": r[7],
+                    "cpu_seconds": r[8],
+                    "peak_rss_mb": r[9],
+                    "sql_count": r[10],
+                    "sql_seconds": r[11],
+                    "rows_touched": r[12]
+                }
+                for r in results
+            ]
+        
+        # Progreso por partición de la última ejecución de un job particionado
+        @self.router.get(f"{self.config.endpoint}/jobs/{{job_id}}/partitions")
+        async def get_job_partitions(job_id: str):
+            progress = self._partition_progress.get(job_id)
+            if not progress:
+                raise HTTPException(status_code=404, detail="Sin ejecuciones particionadas de este job en este proceso")
+            return progress.to_dict()
+        
+        # Checkpoint pendiente de una instancia (ejecución interrumpida o fallida)
+        @self.router.get(f"{self.config.endpoint}/jobs/{{job_id}}/checkpoint")
+        async def get_job_checkpoint(job_id: str, db: Session = Depends(get_db)):
+            row = db.execute(
+                text("""
+                    SELECT config_hash, state_json, created_at, updated_at
+                    FROM job_checkpoints WHERE job_id = :job_id
+                """),
+                {"job_id": job_id}
+            ).fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="El job no tiene checkpoint pendiente")
+            return {
+                "job_id": job_id,
+                "config_hash": row[0],
+                "state": json.loads(row[1]) if row[1] else {},
+                "created_at": row[2],
+                "updated_at": row[3]
+            }
+        
+        # Descartar el checkpoint: la próxima ejecución empieza de cero
+        @self.router.delete(f"{self.config.endpoint}/jobs/{{job_id}}/checkpoint")
+        async def clear_job_checkpoint(job_id: str, db: Session = Depends(get_db)):
+            result = db.execute(
+                text("DELETE FROM job_checkpoints WHERE job_id = :job_id"),
+                {"job_id": job_id}
+            )
+            db.commit()
+            if result.rowcount > 0:
+                return {"status": "success", "message": f"Checkpoint de {job_id} eliminado"}
+            return {"status": "not_found", "message": f"{job_id} no tiene checkpoint pendiente"}
+        
+        # Vaciar los resultados cacheados de un job
+        @self.router.delete(f"{self.config.endpoint}/jobs/{{job_id}}/cache")
+        async def clear_job_cache(job_id: str):
+            # La caché es del job registrado: las instancias con la misma configuración la comparten
+            removed = self.result_cache.invalidate(self._class_id(job_id))
+            return {"status": "success", "message": f"{removed} resultados eliminados de la caché"}
+        
+        # Cancelar la ejecución en curso de un job
+        @self.router.post(f"{self.config.endpoint}/jobs/{{job_id}}/cancel")
+        async def cancel_job(job_id: str):
+            with self._runs_lock:
+                token = self._active_runs.get(job_id)
+            if not token:
+                raise HTTPException(status_code=404, detail="El job no se está ejecutando en este proceso")
+            
+            token.cancel("cancelado por el usuario")
+            return {"status": "cancelling", "message": f"Cancelación de {job_id} solicitada"}
+        
         # Eliminar job de la base de datos
         @self.router.delete(f"{self.config.endpoint}/jobs/{{job_id}}")
         async def delete_job(job_id: str, db: Session = Depends(get_db)):
@@ -405,7 +1757,15 @@ class JobSchedulerModule(BaseModule):
                 text("DELETE FROM scheduled_jobs WHERE job_id = :job_id"),
                 {"job_id": job_id}
             )
+            db.execute(
+                text("DELETE FROM job_checkpoints WHERE job_id = :job_id"),
+                {"job_id": job_id}
+            )
             db.commit()
+            self.scheduler.remove(job_id)
+            with self._runs_lock:
+                self._rate_limiters.pop(job_id, None)
+            self.events.publish("job_config", {"job_id": job_id, "action": "deleted"})
             
             if result.rowcount > 0:
                 return {"status": "success", "message": f"Job {job_id} eliminado de la base de datos"}
@@ -414,63 +1774,141 @@ class JobSchedulerModule(BaseModule):
         
         # Obtener jobs programados activos
         @self.router.get(f"{self.config.endpoint}/scheduled")
-        async def get_scheduled_jobs(db: Session = Depends(get_db)):
+        async def get_scheduled_jobs(after: str = "", limit: int = 500, db: Session = Depends(get_db)):
+            limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+            # Paginado por job_id sobre su índice único, como /jobs/{job_id}/instances:
+            # cada página es un rango del índice, sin ordenar toda la tabla
             results = db.execute(
                 text("""
                     SELECT job_id, job_name, schedule_type, schedule_value, 
                            is_active, last_run, next_run, last_status
                     FROM scheduled_jobs
-                    ORDER BY 
-                        CASE WHEN is_active = TRUE THEN 0 ELSE 1 END,
-                        last_run DESC
-                """)
+                    WHERE job_id > :after
+                    ORDER BY job_id
+                    LIMIT :limit
+                """),
+                {"after": after, "limit": limit}
             ).fetchall()
             
-            scheduled_jobs = []
-            for r in results:
-                job_data = {
-                    "job_id": r[0],
-                    "job_name": r[1],
-                    "schedule_type": r[2],
-                    "schedule_value": r[3],
-                    "is_active": r[4],
-                    "last_run": r[5],
-                    "last_status": r[7]
-                }
-                
-                # Calcular próxima ejecución basada en la última
-                if r[4] and r[2] != 'manual' and r[5]:  # is_active y no manual y tiene last_run
-                    next_run = self._calculate_next_run(r[2], r[3], r[5])
-                    job_data["next_run"] = next_run
-                else:
-                    job_data["next_run"] = None
-                
-                scheduled_jobs.append(job_data)
+            # next_run se lee tal cual lo persiste el scheduler
+            return {
+                "jobs": [
+                    {
+                        "job_id": r[0],
+                        "job_name": r[1],
+                        "schedule_type": r[2],
+                        "schedule_value": r[3],
+                        "is_active": r[4],
+                        "last_run": r[5],
+                        # Los jobs manuales solo tienen next_run con un reintento pendiente
+                        "next_run": r[6] if r[4] else None,
+                        "last_status": r[7]
+                    }
+                    for r in results
+                ],
+                # Valor de `after` para pedir la página siguiente
+                "next_after": results[-1][0] if len(results) == limit else None
+            }
+        
+        # Grafo de dependencias y camino crítico según la duración media reciente
+        @self.router.get(f"{self.config.endpoint}/dag")
+        async def get_dag(db: Session = Depends(get_db)):
+            durations = {
+                job_id: float(avg or 0)
+                for job_id, avg in db.execute(
+                    text("""
+                        SELECT job_id, AVG(duration_seconds)
+                        FROM job_runs
+                        WHERE started_at >= :since
+                        AND status = 'success'
+                        GROUP BY job_id
+                    """),
+                    {"since": datetime.now() - timedelta(days=7)}
+                ).fetchall()
+            }
+            path, total = self.dag.critical_path(durations)
             
-            return scheduled_jobs
+            return {
+                "order": self.dag.order,
+                "edges": [{"upstream": up, "downstream": down} for up, down in self.dag.edges()],
+                "missing": sorted(self.dag.missing),
+                "critical_path": path,
+                "critical_path_seconds": round(total, 3)
+            }
+        
+        # Histograma previsto de ejecuciones por segundo (def: el cálculo es CPU y
+        # consultas síncronas, FastAPI lo ejecuta en su threadpool y no bloquea el event loop)
+        @self.router.get(f"{self.config.endpoint}/scheduled/histogram")
+        def get_fire_histogram(
+            window_minutes: int = Query(60, ge=1, le=self.HISTOGRAM_MAX_WINDOW_MINUTES),
+            db: Session = Depends(get_db)
+        ):
+            now = datetime.now()
+            until = now + timedelta(minutes=window_minutes)
+            # Solo los jobs que disparan dentro de la ventana (rango sobre idx_due), acotados
+            rows = db.execute(
+                text("""
+                    SELECT job_id, schedule_type, schedule_value, next_run
+                    FROM scheduled_jobs
+                    WHERE is_active = TRUE
+                    AND next_run <= :until
+                    ORDER BY next_run
+                    LIMIT :limit
+                """),
+                {"until": until, "limit": self.HISTOGRAM_MAX_JOBS}
+            ).fetchall()
+            
+            per_second: Counter = Counter()
+            jobs_at: Dict[datetime, List[str]] = defaultdict(list)
+            by_second_of_minute = [0] * 60
+            
+            for job_id, schedule_type, schedule_value, next_run in rows:
+                # Un next_run vencido se ejecutará en cuanto el motor lo vea
+                fires = predict_fire_times(
+                    schedule_type, schedule_value, max(as_datetime(next_run), now), until, self._schedule_offset(job_id)
+                )
+                for fire in fires:
+                    second = fire.replace(microsecond=0)
+                    per_second[second] += 1
+                    jobs_at[second].append(job_id)
+                    by_second_of_minute[second.second] += 1
+            
+            peaks = per_second.most_common(10)
+            return {
+                "window_minutes": window_minutes,
+                "jobs": len(rows),
+                # Con más jobs en la ventana solo se cuentan los HISTOGRAM_MAX_JOBS que antes disparan
+                "truncated": len(rows) == self.HISTOGRAM_MAX_JOBS,
+                "fires": sum(per_second.values()),
+                "max_per_second": peaks[0][1] if peaks else 0,
+                "peaks": [
+                    {"at": second.isoformat(), "count": count, "job_ids": jobs_at[second][:20]}
+                    for second, count in peaks
+                ],
+                "by_second_of_minute": by_second_of_minute
+            }
         
         # Obtener estado del scheduler
         @self.router.get(f"{self.config.endpoint}/scheduler/status")
         async def get_scheduler_status():
             return {
                 "running": self.scheduler_running,
+                "node_id": self.node_id,
                 "jobs_count": len(self.jobs_registry),
-                "check_interval": "30 seconds"
+                "active_runs": list(self._active_runs.keys()),
+                "abandoned_threads": self._abandoned_threads,
+                "zombie_jobs": list(self._zombies.keys()),
+                "rate_limited": self._rate_limited,
+                "queue_full_deferred": self._queue_full_deferred,
+                "reaped_runs": self._reaped,
+                "backfilling": sorted(self._backfilling),
+                "engine": self.scheduler.get_status(),
+                "executor": self.executor.get_stats(),
+                "process_pool": self.process_pool.get_stats(),
+                "async_runner": self.async_runner.get_stats(),
+                "run_history": self.run_history.get_stats(),
+                "heartbeats": self.heartbeats.get_stats(),
+                "shards": self.shards.get_stats(),
+                "result_cache": self.result_cache.get_stats(),
+                "events": self.events.get_stats()
             }
-    
-    def _calculate_next_run(self, schedule_type: str, schedule_value: str, last_run: datetime) -> Optional[datetime]:
-        """Calcula la próxima ejecución basada en la última"""
-        try:
-            if schedule_type == "interval" and schedule_value:
-                minutes = int(schedule_value)
-                return last_run + timedelta(minutes=minutes)
-            elif schedule_type == "cron" and schedule_value:
-                cron = croniter(schedule_value, last_run)
-                return cron.get_next(datetime)
-            elif schedule_type == "daily":
-                return last_run + timedelta(days=1)
-            elif schedule_type == "weekly":
-                return last_run + timedelta(weeks=1)
-        except:
-            pass
-        return None
\ No newline at end of file
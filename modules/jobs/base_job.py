@@ -1,14 +1,194 @@
 # modules/jobs/base_job.py
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from contextvars import ContextVar
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime
+import inspect
 import json
+import threading
 import traceback
+from sqlalchemy import event, text
 from sqlalchemy.orm import Session
+from ..scheduler.policies import RetryPolicy, MisfirePolicy, RateLimit, FairShare
+from ..scheduler.result_cache import config_hash
+
+class JobCancelledError(Exception):
+    """La ejecución del job fue cancelada (timeout o petición del usuario)"""
+    pass
+
+class CancellationToken:
+    """Señal de cancelación de una ejecución concreta"""
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+        self.cancelled_at: Optional[datetime] = None
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def cancel(self, reason: str = "cancelado"):
+        """Marca la ejecución como cancelada y avisa a los callbacks"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self.cancelled_at = datetime.now()
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+    
+    def add_callback(self, callback: Callable[[], None]):
+        """Registra una función a llamar al cancelar (inmediatamente si ya lo está)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+# Token de la ejecución en curso (por thread / tarea async)
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("job_cancel_token", default=None)
+
+class JobCheckpoint:
+    """
+    Punto de reanudación de una ejecución (cursor, offset, último ID procesado...)
+    
+    El estado se guarda por instancia de job en job_checkpoints y se escribe en
+    cada db.commit() del job, dentro de la misma transacción que sus datos: si
+    el lote se deshace, el checkpoint también. Al terminar con éxito se borra;
+    si la ejecución falla, se cancela o el proceso muere, el reintento o la
+    siguiente ejecución continúan desde el último checkpoint confirmado.
+    
+    Un checkpoint guardado con otra configuración se descarta.
+    """
+    
+    def __init__(self, db: Session, job_id: str, config_json: str):
+        self.db = db
+        self.job_id = job_id
+        self.config_key = config_hash(config_json) or ""
+        self.state: Dict[str, Any] = {}
+        self.resumed = False
+        self._dirty = False
+        self._stored = False
+        
+        row = db.execute(
+            text("SELECT config_hash, state_json FROM job_checkpoints WHERE job_id = :job_id"),
+            {"job_id": job_id}
+        ).fetchone()
+        if row:
+            self._stored = True
+            if row[0] == self.config_key:
+                self.state = json.loads(row[1]) if row[1] else {}
+                self.resumed = bool(self.state)
+        event.listen(db, "before_commit", self._before_commit)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.state.get(key, default)
+    
+    def update(self, **values):
+        """Actualiza el estado; se persiste con el próximo db.commit()"""
+        self.state.update(values)
+        self._dirty = True
+    
+    def commit(self):
+        """Confirma ya el estado (y la transacción en curso del job)"""
+        self._dirty = True
+        self.db.commit()
+    
+    def clear(self):
+        """Borra el checkpoint en una conexión aparte, sin confirmar el trabajo pendiente del job"""
+        self.state = {}
+        self._dirty = False
+        if not self._stored:
+            return
+        with self.db.get_bind().begin() as connection:
+            connection.execute(
+                text("DELETE FROM job_checkpoints WHERE job_id = :job_id"),
+                {"job_id": self.job_id}
+            )
+        self._stored = False
+    
+    def close(self):
+        event.remove(self.db, "before_commit", self._before_commit)
+    
+    def _before_commit(self, session):
+        if not self._dirty:
+            return
+        self._dirty = False
+        params = {
+            "job_id": self.job_id,
+            "config_hash": self.config_key,
+            "state_json": json.dumps(self.state, default=str),
+            "now": datetime.now()
+        }
+        result = session.execute(
+            text("""
+                UPDATE job_checkpoints 
+                SET config_hash = :config_hash, state_json = :state_json, updated_at = :now
+                WHERE job_id = :job_id
+            """),
+            params
+        )
+        if result.rowcount == 0:
+            session.execute(
+                text("""
+                    INSERT INTO job_checkpoints (job_id, config_hash, state_json, updated_at)
+                    VALUES (:job_id, :config_hash, :state_json, :now)
+                """),
+                params
+            )
+        self._stored = True
+
+class _RunContext:
+    """Datos de la ejecución en curso que el job puede pedir desde execute()"""
+    
+    def __init__(self, db: Session, job_id: Optional[str], config_json: str):
+        self.db = db
+        self.job_id = job_id
+        self.config_json = config_json
+        self.checkpoint: Optional[JobCheckpoint] = None
+
+_current_run: ContextVar[Optional[_RunContext]] = ContextVar("job_run_context", default=None)
 
 class BaseJob(ABC):
     """Clase base para todos los jobs del sistema"""
     
+    # Modo de ejecución: "thread" (pool de threads del proceso web) o
+    # "process" (pool de procesos worker, para jobs CPU-bound)
+    execution_mode: str = "thread"
+    
+    # Tiempo máximo de ejecución en segundos (None = sin límite)
+    timeout_seconds: Optional[float] = None
+    
+    # Segundos durante los que se reutiliza el resultado de una ejecución con la
+    # misma configuración sin volver a llamar a execute() (None = sin caché)
+    cache_ttl_seconds: Optional[float] = None
+    
+    # Reintentos con backoff exponencial tras un fallo (None = sin reintentos)
+    retry_policy: Optional[RetryPolicy] = None
+    
+    # job_ids de los que depende: el job se lanza en cuanto todos terminan con éxito
+    depends_on: Tuple[str, ...] = ()
+    
+    # Ventana en segundos para repartir las ejecuciones programadas: el job se
+    # desplaza un offset fijo (derivado de su job_id) dentro de ella, así los
+    # crons que comparten expresión no arrancan todos en el mismo segundo
+    schedule_spread_seconds: float = 0
+    
+    # Qué hacer con las ejecuciones programadas perdidas durante una caída
+    misfire_policy: MisfirePolicy = MisfirePolicy()
+    
+    # Límite de ejecuciones aplicado por el scheduler (None = sin límite)
+    rate_limit: Optional[RateLimit] = None
+    
+    # Prioridad y grupo de reparto en la cola de workers: los jobs "high" se
+    # atienden antes y los grupos se reparten la capacidad según su weight
+    fair_share: FairShare = FairShare()
+    
     def __init__(self):
         self.job_id = self.get_job_id()
         self.name = self.get_name()
@@ -39,6 +219,10 @@ class BaseJob(ABC):
         """
         Ejecuta el job con la configuración dada
         
+        Puede definirse como `async def execute(self, config, db)`: en ese caso
+        se ejecuta en el event loop del scheduler y `db` es una AsyncSession
+        (None si no hay driver async instalado).
+        
         Args:
             config: Configuración del job (JSON parseado)
             db: Sesión de base de datos
@@ -48,6 +232,11 @@ class BaseJob(ABC):
         """
         pass
     
+    @property
+    def is_async(self) -> bool:
+        """True si execute() es una corrutina"""
+        return inspect.iscoroutinefunction(self.execute)
+    
     def validate_config(self, config: Dict[str, Any]) -> tuple[bool, Optional[str]]:
         """
         Valida la configuración del job
@@ -57,56 +246,210 @@ class BaseJob(ABC):
         """
         return True, None
     
-    def run(self, config_json: str, db: Session) -> Dict[str, Any]:
+    def is_cancelled(self) -> bool:
+        """True si la ejecución en curso ha sido cancelada; execute() puede consultarlo"""
+        token = _current_token.get()
+        return token is not None and token.cancelled
+    
+    def check_cancelled(self):
+        """Lanza JobCancelledError si la ejecución en curso ha sido cancelada"""
+        token = _current_token.get()
+        if token is not None and token.cancelled:
+            raise JobCancelledError(f"Ejecución cancelada: {token.reason}")
+    
+    def checkpoint(self) -> JobCheckpoint:
+        """
+        Checkpoint de la ejecución en curso, para reanudar trabajos largos
+        
+        Uso típico en execute():
+            checkpoint = self.checkpoint()
+            last_id = checkpoint.get("last_id", 0)
+            for batch in ...:           # lotes con id > last_id
+                ...
+                checkpoint.update(last_id=batch[-1].id)
+                db.commit()             # datos y checkpoint en la misma transacción
+        
+        Solo disponible en jobs síncronos ejecutados por el scheduler (modo
+        thread o process).
+        """
+        context = _current_run.get()
+        if context is None or context.job_id is None:
+            raise RuntimeError("checkpoint() solo está disponible durante una ejecución del scheduler")
+        if context.checkpoint is None:
+            context.checkpoint = JobCheckpoint(context.db, context.job_id, context.config_json)
+        return context.checkpoint
+    
+    def run(self, config_json: str, db: Session, cancel_token: Optional[CancellationToken] = None,
+            instance_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Método principal que ejecuta el job con manejo de errores
+        
+        instance_id identifica la instancia programada (para su checkpoint)
         """
         start_time = datetime.now()
+        token_reset = _current_token.set(cancel_token)
+        context = _RunContext(db, instance_id, config_json)
+        run_reset = _current_run.set(context)
         
         try:
-            # Parsear configuración
+            # Parsear y validar configuración
             config = json.loads(config_json) if config_json else {}
-            
-            # Validar configuración
-            is_valid, error_msg = self.validate_config(config)
-            if not is_valid:
-                return {
-                    "status": "failed",
-                    "error": f"Configuración inválida: {error_msg}",
-                    "started_at": start_time.isoformat(),
-                    "finished_at": datetime.now().isoformat()
-                }
+            invalid = self._check_config(config, start_time)
+            if invalid:
+                return invalid
             
             # Ejecutar job
-            result = self.execute(config, db)
+            result = self._success_result(self.execute(config, db), start_time)
+            if context.checkpoint is not None:
+                if context.checkpoint.resumed:
+                    result["resumed_from_checkpoint"] = True
+                # Terminado con éxito: la próxima ejecución empieza de cero. Si execute()
+                # devolvió otro estado (p. ej. "failed") se conserva para reanudar
+                if result["status"] == "success":
+                    context.checkpoint.clear()
+            return result
             
-            # Asegurar formato de respuesta
-            if not isinstance(result, dict):
-                result = {"output": str(result)}
+        except Exception as e:
+            return self._failure_result(e, start_time)
+        finally:
+            if context.checkpoint is not None:
+                context.checkpoint.close()
+            _current_run.reset(run_reset)
+            _current_token.reset(token_reset)
+    
+    async def run_async(self, config_json: str, db, cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """
+        Equivalente a run() para jobs con `async def execute`
+        """
+        start_time = datetime.now()
+        token_reset = _current_token.set(cancel_token)
+        
+        try:
+            config = json.loads(config_json) if config_json else {}
+            invalid = self._check_config(config, start_time)
+            if invalid:
+                return invalid
             
-            return {
-                "status": "success",
-                "started_at": start_time.isoformat(),
-                "finished_at": datetime.now().isoformat(),
-                "duration_seconds": (datetime.now() - start_time).total_seconds(),
-                **result
-            }
+            return self._success_result(await self.execute(config, db), start_time)
             
         except Exception as e:
+            return self._failure_result(e, start_time)
+        finally:
+            _current_token.reset(token_reset)
+    
+    def _check_config(self, config: Dict[str, Any], start_time: datetime) -> Optional[Dict[str, Any]]:
+        """Devuelve un resultado failed si la configuración no es válida"""
+        is_valid, error_msg = self.validate_config(config)
+        if not is_valid:
             return {
                 "status": "failed",
-                "error": str(e),
-                "traceback": traceback.format_exc(),
+                "error": f"Configuración inválida: {error_msg}",
                 "started_at": start_time.isoformat(),
-                "finished_at": datetime.now().isoformat(),
-                "duration_seconds": (datetime.now() - start_time).total_seconds()
+                "finished_at": datetime.now().isoformat()
             }
+        return None
+    
+    def _success_result(self, result: Any, start_time: datetime) -> Dict[str, Any]:
+        """Normaliza la salida de execute()"""
+        # Asegurar formato de respuesta
+        if not isinstance(result, dict):
+            result = {"output": str(result)}
+        
+        return {
+            "status": "success",
+            "started_at": start_time.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "duration_seconds": (datetime.now() - start_time).total_seconds(),
+            **result
+        }
+    
+    def _failure_result(self, e: Exception, start_time: datetime) -> Dict[str, Any]:
+        """Resultado failed a partir de una excepción"""
+        return {
+            "status": "failed",
+            "error": str(e),
+            "traceback": traceback.format_exc(),
+            "started_at": start_time.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "duration_seconds": (datetime.now() - start_time).total_seconds()
+        }
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el job a diccionario para la API"""
         return {
+            "partitioned": False,
             "job_id": self.job_id,
             "name": self.name,
             "description": self.description,
-            "default_config": self.default_config
-        }
\ No newline at end of file
+            "default_config": self.default_config,
+            "execution_mode": "async" if self.is_async else self.execution_mode,
+            "timeout_seconds": self.timeout_seconds,
+            "cache_ttl_seconds": self.cache_ttl_seconds,
+            "max_attempts": self.retry_policy.max_attempts if self.retry_policy else 1,
+            "misfire_policy": self.misfire_policy.mode,
+            "depends_on": list(self.depends_on),
+            "schedule_spread_seconds": self.schedule_spread_seconds,
+            "rate_limit_per_minute": self.rate_limit.rate_per_minute if self.rate_limit else None,
+            "priority": self.fair_share.priority,
+            "fair_share_group": self.fair_share.group or self.job_id
+        }
+
+class PartitionedJob(BaseJob):
+    """
+    Job que divide su trabajo en particiones independientes (map/reduce)
+    
+    El scheduler ejecuta las particiones a la vez en su pool (threads o
+    procesos según execution_mode), cada una con su propia sesión, y combina
+    los resultados con reduce(). execute() las recorre en serie y solo se usa
+    fuera del scheduler.
+    """
+    
+    # Particiones en ejecución a la vez como máximo (None = límite del scheduler)
+    max_parallel_partitions: Optional[int] = None
+    
+    @abstractmethod
+    def get_partitions(self, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Divide la configuración en particiones
+        
+        Returns:
+            Lista de dicts serializables (rangos de IDs o fechas, listas de elementos...)
+        """
+        pass
+    
+    @abstractmethod
+    def execute_partition(self, config: Dict[str, Any], partition: Dict[str, Any], db: Session) -> Dict[str, Any]:
+        """Procesa una partición y devuelve su resultado"""
+        pass
+    
+    def reduce(self, config: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combina los resultados de las particiones (en el orden de get_partitions)
+        
+        Por defecto los devuelve tal cual junto con un resumen.
+        """
+        return {"output": f"{len(results)} particiones procesadas", "partitions": results}
+    
+    def execute(self, config: Dict[str, Any], db: Session) -> Dict[str, Any]:
+        results = []
+        for partition in self.get_partitions(config):
+            self.check_cancelled()
+            results.append(self.execute_partition(config, partition, db))
+        return self.reduce(config, results)
+    
+    def run_partition(self, config_json: str, partition: Dict[str, Any], db: Session,
+                      cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Ejecuta una partición con el mismo manejo de errores que run()"""
+        start_time = datetime.now()
+        token_reset = _current_token.set(cancel_token)
+        
+        try:
+            config = json.loads(config_json) if config_json else {}
+            return self._success_result(self.execute_partition(config, partition, db), start_time)
+        except Exception as e:
+            return self._failure_result(e, start_time)
+        finally:
+            _current_token.reset(token_reset)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "partitioned": True, "max_parallel_partitions": self.max_parallel_partitions}
\ No newline at end of file
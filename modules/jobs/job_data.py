@@ -0,0 +1,133 @@
+# modules/jobs/job_data.py
+# Utilidades para jobs que leen o escriben muchas filas con la sesión `db`
+#
+# - stream_rows(): lee por lotes con un cursor de servidor (stream_results /
+#   yield_per) en lugar de cargar todo con fetchall().
+# - execute_batches(): ejecuta un INSERT/UPDATE para muchas filas en lotes con
+#   executemany (pymysql reescribe los INSERT ... VALUES en inserciones
+#   multi-fila: un viaje a MySQL por lote, no por fila).
+# - BatchWriter: acumula filas dentro de un bucle y las escribe en lotes.
+#
+# Ejemplo en execute():
+#     total = 0
+#     for chunk in stream_rows(db, "SELECT importe FROM origen", chunk_size=5000):
+#         total += sum(row.importe for row in chunk)
+#
+#     with BatchWriter(db, "INSERT INTO destino (id, total) VALUES (:id, :total)") as writer:
+#         for item in calcular_items():
+#             writer.add({"id": item.id, "total": item.total})
+#     db.commit()
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+# Filas por lote por defecto (lectura y escritura)
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_BATCH_SIZE = 1000
+
+Statement = Union[str, TextClause]
+
+
+def _as_text(statement: Statement) -> TextClause:
+    return text(statement) if isinstance(statement, str) else statement
+
+
+def stream_rows(db: Session, statement: Statement, params: Optional[Dict[str, Any]] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Row]]:
+    """
+    Ejecuta una consulta y devuelve sus filas en lotes de `chunk_size`
+
+    Con MySQL se usa un cursor de servidor (SSCursor): las filas llegan del
+    servidor según se consumen y la memoria queda acotada al lote. Mientras
+    se recorre, esa conexión no puede ejecutar otras sentencias: para escribir
+    a la vez usar otra sesión, o leer por claves (WHERE id > :last_id) en
+    consultas sucesivas.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size debe ser al menos 1")
+    result = db.execute(
+        _as_text(statement),
+        params or {},
+        execution_options={"stream_results": True, "yield_per": chunk_size}
+    )
+    try:
+        for chunk in result.partitions(chunk_size):
+            yield chunk
+    finally:
+        result.close()
+
+
+def iter_rows(db: Session, statement: Statement, params: Optional[Dict[str, Any]] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Row]:
+    """Como stream_rows(), pero fila a fila"""
+    for chunk in stream_rows(db, statement, params, chunk_size):
+        yield from chunk
+
+
+def execute_batches(db: Session, statement: Statement, rows: Sequence[Dict[str, Any]],
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Ejecuta `statement` para cada fila de `rows` en lotes de `batch_size` (executemany)
+
+    No hace commit: el job decide cuándo confirmar.
+
+    Returns:
+        Número de filas enviadas
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size debe ser al menos 1")
+    clause = _as_text(statement)
+    for start in range(0, len(rows), batch_size):
+        db.execute(clause, list(rows[start:start + batch_size]))
+    return len(rows)
+
+
+class BatchWriter:
+    """
+    Acumula filas y las escribe en lotes de `batch_size` (executemany)
+
+    Al salir del bloque `with` sin error se escribe el resto; si hay una
+    excepción, lo pendiente se descarta. Con `commit_every_batch` se hace
+    db.commit() tras cada lote (así también se guarda el checkpoint del job,
+    si lo usa).
+    """
+
+    def __init__(self, db: Session, statement: Statement, batch_size: int = DEFAULT_BATCH_SIZE,
+                 commit_every_batch: bool = False):
+        if batch_size < 1:
+            raise ValueError("batch_size debe ser al menos 1")
+        self.db = db
+        self.statement = _as_text(statement)
+        self.batch_size = batch_size
+        self.commit_every_batch = commit_every_batch
+        self.written = 0
+        self._pending: List[Dict[str, Any]] = []
+
+    def add(self, row: Dict[str, Any]):
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Escribe las filas pendientes"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self.db.execute(self.statement, pending)
+        self.written += len(pending)
+        if self.commit_every_batch:
+            self.db.commit()
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._pending = []
+        return False
@@ -0,0 +1,19 @@
+# modules/scheduler/__init__.py
+"""
+Motor interno del Job Scheduler
+"""
+from .engine import SchedulerEngine, ScheduleEntry
+from .executor import JobExecutor, ExecutorFullError
+from .fair_queue import FairQueue
+from .process_pool import ProcessJobPool, is_worker_process
+from .async_runner import AsyncJobRunner
+from .history import RunHistoryWriter
+from .events import EventBroadcaster
+from .heartbeat import HeartbeatWriter
+from .sharding import ShardCoordinator, shard_of
+from .dag import JobGraph
+from .partitions import PartitionProgress
+from .result_cache import ResultCache, config_hash
+from .accounting import ResourceMeter, install_sql_listeners
+from .schedules import as_datetime, calculate_next_run, missed_runs, predict_fire_times, spread_offset
+from .policies import RetryPolicy, MisfirePolicy, RateLimit, FairShare, TokenBucket
@@ -0,0 +1,166 @@
+# modules/scheduler/accounting.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import os
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Medidor de la ejecución en curso (por thread / tarea async)
+_current_meter: ContextVar[Optional["ResourceMeter"]] = ContextVar("job_resource_meter", default=None)
+
+_listeners_installed = False
+_install_lock = threading.Lock()
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reinicia el pico de memoria residente del proceso (VmHWM, solo Linux)
+    para que peak_rss_mb() mida a partir de ahora
+
+    Returns:
+        False si el sistema no permite reiniciarlo
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Pico de memoria residente del proceso actual en MB (None si no se puede medir)
+
+    En Linux es VmHWM, que reset_peak_rss() reinicia; en otros sistemas el
+    máximo histórico del proceso (ru_maxrss).
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """Memoria residente actual del proceso en MB (en Linux; si no, el pico)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError, IndexError):
+        return peak_rss_mb()
+
+
+class ResourceMeter:
+    """
+    Recursos consumidos por una ejecución: CPU de los threads que la ejecutan,
+    sentencias SQL (número, tiempo y filas afectadas o devueltas) y el pico
+    de memoria del proceso que la ejecutó.
+
+    El pico de memoria solo se mide con track(memory=True) en un proceso que
+    ejecuta un job cada vez (los workers de modo "process") y donde se puede
+    reiniciar antes de empezar: en modo thread el pico es el de todo el
+    proceso web, con sus otras peticiones y jobs, y queda en None.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cpu_seconds: Optional[float] = None
+        self.peak_rss_mb: Optional[float] = None
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.rows_touched = 0
+
+    @contextmanager
+    def track(self, cpu: bool = True, memory: bool = False):
+        """
+        Atribuye a este medidor el SQL (y la CPU del thread actual) del bloque
+
+        Con memory=True mide además el pico de memoria del proceso durante el
+        bloque, si se puede reiniciar al empezar (ver reset_peak_rss).
+        """
+        memory = memory and reset_peak_rss()
+        token = _current_meter.set(self)
+        cpu_start = time.thread_time()
+        try:
+            yield self
+        finally:
+            _current_meter.reset(token)
+            with self._lock:
+                if cpu:
+                    self.cpu_seconds = (self.cpu_seconds or 0.0) + time.thread_time() - cpu_start
+                rss = peak_rss_mb() if memory else None
+                if rss is not None:
+                    self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+
+    def record_sql(self, seconds: float, rowcount: int):
+        with self._lock:
+            self.sql_count += 1
+            self.sql_seconds += seconds
+            self.rows_touched += max(rowcount or 0, 0)
+
+    def merge(self, resources: Optional[Dict[str, Any]]):
+        """Suma los recursos medidos en otro proceso (particiones en modo process)"""
+        if not resources:
+            return
+        with self._lock:
+            if resources.get("cpu_seconds") is not None:
+                self.cpu_seconds = (self.cpu_seconds or 0.0) + resources["cpu_seconds"]
+            if resources.get("peak_rss_mb") is not None:
+                self.peak_rss_mb = max(self.peak_rss_mb or 0.0, resources["peak_rss_mb"])
+            self.sql_count += resources.get("sql_count") or 0
+            self.sql_seconds += resources.get("sql_seconds") or 0.0
+            self.rows_touched += resources.get("rows_touched") or 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cpu_seconds": round(self.cpu_seconds, 4) if self.cpu_seconds is not None else None,
+                "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+                "sql_count": self.sql_count,
+                "sql_seconds": round(self.sql_seconds, 4),
+                "rows_touched": self.rows_touched
+            }
+
+
+def install_sql_listeners():
+    """Registra (una vez por proceso) los eventos de SQLAlchemy que alimentan los medidores"""
+    global _listeners_installed
+    with _install_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_installed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_meter.get() is not None:
+        conn.info.setdefault("job_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    meter = _current_meter.get()
+    starts = conn.info.get("job_query_start")
+    if meter is None or not starts:
+        return
+    meter.record_sql(time.perf_counter() - starts.pop(), cursor.rowcount)
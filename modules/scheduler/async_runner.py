@@ -0,0 +1,82 @@
+# modules/scheduler/async_runner.py
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import threading
+
+from .executor import ExecutorFullError
+
+
+class AsyncJobRunner:
+    """
+    Event loop de larga vida, en su propio thread, para jobs con
+    `async def execute`. Cientos de jobs I/O-bound comparten el loop sin
+    ocupar un thread del executor cada uno.
+    """
+
+    def __init__(self, max_concurrency: int = 200, max_pending: int = 1000):
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+
+    def start(self):
+        """Arranca el thread con el event loop"""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run_loop, name="async-jobs", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args) -> Future:
+        """
+        Programa fn(*args) en el loop y devuelve un concurrent.futures.Future
+
+        Raises:
+            ExecutorFullError si se supera max_pending
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExecutorFullError(f"Demasiados jobs async pendientes ({self.max_pending})")
+            self._pending += 1
+        return asyncio.run_coroutine_threadsafe(self._guarded(fn, *args), self.loop)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del loop async"""
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "running": self._running,
+                "waiting": self._pending - self._running,
+                "completed": self._completed
+            }
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        self.loop.run_forever()
+
+    async def _guarded(self, fn: Callable[..., Awaitable[Any]], *args):
+        try:
+            async with self._semaphore:
+                with self._lock:
+                    self._running += 1
+                try:
+                    return await fn(*args)
+                finally:
+                    with self._lock:
+                        self._running -= 1
+        except Exception as e:
+            print(f"❌ Error en job async: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
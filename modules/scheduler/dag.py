@@ -0,0 +1,83 @@
+# modules/scheduler/dag.py
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class JobGraph:
+    """
+    Grafo de dependencias entre jobs (DAG).
+
+    Cada job declara sus dependencias (upstream); el grafo guarda también
+    las aristas inversas para saber, al terminar un job, qué jobs downstream
+    pueden estar listos. Las dependencias a jobs no registrados se ignoran
+    y se informan en `missing`.
+    """
+
+    def __init__(self, dependencies: Dict[str, Iterable[str]]):
+        self.nodes: Set[str] = set(dependencies)
+        self.missing: Set[str] = set()
+        self._upstream: Dict[str, List[str]] = {}
+        self._downstream: Dict[str, List[str]] = {job_id: [] for job_id in self.nodes}
+
+        for job_id, upstream in dependencies.items():
+            self._upstream[job_id] = []
+            for parent in upstream:
+                if parent not in self.nodes:
+                    self.missing.add(parent)
+                    continue
+                self._upstream[job_id].append(parent)
+                self._downstream[parent].append(job_id)
+
+        self.order = self._topological_order()
+
+    def upstream(self, job_id: str) -> List[str]:
+        return self._upstream.get(job_id, [])
+
+    def downstream(self, job_id: str) -> List[str]:
+        return self._downstream.get(job_id, [])
+
+    def edges(self) -> List[Tuple[str, str]]:
+        """Aristas (upstream, downstream)"""
+        return [(parent, job_id) for job_id in self.order for parent in self._upstream[job_id]]
+
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """
+        Camino más largo del grafo según la duración estimada de cada job
+
+        Con las ramas independientes en paralelo es la latencia mínima de
+        extremo a extremo del pipeline.
+        """
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for job_id in self.order:
+            parent = max(self._upstream[job_id], key=lambda p: finish[p], default=None)
+            previous[job_id] = parent
+            finish[job_id] = (finish[parent] if parent else 0.0) + durations.get(job_id, 0.0)
+
+        if not finish:
+            return [], 0.0
+        node: Optional[str] = max(finish, key=finish.get)
+        total = finish[node]
+        path = []
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        return path[::-1], total
+
+    def _topological_order(self) -> List[str]:
+        """Orden topológico (Kahn); ValueError si hay un ciclo"""
+        pending = {job_id: len(parents) for job_id, parents in self._upstream.items()}
+        ready = deque(sorted(job_id for job_id, count in pending.items() if count == 0))
+        order = []
+        while ready:
+            job_id = ready.popleft()
+            order.append(job_id)
+            for child in self._downstream[job_id]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+
+        if len(order) != len(self.nodes):
+            cycle = sorted(job_id for job_id, count in pending.items() if count > 0)
+            raise ValueError(f"Dependencias circulares entre jobs: {', '.join(cycle)}")
+        return order
@@ -0,0 +1,209 @@
+# modules/scheduler/engine.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import heapq
+import itertools
+import threading
+import time
+
+import metrics
+
+# Duración de cada paso del motor (recarga desde BD o despacho de un job)
+TICK_SECONDS = metrics.histogram(
+    "scheduler_tick_seconds", "Duración de cada paso del motor del scheduler", ["phase"]
+)
+# Retraso del motor al sacar un job del heap respecto a su hora prevista
+DRIFT_SECONDS = metrics.histogram(
+    "scheduler_drift_seconds", "Retraso entre la hora prevista y el disparo de un job",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0)
+)
+
+
+@dataclass
+class ScheduleEntry:
+    """Programación en memoria de un job"""
+    job_id: str
+    schedule_type: str
+    schedule_value: Optional[str]
+    config_json: Optional[str]
+    next_run: datetime
+    version: int = 0
+
+
+class SchedulerEngine:
+    """
+    Motor del scheduler basado en un min-heap de próximas ejecuciones.
+
+    El thread del motor duerme exactamente hasta la ejecución más cercana y
+    se despierta antes si una programación cambia. Cada cambio invalida la
+    entrada anterior del heap por versión (borrado perezoso), así que
+    programar, eliminar y detectar un job vencido cuesta O(log n).
+
+    Si se indica `refill`, el motor lo invoca cada `refill_interval` segundos
+    para cargar desde la base de datos la ventana de próximas ejecuciones.
+    """
+
+    def __init__(self, on_due: Callable[[ScheduleEntry], None],
+                 refill: Optional[Callable[[], None]] = None, refill_interval: float = 60.0):
+        self.on_due = on_due
+        self.refill = refill
+        self.refill_interval = refill_interval
+        self.running = False
+        self._next_refill = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[datetime, int, str, int]] = []
+        self._entries: Dict[str, ScheduleEntry] = {}
+        self._running_jobs: Set[str] = set()
+        self._seq = itertools.count()
+        self._versions = itertools.count(1)
+
+    def start(self):
+        """Inicia el thread del motor"""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el thread del motor"""
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def upsert(self, job_id: str, schedule_type: str, schedule_value: Optional[str],
+               config_json: Optional[str], next_run: Optional[datetime]):
+        """Crea o actualiza la programación de un job y despierta al motor"""
+        with self._cond:
+            if next_run is None:
+                self._entries.pop(job_id, None)
+            else:
+                entry = ScheduleEntry(
+                    job_id=job_id,
+                    schedule_type=schedule_type,
+                    schedule_value=schedule_value,
+                    config_json=config_json,
+                    next_run=next_run,
+                    version=next(self._versions)
+                )
+                self._entries[job_id] = entry
+                self._push(entry)
+            self._cond.notify_all()
+
+    def remove(self, job_id: str):
+        """Elimina la programación de un job"""
+        with self._cond:
+            self._entries.pop(job_id, None)
+            self._cond.notify_all()
+
+    def retain(self, keep: Callable[[str], bool]) -> int:
+        """Elimina las programaciones de los jobs para los que keep(job_id) es False"""
+        with self._cond:
+            dropped = [job_id for job_id in self._entries if not keep(job_id)]
+            for job_id in dropped:
+                del self._entries[job_id]
+            self._cond.notify_all()
+            return len(dropped)
+
+    def request_refill(self):
+        """Adelanta la próxima recarga desde la base de datos"""
+        with self._cond:
+            self._next_refill = 0.0
+            self._cond.notify_all()
+
+    def mark_running(self, job_id: str):
+        """Marca un job en ejecución para que no se vuelva a disparar"""
+        with self._cond:
+            self._running_jobs.add(job_id)
+
+    def mark_finished(self, job_id: str, next_run: Optional[datetime]):
+        """Libera un job tras su ejecución y lo reprograma en `next_run`"""
+        with self._cond:
+            self._running_jobs.discard(job_id)
+            entry = self._entries.get(job_id)
+            if not entry:
+                return
+            if next_run is None:
+                self._entries.pop(job_id, None)
+                return
+            entry.next_run = next_run
+            entry.version = next(self._versions)
+            self._push(entry)
+            self._cond.notify_all()
+
+    def defer(self, job_id: str, until: datetime):
+        """Aplaza un job vencido hasta `until` sin cambiar la ocurrencia que le toca (next_run)"""
+        with self._cond:
+            self._running_jobs.discard(job_id)
+            entry = self._entries.get(job_id)
+            if not entry:
+                return
+            entry.version = next(self._versions)
+            heapq.heappush(self._heap, (until, next(self._seq), job_id, entry.version))
+            self._cond.notify_all()
+
+    def get_status(self) -> Dict[str, object]:
+        """Estado del motor para la API"""
+        with self._cond:
+            next_entry = self._peek_valid()
+            return {
+                "scheduled_jobs": len(self._entries),
+                "running_jobs": len(self._running_jobs),
+                "heap_size": len(self._heap),
+                "next_job_id": next_entry.job_id if next_entry else None,
+                "next_run": self._heap[0][0].isoformat() if next_entry else None
+            }
+
+    def _push(self, entry: ScheduleEntry):
+        heapq.heappush(self._heap, (entry.next_run, next(self._seq), entry.job_id, entry.version))
+
+    def _peek_valid(self) -> Optional[ScheduleEntry]:
+        """Descarta entradas obsoletas de la cima del heap y devuelve la vigente"""
+        while self._heap:
+            _, _, job_id, version = self._heap[0]
+            entry = self._entries.get(job_id)
+            if entry and entry.version == version and job_id not in self._running_jobs:
+                return entry
+            heapq.heappop(self._heap)
+        return None
+
+    def _loop(self):
+        """Loop principal: duerme hasta la próxima ejecución o hasta un cambio"""
+        while True:
+            if self.refill and time.monotonic() >= self._next_refill:
+                self._next_refill = time.monotonic() + self.refill_interval
+                started = time.perf_counter()
+                try:
+                    self.refill()
+                except Exception as e:
+                    print(f"❌ Error recargando jobs programados: {e}")
+                TICK_SECONDS.observe(time.perf_counter() - started, phase="refill")
+
+            with self._cond:
+                if not self.running:
+                    return
+                refill_delay = self._next_refill - time.monotonic() if self.refill else None
+                entry = self._peek_valid()
+                if entry is None:
+                    self._cond.wait(refill_delay)
+                    continue
+                # La clave del heap puede ser posterior a next_run si el job se aplazó
+                delay = (self._heap[0][0] - datetime.now()).total_seconds()
+                if delay > 0:
+                    self._cond.wait(delay if refill_delay is None else min(delay, refill_delay))
+                    continue
+                heapq.heappop(self._heap)
+                self._running_jobs.add(entry.job_id)
+                DRIFT_SECONDS.observe(-delay)
+
+            started = time.perf_counter()
+            try:
+                self.on_due(entry)
+            except Exception as e:
+                print(f"❌ Error despachando job {entry.job_id}: {e}")
+                # La siguiente recarga lo volverá a poner en el heap
+                with self._cond:
+                    self._running_jobs.discard(entry.job_id)
+            TICK_SECONDS.observe(time.perf_counter() - started, phase="dispatch")
@@ -0,0 +1,69 @@
+# modules/scheduler/events.py
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+import asyncio
+import threading
+
+
+class EventBroadcaster:
+    """
+    Difunde eventos del scheduler a los clientes SSE conectados.
+
+    publish() se puede llamar desde cualquier thread (workers, motor, loop
+    async); cada suscriptor tiene una cola acotada en su propio event loop y
+    si un cliente lento la llena se descartan sus eventos más nuevos en lugar
+    de bloquear al scheduler.
+
+    Es memoria del proceso: un cliente solo recibe los eventos de los jobs
+    que ejecuta el worker (o nodo) al que está conectado su stream. El
+    frontend lo compensa recargando /scheduled al (re)conectar y cada minuto,
+    así que los cambios de otros procesos llegan con ese retraso.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._published = 0
+        self._dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        """Crea la cola de un cliente; llamar desde el event loop que la consumirá"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Elimina la cola de un cliente desconectado"""
+        with self._lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Envía un evento a todos los suscriptores"""
+        event = {"type": event_type, "timestamp": datetime.now().isoformat(), **data}
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._published += 1
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:
+                # Loop cerrado: el cliente ya no existe
+                self.unsubscribe(queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del broadcaster"""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "dropped": self._dropped
+            }
+
+    def _put(self, queue: asyncio.Queue, event: Dict[str, Any]):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            with self._lock:
+                self._dropped += 1
@@ -0,0 +1,99 @@
+# modules/scheduler/executor.py
+from typing import Any, Callable, Dict, Optional
+import queue
+import threading
+import time
+
+from .fair_queue import FairQueue
+from .policies import FairShare
+
+
+class ExecutorFullError(Exception):
+    """La cola del executor está llena"""
+    pass
+
+
+class JobExecutor:
+    """
+    Pool fijo de workers con cola acotada compartido por el scheduler y las
+    ejecuciones manuales. Expone profundidad de cola, workers activos y
+    tiempos de espera para dimensionarlo contra el pool de conexiones MySQL.
+
+    Las ejecuciones pendientes se ordenan por prioridad y reparto justo entre
+    grupos (ver FairQueue), no por orden de llegada.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_size: int = 100, starvation_seconds: float = 60.0):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._queue = FairQueue(maxsize=max_queue_size, starvation_seconds=starvation_seconds)
+        self._lock = threading.Lock()
+        self._workers = []
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._started = False
+
+    def start(self):
+        """Arranca los threads worker"""
+        if self._started:
+            return
+        self._started = True
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args, share: FairShare = FairShare()) -> None:
+        """
+        Encola una ejecución con la prioridad y el grupo de `share` (por defecto el job_id)
+
+        Raises:
+            ExecutorFullError si la cola está llena
+        """
+        try:
+            self._queue.put_nowait((job_id, fn, args), share.group or job_id, share)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorFullError(f"Cola de ejecución llena ({self.max_queue_size})")
+        with self._lock:
+            self._submitted += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del executor"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active_workers": self._active,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_size": self.max_queue_size,
+                **self._queue.get_stats(),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_seconds": round(self._total_wait / self._completed, 4) if self._completed else 0.0,
+                "max_wait_seconds": round(self._max_wait, 4)
+            }
+
+    def _worker(self):
+        while True:
+            (job_id, fn, args), enqueued_at, ticket = self._queue.get()
+            started = time.monotonic()
+            wait = started - enqueued_at
+            with self._lock:
+                self._active += 1
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"❌ Error en worker ejecutando {job_id}: {e}")
+            finally:
+                self._queue.complete(ticket, time.monotonic() - started)
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._total_wait += wait
+                    self._max_wait = max(self._max_wait, wait)
@@ -0,0 +1,148 @@
+# modules/scheduler/fair_queue.py
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import itertools
+import queue
+import threading
+import time
+
+from .policies import FairShare
+
+
+class _ShareGroup:
+    """Cola FIFO de un grupo dentro de una clase de prioridad"""
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.items: Deque[Tuple[int, float, Any]] = deque()
+        # Tiempo virtual: segundos de ejecución consumidos / weight
+        self.vtime = 0.0
+        # Duración media de sus ejecuciones (EWMA), lo que se cobra al despachar
+        self.avg_seconds = 1.0
+
+
+class FairQueue:
+    """
+    Cola acotada con prioridades estrictas y reparto justo (WFQ) por grupo.
+
+    Se atiende siempre la clase de prioridad más alta con trabajo pendiente y,
+    dentro de ella, el grupo con menor tiempo virtual: cada despacho le cobra
+    la duración media de sus ejecuciones dividida por su weight y, al terminar,
+    se corrige con la duración real. Así un grupo con ejecuciones largas o muy
+    frecuentes no acapara los workers. Un grupo que vuelve tras estar inactivo
+    parte del tiempo virtual actual de su clase, sin crédito acumulado.
+
+    Protección contra inanición: un elemento que lleva más de
+    `starvation_seconds` esperando se despacha antes que cualquier otro,
+    sea cual sea su clase.
+    """
+
+    # Peso de la última ejecución en la duración media de un grupo
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, maxsize: int = 100, starvation_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.starvation_seconds = starvation_seconds
+        self._cond = threading.Condition()
+        self._size = 0
+        self._seq = itertools.count()
+        self._groups: Dict[Tuple[int, str], _ShareGroup] = {}
+        self._vclock = [0.0] * len(FairShare.PRIORITIES)
+        # Orden global de llegada (seq, enqueued_at, key); los ya despachados se
+        # descartan al llegar a la cabeza
+        self._arrivals: Deque[Tuple[int, float, Tuple[int, str]]] = deque()
+        self._dispatched: set = set()
+        self._depth = [0] * len(FairShare.PRIORITIES)
+        self._promoted = 0
+
+    def put_nowait(self, item: Any, group: str, share: FairShare = FairShare()):
+        """
+        Encola un elemento en el grupo `group` con la prioridad y el weight de `share`
+
+        Raises:
+            queue.Full si la cola está llena
+        """
+        level = FairShare.PRIORITIES.index(share.priority)
+        key = (level, group)
+        with self._cond:
+            if self._size >= self.maxsize:
+                raise queue.Full
+            state = self._groups.get(key)
+            if state is None:
+                state = self._groups[key] = _ShareGroup(share.weight)
+            state.weight = share.weight
+            if not state.items:
+                state.vtime = max(state.vtime, self._vclock[level])
+            seq = next(self._seq)
+            now = time.monotonic()
+            state.items.append((seq, now, item))
+            self._arrivals.append((seq, now, key))
+            self._size += 1
+            self._depth[level] += 1
+            self._cond.notify()
+
+    def get(self) -> Tuple[Any, float, Tuple[Tuple[int, str], float]]:
+        """
+        Espera y extrae el siguiente elemento
+
+        Returns:
+            (item, enqueued_at, ticket); el ticket se devuelve a complete() al terminar
+        """
+        with self._cond:
+            while self._size == 0:
+                self._cond.wait()
+            key = self._starving_key() or self._fair_key()
+            state = self._groups[key]
+            seq, enqueued_at, item = state.items.popleft()
+            self._dispatched.add(seq)
+            self._size -= 1
+            self._depth[key[0]] -= 1
+
+            charge = state.avg_seconds
+            self._vclock[key[0]] = max(self._vclock[key[0]], state.vtime)
+            state.vtime += charge / state.weight
+            return item, enqueued_at, (key, charge)
+
+    def complete(self, ticket: Tuple[Tuple[int, str], float], seconds: float):
+        """Corrige el cobro de un despacho con su duración real"""
+        key, charged = ticket
+        with self._cond:
+            state = self._groups.get(key)
+            if state is None:
+                return
+            state.vtime += (seconds - charged) / state.weight
+            state.avg_seconds += self.EWMA_ALPHA * (seconds - state.avg_seconds)
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidad por clase de prioridad y elementos promovidos por inanición"""
+        with self._cond:
+            return {
+                "depth_by_priority": dict(zip(FairShare.PRIORITIES, self._depth)),
+                "starvation_promotions": self._promoted
+            }
+
+    def _starving_key(self) -> Optional[Tuple[int, str]]:
+        """Grupo del elemento más antiguo si lleva esperando más de starvation_seconds"""
+        while self._arrivals and self._arrivals[0][0] in self._dispatched:
+            self._dispatched.discard(self._arrivals.popleft()[0])
+        if not self._arrivals:
+            return None
+        seq, enqueued_at, key = self._arrivals[0]
+        if time.monotonic() - enqueued_at < self.starvation_seconds:
+            return None
+        # Al ser el más antiguo de todos también es la cabeza de la cola de su grupo
+        if self._fair_key() != key:
+            self._promoted += 1
+        return key
+
+    def _fair_key(self) -> Tuple[int, str]:
+        """Grupo con menor tiempo virtual de la clase más prioritaria con elementos"""
+        level = next(i for i, depth in enumerate(self._depth) if depth > 0)
+        return min(
+            (key for key, state in self._groups.items() if key[0] == level and state.items),
+            key=lambda key: self._groups[key].vtime
+        )
@@ -0,0 +1,91 @@
+# modules/scheduler/heartbeat.py
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+import threading
+
+from sqlalchemy import bindparam, text
+
+
+class HeartbeatWriter:
+    """
+    Renueva los leases de las ejecuciones en curso de este proceso.
+
+    Los heartbeats se agrupan: en cada tick un único UPDATE marca todas las
+    ejecuciones activas (heartbeat_at) y alarga su locked_until `ttl` segundos,
+    sin importar cuántos jobs estén corriendo. Si el proceso muere los leases
+    dejan de renovarse y el reaper puede recuperar las filas.
+    """
+
+    HEARTBEAT_SQL = text("""
+        UPDATE scheduled_jobs
+        SET heartbeat_at = :now,
+            locked_until = :locked_until
+        WHERE locked_by = :owner
+        AND job_id IN :job_ids
+    """).bindparams(bindparam("job_ids", expanding=True))
+
+    def __init__(self, session_factory: Callable, owner: str, active_jobs: Callable[[], List[str]],
+                 interval: float = 10.0, ttl: float = 60.0):
+        self.session_factory = session_factory
+        self.owner = owner
+        self.active_jobs = active_jobs
+        self.interval = interval
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._beats = 0
+        self._errors = 0
+        self._last_beat = None
+
+    def start(self):
+        """Arranca el thread de heartbeats"""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, name="heartbeats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def beat(self):
+        """Renueva en un solo UPDATE los leases de todas las ejecuciones activas"""
+        job_ids = self.active_jobs()
+        if not job_ids:
+            return
+
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            db.execute(self.HEARTBEAT_SQL, {
+                "now": now,
+                "locked_until": now + timedelta(seconds=self.ttl),
+                "owner": self.owner,
+                "job_ids": job_ids
+            })
+            db.commit()
+            with self._lock:
+                self._beats += 1
+                self._last_beat = now
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self._errors += 1
+            print(f"❌ Error escribiendo heartbeats: {e}")
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas de heartbeats"""
+        with self._lock:
+            return {
+                "interval_seconds": self.interval,
+                "ttl_seconds": self.ttl,
+                "beats": self._beats,
+                "errors": self._errors,
+                "last_beat": self._last_beat.isoformat() if self._last_beat else None
+            }
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.beat()
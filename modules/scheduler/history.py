@@ -0,0 +1,207 @@
+# modules/scheduler/history.py
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+import threading
+import time
+
+from sqlalchemy import bindparam, text
+
+from .schedules import as_datetime
+
+
+class RunHistoryWriter:
+    """
+    Escritor con buffer para la tabla job_runs.
+
+    Las ejecuciones se acumulan en memoria y se insertan por lotes (un solo
+    executemany y un commit por lote) cada `flush_interval` segundos o al
+    llegar a `batch_size`. Periódicamente compacta las filas más antiguas
+    que `retention_days` en job_run_daily (un agregado por job y día) y las
+    borra, así la tabla se mantiene acotada.
+    """
+
+    INSERT_SQL = text("""
+        INSERT INTO job_runs (job_id, node_id, started_at, finished_at, duration_seconds, status, attempt, output,
+                              cpu_seconds, peak_rss_mb, sql_count, sql_seconds, rows_touched)
+        VALUES (:job_id, :node_id, :started_at, :finished_at, :duration_seconds, :status, :attempt, :output,
+                :cpu_seconds, :peak_rss_mb, :sql_count, :sql_seconds, :rows_touched)
+    """)
+
+    # Suma el lote a job_run_daily (PRIMARY KEY (job_id, day)); SQLite no
+    # admite ON DUPLICATE KEY y usa ON CONFLICT
+    UPSERT_DAILY_SQL = {
+        "mysql": text("""
+            INSERT INTO job_run_daily (job_id, day, runs, failures, total_duration_seconds, max_duration_seconds)
+            VALUES (:job_id, :day, :runs, :failures, :total, :max)
+            ON DUPLICATE KEY UPDATE
+                runs = runs + VALUES(runs),
+                failures = failures + VALUES(failures),
+                total_duration_seconds = total_duration_seconds + VALUES(total_duration_seconds),
+                max_duration_seconds = GREATEST(max_duration_seconds, VALUES(max_duration_seconds))
+        """),
+        "sqlite": text("""
+            INSERT INTO job_run_daily (job_id, day, runs, failures, total_duration_seconds, max_duration_seconds)
+            VALUES (:job_id, :day, :runs, :failures, :total, :max)
+            ON CONFLICT (job_id, day) DO UPDATE SET
+                runs = runs + excluded.runs,
+                failures = failures + excluded.failures,
+                total_duration_seconds = total_duration_seconds + excluded.total_duration_seconds,
+                max_duration_seconds = MAX(max_duration_seconds, excluded.max_duration_seconds)
+        """)
+    }
+
+    def __init__(self, session_factory: Callable, batch_size: int = 100, flush_interval: float = 2.0,
+                 retention_days: int = 30, compact_interval: float = 3600.0, compact_batch_size: int = 5000):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.compact_interval = compact_interval
+        self.compact_batch_size = compact_batch_size
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._written = 0
+        self._dropped = 0
+        self._compacted = 0
+        self._compact_conflicts = 0
+        self._last_flush = None
+        self._next_compact = 0.0
+
+    def start(self):
+        """Arranca el thread de volcado"""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, name="run-history", daemon=True)
+        self._thread.start()
+
+    def record(self, run: Dict[str, Any]):
+        """Añade una ejecución al buffer"""
+        with self._lock:
+            self._buffer.append(run)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Inserta en lote todo lo acumulado"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+
+        db = self.session_factory()
+        try:
+            db.execute(self.INSERT_SQL, batch)
+            db.commit()
+            with self._lock:
+                self._written += len(batch)
+                self._last_flush = datetime.now()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error guardando historial de ejecuciones: {e}")
+            # Reintentar en el siguiente volcado sin crecer sin límite
+            with self._lock:
+                room = max(0, self.batch_size * 10 - len(self._buffer))
+                self._dropped += max(0, len(batch) - room)
+                self._buffer = batch[:room] + self._buffer
+        finally:
+            db.close()
+
+    def compact(self):
+        """
+        Agrega por día y borra, por lotes, las ejecuciones fuera de la retención
+
+        Varios nodos pueden compactar a la vez: en MySQL el lote se lee con
+        SELECT ... FOR UPDATE y, en cualquier motor, el lote solo se agrega si
+        el DELETE borra todas sus filas; si otro proceso se adelantó se deshace
+        la transacción y se vuelve a leer, así ninguna ejecución cuenta dos veces.
+        """
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+
+        while True:
+            db = self.session_factory()
+            try:
+                dialect = db.get_bind().dialect.name
+                rows = db.execute(
+                    text(f"""
+                        SELECT id, job_id, started_at, status, duration_seconds
+                        FROM job_runs
+                        WHERE started_at < :cutoff
+                        ORDER BY id
+                        LIMIT :limit
+                        {"FOR UPDATE" if dialect == "mysql" else ""}
+                    """),
+                    {"cutoff": cutoff, "limit": self.compact_batch_size}
+                ).fetchall()
+                if not rows:
+                    db.rollback()
+                    return
+
+                # Borrado primero: toma el bloqueo de escritura y confirma que el lote es nuestro
+                deleted = db.execute(
+                    text("DELETE FROM job_runs WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                    {"ids": [r[0] for r in rows]}
+                )
+                if deleted.rowcount != len(rows):
+                    db.rollback()
+                    with self._lock:
+                        self._compact_conflicts += 1
+                    continue
+
+                # Agregar el lote en memoria por (job_id, día)
+                daily: Dict[tuple, Dict[str, Any]] = {}
+                for _, job_id, started_at, status, duration in rows:
+                    key = (job_id, as_datetime(started_at).date())
+                    agg = daily.setdefault(key, {"runs": 0, "failures": 0, "total": 0.0, "max": 0.0})
+                    agg["runs"] += 1
+                    agg["failures"] += 1 if status == "failed" else 0
+                    agg["total"] += duration or 0
+                    agg["max"] = max(agg["max"], duration or 0)
+
+                # Un upsert por lote sobre la clave (job_id, day), en la misma transacción que el borrado
+                db.execute(
+                    self.UPSERT_DAILY_SQL.get(dialect, self.UPSERT_DAILY_SQL["mysql"]),
+                    [
+                        {
+                            "job_id": job_id, "day": day, "runs": agg["runs"], "failures": agg["failures"],
+                            "total": agg["total"], "max": agg["max"]
+                        }
+                        for (job_id, day), agg in daily.items()
+                    ]
+                )
+                db.commit()
+                with self._lock:
+                    self._compacted += len(rows)
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Error compactando historial de ejecuciones: {e}")
+                return
+            finally:
+                db.close()
+
+            if len(rows) < self.compact_batch_size:
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del escritor"""
+        with self._lock:
+            return {
+                "buffered": len(self._buffer),
+                "written": self._written,
+                "dropped": self._dropped,
+                "compacted": self._compacted,
+                "compact_conflicts": self._compact_conflicts,
+                "last_flush": self._last_flush.isoformat() if self._last_flush else None,
+                "retention_days": self.retention_days
+            }
+
+    def _loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if time.monotonic() >= self._next_compact:
+                self._next_compact = time.monotonic() + self.compact_interval
+                self.compact()
@@ -0,0 +1,63 @@
+# modules/scheduler/partitions.py
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import threading
+
+
+class PartitionProgress:
+    """Progreso, partición a partición, de una ejecución de un PartitionedJob"""
+
+    def __init__(self, job_id: str, total: int):
+        self.job_id = job_id
+        self.total = total
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._partitions: List[Dict[str, Any]] = [
+            {"index": i, "status": "pending", "duration_seconds": None, "error": None} for i in range(total)
+        ]
+
+    def start(self, index: int):
+        with self._lock:
+            self._partitions[index]["status"] = "running"
+
+    def finish(self, index: int, result: Dict[str, Any]):
+        with self._lock:
+            partition = self._partitions[index]
+            partition["status"] = result.get("status", "failed")
+            partition["duration_seconds"] = result.get("duration_seconds")
+            partition["error"] = result.get("error")
+
+    def close(self):
+        """Marca el fin de la ejecución; las particiones que no llegaron a correr quedan como skipped"""
+        with self._lock:
+            self.finished_at = datetime.now()
+            for partition in self._partitions:
+                if partition["status"] in ("pending", "running"):
+                    partition["status"] = "skipped"
+
+    def summary(self) -> Dict[str, Any]:
+        """Contadores por estado (para eventos SSE)"""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for partition in self._partitions:
+                counts[partition["status"]] = counts.get(partition["status"], 0) + 1
+            return {
+                "job_id": self.job_id,
+                "total": self.total,
+                "done": counts.get("success", 0),
+                "failed": counts.get("failed", 0),
+                "running": counts.get("running", 0),
+                "finished": self.finished_at is not None
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumen y detalle de cada partición para la API"""
+        summary = self.summary()
+        with self._lock:
+            return {
+                **summary,
+                "started_at": self.started_at.isoformat(),
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "partitions": [dict(p) for p in self._partitions]
+            }
@@ -0,0 +1,115 @@
+# modules/scheduler/policies.py
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import random
+import threading
+import time
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Política de reintentos de un job fallido
+
+    max_attempts cuenta todos los intentos (el primero incluido). El retraso
+    crece exponencialmente desde backoff_seconds hasta max_backoff_seconds y
+    se dispersa ±jitter para que los fallos simultáneos no reintenten a la vez.
+    """
+    max_attempts: int = 3
+    backoff_seconds: float = 30.0
+    max_backoff_seconds: float = 3600.0
+    jitter: float = 0.2
+
+    def should_retry(self, attempt: int) -> bool:
+        return attempt < self.max_attempts
+
+    def delay_for(self, attempt: int) -> float:
+        """Segundos de espera antes del intento attempt + 1"""
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * (2 ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+@dataclass(frozen=True)
+class MisfirePolicy:
+    """
+    Qué hacer con las ejecuciones programadas que se perdieron (caída, reinicio)
+
+    Una ejecución se considera perdida si vence hace más de grace_seconds:
+    - "skip": se descartan y el job espera a su próxima ocurrencia futura
+    - "coalesce": se ejecuta una sola vez y se reprograma desde ahora
+    - "backfill": se ejecuta una vez por cada ocurrencia perdida, en orden,
+      conservando como mucho las max_backfill_runs más recientes
+    """
+    mode: str = "coalesce"
+    grace_seconds: float = 60.0
+    max_backfill_runs: int = 100
+
+    MODES = ("skip", "coalesce", "backfill")
+
+    def __post_init__(self):
+        if self.mode not in self.MODES:
+            raise ValueError(f"mode debe ser uno de {self.MODES}")
+
+    def is_misfire(self, scheduled_for, now) -> bool:
+        return (now - scheduled_for).total_seconds() > self.grace_seconds
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Límite de ejecuciones de un job: `rate_per_minute` sostenido con ráfagas de hasta `burst`"""
+    rate_per_minute: float
+    burst: int = 1
+
+    def __post_init__(self):
+        if self.rate_per_minute <= 0:
+            raise ValueError("rate_per_minute debe ser mayor que 0")
+
+
+@dataclass(frozen=True)
+class FairShare:
+    """
+    Prioridad y reparto de capacidad de un job en la cola del executor
+
+    Las clases de prioridad se atienden en orden estricto ("high" antes que
+    "normal" y "normal" antes que "low"). Dentro de una clase, los grupos se
+    reparten los workers en proporción a su weight según el tiempo de
+    ejecución que consumen; los jobs sin group forman un grupo propio.
+    """
+    priority: str = "normal"
+    group: Optional[str] = None
+    weight: float = 1.0
+
+    PRIORITIES = ("high", "normal", "low")
+
+    def __post_init__(self):
+        if self.priority not in self.PRIORITIES:
+            raise ValueError(f"priority debe ser uno de {self.PRIORITIES}")
+        if self.weight <= 0:
+            raise ValueError("weight debe ser mayor que 0")
+
+
+class TokenBucket:
+    """Token bucket thread-safe para aplicar un RateLimit"""
+
+    def __init__(self, limit: RateLimit):
+        self.rate = limit.rate_per_minute / 60.0
+        self.capacity = float(max(1, limit.burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> Tuple[bool, float]:
+        """
+        Intenta consumir un token
+
+        Returns:
+            (acquired, wait_seconds) con los segundos hasta el próximo token si no hay
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True, 0.0
+            return False, (1 - self._tokens) / self.rate
@@ -0,0 +1,253 @@
+# modules/scheduler/process_pool.py
+from typing import Any, Dict, List, Optional, Tuple
+import importlib
+import multiprocessing
+import threading
+import time
+
+from .accounting import ResourceMeter, current_rss_mb, install_sql_listeners
+
+# Prefijo del nombre de los procesos worker (multiprocessing lo fija antes de
+# importar nada en el hijo, así que se puede consultar al importar módulos)
+WORKER_NAME_PREFIX = "job-process-worker"
+
+
+def is_worker_process() -> bool:
+    """
+    True si el proceso actual es un worker del ProcessJobPool
+
+    Con spawn y forkserver el hijo vuelve a importar el script principal como
+    __mp_main__ (con `python app.py`, la aplicación entera): lo que se monte
+    al importar debe consultar esto para no arrancar otro scheduler en cada
+    worker.
+    """
+    return multiprocessing.current_process().name.startswith(WORKER_NAME_PREFIX)
+
+
+def _worker_main(conn, preload: List[Tuple[str, str]]):
+    """
+    Loop de un proceso worker: recibe (módulo, clase, config_json, partición,
+    instancia) y
+    devuelve (resultado, memoria residente en MB). El resultado es el de run(),
+    o el de run_partition() si hay partición, con los recursos consumidos en
+    "resources".
+
+    Al arrancar instancia los jobs de `preload` e importa database, que abre la
+    primera conexión del pool: la primera ejecución ya no paga esos imports.
+    """
+    jobs = {}
+    for job_module, job_class in preload:
+        try:
+            jobs[(job_module, job_class)] = getattr(importlib.import_module(job_module), job_class)()
+        except Exception as e:
+            print(f"⚠️  Worker: no se pudo precargar {job_module}.{job_class}: {e}")
+
+    from database import SessionLocal
+    install_sql_listeners()
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        job_module, job_class, config_json, partition, instance_id = task
+        try:
+            key = (job_module, job_class)
+            if key not in jobs:
+                jobs[key] = getattr(importlib.import_module(job_module), job_class)()
+            db = SessionLocal()
+            try:
+                # El worker ejecuta un job cada vez: su pico de memoria es el de esta ejecución
+                with ResourceMeter().track(memory=True) as meter:
+                    if partition is None:
+                        result = jobs[key].run(config_json, db, instance_id=instance_id)
+                    else:
+                        result = jobs[key].run_partition(config_json, partition, db)
+                result["resources"] = meter.to_dict()
+            finally:
+                db.close()
+        except Exception as e:
+            result = {"status": "failed", "error": f"Error en proceso worker: {e}"}
+        conn.send((result, current_rss_mb()))
+
+
+class _Worker:
+    """Proceso worker con su extremo de Pipe"""
+
+    def __init__(self, ctx, preload: List[Tuple[str, str]], name: str):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, preload), name=name, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+        self.rss_mb: Optional[float] = None
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        """Mata el proceso sin esperar (job colgado o cancelado)"""
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class ProcessJobPool:
+    """
+    Pool de procesos worker de larga vida para jobs CPU-bound.
+
+    Cada job se ejecuta en un proceso aparte (sin competir por el GIL con
+    uvicorn); el thread que llama a run() se bloquea esperando el resultado,
+    así que el estado se sigue guardando desde el executor como siempre.
+
+    start() arranca los workers por adelantado con los jobs registrados ya
+    importados. Donde existe, se usa "forkserver": un proceso servidor importa
+    una vez SQLAlchemy, pymysql, croniter y los módulos de los jobs, y cada
+    worker es un fork suyo, así que levantar o reciclar uno cuesta
+    milisegundos. Un worker se recicla tras `max_runs_per_worker` ejecuciones
+    o si su memoria residente supera `max_rss_mb`, y se sustituye enseguida
+    por otro ya precargado.
+    """
+
+    # Cada cuánto se comprueba timeout/cancelación mientras se espera el resultado
+    POLL_INTERVAL = 0.2
+    # Módulos que importa el servidor de forkserver, además de los de los jobs.
+    # database no: abre conexiones al importarse y no se pueden compartir entre forks
+    PRELOAD_MODULES = ["sqlalchemy", "sqlalchemy.orm", "pymysql", "croniter", "modules.jobs.base_job"]
+
+    def __init__(self, max_workers: int = 2, max_runs_per_worker: Optional[int] = None,
+                 max_rss_mb: Optional[float] = None):
+        self.max_workers = max_workers
+        self.max_runs_per_worker = max_runs_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._ctx = multiprocessing.get_context(self.start_method)
+        self._preload: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_workers)
+        self._idle: List[_Worker] = []
+        self._busy = 0
+        self._killed = 0
+        self._spawned = 0
+        self._recycled = 0
+
+    def start(self, preload: List[Tuple[str, str]], prestart: bool = True):
+        """
+        Fija los jobs (módulo, clase) que precarga cada worker y, con `prestart`,
+        arranca ya los max_workers procesos
+        """
+        self._preload = list(preload)
+        if self.start_method == "forkserver":
+            modules = self.PRELOAD_MODULES + sorted({job_module for job_module, _ in self._preload})
+            self._ctx.set_forkserver_preload(modules)
+        if not prestart:
+            return
+        workers = [self._spawn() for _ in range(self.max_workers)]
+        with self._lock:
+            self._idle.extend(workers)
+
+    def run(self, job_module: str, job_class: str, config_json: str,
+            timeout: Optional[float] = None, cancel_token=None,
+            partition: Optional[Dict[str, Any]] = None,
+            instance_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Ejecuta BaseJob.run() de la clase indicada en un proceso worker
+        (o PartitionedJob.run_partition() si se indica `partition`)
+
+        Si vence `timeout` o se cancela `cancel_token`, el proceso se mata
+        (hard kill) y se sustituye por uno nuevo en la siguiente ejecución.
+        `instance_id` es la instancia programada, para su checkpoint.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+
+        with self._slots:
+            worker = self._acquire()
+            try:
+                worker.conn.send((job_module, job_class, config_json, partition, instance_id))
+                while not worker.conn.poll(self.POLL_INTERVAL):
+                    reason = None
+                    if cancel_token is not None and cancel_token.cancelled:
+                        reason = f"Ejecución cancelada: {cancel_token.reason}"
+                    elif deadline is not None and time.monotonic() >= deadline:
+                        reason = f"Timeout: superados {timeout}s, proceso worker terminado"
+                    if reason:
+                        worker.kill()
+                        worker = None
+                        with self._lock:
+                            self._killed += 1
+                        return {"status": "failed", "error": reason}
+                result, worker.rss_mb = worker.conn.recv()
+                worker.runs += 1
+            except (EOFError, OSError) as e:
+                worker.stop()
+                worker = None
+                return {"status": "failed", "error": f"El proceso worker terminó inesperadamente: {e}"}
+            finally:
+                self._release(worker)
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del pool de procesos"""
+        with self._lock:
+            return {
+                "start_method": self.start_method,
+                "max_workers": self.max_workers,
+                "busy_workers": self._busy,
+                "idle_workers": len(self._idle),
+                "spawned_workers": self._spawned,
+                "recycled_workers": self._recycled,
+                "killed_workers": self._killed,
+                "max_runs_per_worker": self.max_runs_per_worker,
+                "max_rss_mb": self.max_rss_mb
+            }
+
+    def shutdown(self):
+        """Detiene todos los procesos ociosos"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            self._spawned += 1
+            name = f"{WORKER_NAME_PREFIX}-{self._spawned}"
+        return _Worker(self._ctx, self._preload, name)
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            self._busy += 1
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+        return self._spawn()
+
+    def _release(self, worker: Optional[_Worker]):
+        if worker is not None and self._should_recycle(worker):
+            # Se para en segundo plano y su sustituto se precarga mientras espera en idle
+            threading.Thread(target=worker.stop, name="process-worker-recycle", daemon=True).start()
+            worker = self._spawn()
+            with self._lock:
+                self._recycled += 1
+        with self._lock:
+            self._busy -= 1
+            if worker is not None and worker.is_alive():
+                self._idle.append(worker)
+
+    def _should_recycle(self, worker: _Worker) -> bool:
+        if self.max_runs_per_worker and worker.runs >= self.max_runs_per_worker:
+            return True
+        return bool(self.max_rss_mb and worker.rss_mb and worker.rss_mb > self.max_rss_mb)
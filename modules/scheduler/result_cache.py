@@ -0,0 +1,89 @@
+# modules/scheduler/result_cache.py
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+
+def config_hash(config_json: Optional[str]) -> Optional[str]:
+    """
+    Hash canónico de una configuración JSON (claves ordenadas, sin espacios)
+
+    Returns:
+        None si la configuración no es JSON válido (no se cachea)
+    """
+    try:
+        config = json.loads(config_json) if config_json else {}
+    except (TypeError, ValueError):
+        return None
+    canonical = json.dumps(config, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché LRU de resultados de jobs, con TTL por entrada.
+
+    La clave es (job_id, hash de la configuración). Al superar `max_entries`
+    se expulsa la entrada usada hace más tiempo; las caducadas se descartan
+    al consultarlas.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    def get(self, job_id: str, config_key: str) -> Optional[Dict[str, Any]]:
+        """Resultado vigente para (job_id, config_key) o None"""
+        key = (job_id, config_key)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] <= time.monotonic():
+                del self._entries[key]
+                self._expired += 1
+                item = None
+            if item is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return item[1]
+
+    def put(self, job_id: str, config_key: str, result: Dict[str, Any], ttl_seconds: float):
+        """Guarda un resultado durante ttl_seconds"""
+        key = (job_id, config_key)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, job_id: str) -> int:
+        """Elimina todas las entradas de un job; devuelve cuántas había"""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == job_id]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas de la caché"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expired": self._expired
+            }
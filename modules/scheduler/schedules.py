@@ -0,0 +1,152 @@
+# modules/scheduler/schedules.py
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import threading
+import zlib
+from croniter import croniter
+
+
+class CronSchedule:
+    """
+    Expresión cron compilada con ventanas de ocurrencias precalculadas.
+
+    Las ocurrencias de un cron son absolutas, así que todos los jobs que
+    comparten expresión comparten las ventanas: calcular la siguiente
+    ejecución es una búsqueda binaria mientras la fecha caiga dentro de una.
+    Se guardan varias ventanas para que consultas intercaladas en zonas
+    distintas (jobs con next_run atrasado, recuperaciones, el histograma)
+    no se expulsen entre sí; un recorrido hacia delante sustituye la ventana
+    que va dejando atrás en vez de ocupar una nueva.
+    """
+    
+    def __init__(self, expression: str, window_size: int = 64, max_windows: int = 8):
+        if not croniter.is_valid(expression):
+            raise ValueError(f"Expresión cron inválida: {expression}")
+        self.expression = expression
+        self.window_size = window_size
+        self.max_windows = max_windows
+        self._lock = threading.Lock()
+        # Ventanas (anchor, ocurrencias > anchor), la más reciente primero; se
+        # sustituye la tupla entera para poder leerla sin el lock
+        self._windows: Tuple[Tuple[datetime, List[datetime]], ...] = ()
+    
+    def next_after(self, dt: datetime) -> datetime:
+        """Primera ocurrencia estrictamente posterior a dt"""
+        for anchor, occurrences in self._windows:
+            if anchor <= dt < occurrences[-1]:
+                return occurrences[bisect_right(occurrences, dt)]
+        
+        # La ventana empieza unas ocurrencias antes de dt: las consultas cercanas
+        # pero algo anteriores (jobs con next_run similares) también caen dentro
+        cron = croniter(self.expression, dt)
+        anchor = dt
+        for _ in range(self.window_size // 4):
+            anchor = cron.get_prev(datetime)
+        occurrences = self.occurrences(anchor, self.window_size)
+        with self._lock:
+            # Una ventana que termina dentro de la nueva, antes de dt, ya se ha recorrido
+            windows = [w for w in self._windows if not anchor <= w[1][-1] <= dt]
+            self._windows = tuple([(anchor, occurrences)] + windows[:self.max_windows - 1])
+        return occurrences[bisect_right(occurrences, dt)]
+    
+    def occurrences(self, start: datetime, count: int) -> List[datetime]:
+        """Calcula en lote las próximas `count` ocurrencias tras start"""
+        cron = croniter(self.expression, start)
+        return [cron.get_next(datetime) for _ in range(count)]
+
+
+@lru_cache(maxsize=1024)
+def get_cron_schedule(expression: str) -> CronSchedule:
+    """CronSchedule compilado y cacheado (LRU) por expresión"""
+    return CronSchedule(expression)
+
+
+def spread_offset(key: str, spread_seconds: float) -> float:
+    """
+    Desplazamiento determinista en [0, spread_seconds) derivado de key
+
+    Usa crc32 (estable entre procesos, a diferencia de hash()) para que
+    todos los nodos calculen el mismo desplazamiento para el mismo job.
+    """
+    if not spread_seconds:
+        return 0.0
+    return zlib.crc32(key.encode("utf-8")) / 2 ** 32 * spread_seconds
+
+
+def as_datetime(value) -> Optional[datetime]:
+    """
+    Valor de una columna DATETIME leída con text() como datetime
+
+    pymysql ya devuelve datetime; SQLite (sin tipos declarados en la consulta)
+    devuelve la cadena ISO que guardó, que se convierte aquí.
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def calculate_next_run(schedule_type: str, schedule_value: Optional[str], last_run: Optional[datetime],
+                       offset_seconds: float = 0.0) -> Optional[datetime]:
+    """
+    Calcula la próxima ejecución basada en la última
+
+    offset_seconds desplaza la fase del job (ver spread_offset): cada
+    ocurrencia de un cron se retrasa ese tiempo y la primera ejecución de
+    un job relativo (interval, daily, weekly) también, de modo que los
+    siguientes conservan la fase.
+
+    Returns:
+        datetime de la próxima ejecución, None si el job no es programable
+    """
+    if schedule_type == "manual":
+        return None
+    
+    offset = timedelta(seconds=offset_seconds)
+    
+    # Si nunca se ha ejecutado, ejecutar ahora
+    if not last_run:
+        return datetime.now() + offset
+    
+    try:
+        if schedule_type == "interval" and schedule_value:
+            minutes = int(schedule_value)
+            return last_run + timedelta(minutes=minutes)
+        elif schedule_type == "cron" and schedule_value:
+            return get_cron_schedule(schedule_value.strip()).next_after(last_run - offset) + offset
+        elif schedule_type == "daily":
+            return last_run + timedelta(days=1)
+        elif schedule_type == "weekly":
+            return last_run + timedelta(weeks=1)
+    except Exception:
+        pass
+    return None
+
+
+def missed_runs(schedule_type: str, schedule_value: Optional[str], first: datetime,
+                now: datetime, limit: int, offset_seconds: float = 0.0) -> List[datetime]:
+    """
+    Ocurrencias vencidas desde `first` (incluida) hasta `now`
+
+    Returns:
+        Como mucho las `limit` más recientes, en orden cronológico
+    """
+    slots = deque(maxlen=max(1, limit))
+    slot = first
+    while slot is not None and slot <= now:
+        slots.append(slot)
+        slot = calculate_next_run(schedule_type, schedule_value, slot, offset_seconds)
+    return list(slots)
+
+
+def predict_fire_times(schedule_type: str, schedule_value: Optional[str], next_run: Optional[datetime],
+                       until: datetime, offset_seconds: float = 0.0, limit: int = 10000) -> List[datetime]:
+    """Ejecuciones previstas desde next_run hasta until (como mucho `limit`)"""
+    fires = []
+    fire = next_run
+    while fire is not None and fire <= until and len(fires) < limit:
+        fires.append(fire)
+        fire = calculate_next_run(schedule_type, schedule_value, fire, offset_seconds)
+    return fires
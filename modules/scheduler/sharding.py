@@ -0,0 +1,162 @@
+# modules/scheduler/sharding.py
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+import hashlib
+import threading
+import zlib
+
+from sqlalchemy import text
+
+
+def shard_of(job_id: str, num_shards: int) -> int:
+    """
+    Shard fijo de un job o instancia
+
+    CRC-32 es el mismo algoritmo que la función CRC32() de MySQL, así que el
+    valor se puede recalcular en SQL: CRC32(job_id) % num_shards.
+    """
+    return zlib.crc32(job_id.encode("utf-8")) % num_shards
+
+
+def assign_shards(nodes: List[str], num_shards: int) -> Dict[int, str]:
+    """
+    Reparto de shards entre nodos por rendezvous hashing (highest random weight)
+
+    Cada shard va al nodo con mayor hash(nodo, shard): todos los nodos calculan
+    el mismo reparto sin coordinarse y, cuando uno entra o sale, solo cambian
+    de dueño los shards que ganaba (o pasa a ganar) ese nodo.
+    """
+    def weight(node: str, shard: int) -> int:
+        digest = hashlib.blake2b(f"{node}/{shard}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    if not nodes:
+        return {}
+    return {shard: max(nodes, key=lambda node: weight(node, shard)) for shard in range(num_shards)}
+
+
+class ShardCoordinator:
+    """
+    Pertenencia de este proceso al grupo de schedulers y shards que le tocan.
+
+    Cada nodo se anuncia en scheduler_nodes con un heartbeat; los nodos sin
+    heartbeat en `ttl` segundos se consideran caídos. En cada tick se leen los
+    nodos vivos y se recalcula el reparto; si cambian los shards propios se
+    avisa a `on_change`. Durante un rebalanceo dos nodos pueden creerse dueños
+    del mismo shard unos segundos: el lease de _begin_execution evita que un
+    job se ejecute dos veces.
+
+    Si la base de datos no responde se conserva el último reparto conocido
+    (al arrancar, todos los shards: un único nodo se comporta como antes).
+    """
+
+    def __init__(self, session_factory: Callable, node_id: str, num_shards: int = 256,
+                 interval: float = 10.0, ttl: float = 60.0,
+                 on_change: Optional[Callable[[Set[int]], None]] = None):
+        self.session_factory = session_factory
+        self.node_id = node_id
+        self.num_shards = num_shards
+        self.interval = interval
+        self.ttl = ttl
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._nodes: List[str] = [node_id]
+        self._owned: Set[int] = set(range(num_shards))
+        self._rebalances = 0
+        self._errors = 0
+
+    def start(self):
+        """Anuncia el nodo, calcula el reparto inicial y arranca el thread de heartbeats"""
+        if self._thread:
+            return
+        self.beat()
+        self._thread = threading.Thread(target=self._loop, name="shard-coordinator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Abandona el grupo: los demás nodos reparten sus shards en su próximo tick"""
+        self._stop.set()
+        db = self.session_factory()
+        try:
+            db.execute(text("DELETE FROM scheduler_nodes WHERE node_id = :node_id"), {"node_id": self.node_id})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error abandonando el grupo de schedulers: {e}")
+        finally:
+            db.close()
+
+    def beat(self):
+        """Renueva el heartbeat del nodo y recalcula el reparto con los nodos vivos"""
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                text("UPDATE scheduler_nodes SET heartbeat_at = :now WHERE node_id = :node_id"),
+                {"now": now, "node_id": self.node_id}
+            )
+            if result.rowcount == 0:
+                db.execute(
+                    text("""
+                        INSERT INTO scheduler_nodes (node_id, started_at, heartbeat_at)
+                        VALUES (:node_id, :now, :now)
+                    """),
+                    {"now": now, "node_id": self.node_id}
+                )
+            nodes = [
+                row[0] for row in db.execute(
+                    text("SELECT node_id FROM scheduler_nodes WHERE heartbeat_at >= :since"),
+                    {"since": now - timedelta(seconds=self.ttl)}
+                ).fetchall()
+            ]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self._errors += 1
+            print(f"❌ Error actualizando el grupo de schedulers: {e}")
+            return
+        finally:
+            db.close()
+
+        nodes = sorted(set(nodes) | {self.node_id})
+        owned = {shard for shard, node in assign_shards(nodes, self.num_shards).items() if node == self.node_id}
+        with self._lock:
+            changed = owned != self._owned
+            previous_nodes, self._nodes = self._nodes, nodes
+            self._owned = owned
+            if changed:
+                self._rebalances += 1
+
+        if nodes != previous_nodes:
+            print(f"🧩 {len(nodes)} schedulers activos, este nodo tiene {len(owned)}/{self.num_shards} shards")
+        if changed and self.on_change:
+            self.on_change(owned)
+
+    def owns(self, job_id: str) -> bool:
+        """True si el job o instancia cae en un shard de este nodo"""
+        return shard_of(job_id, self.num_shards) in self._owned
+
+    def owned_shards(self) -> Optional[List[int]]:
+        """Shards propios, o None si son todos (no hace falta filtrar)"""
+        with self._lock:
+            if len(self._owned) == self.num_shards:
+                return None
+            return sorted(self._owned)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del reparto"""
+        with self._lock:
+            return {
+                "num_shards": self.num_shards,
+                "nodes": list(self._nodes),
+                "owned_shards": len(self._owned),
+                "rebalances": self._rebalances,
+                "errors": self._errors
+            }
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.beat()
@@ -22,7 +22,9 @@ DROP TABLE IF EXISTS scheduled_jobs;
 
 CREATE TABLE scheduled_jobs (
     id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID único del registro',
-    job_id VARCHAR(100) NOT NULL UNIQUE COMMENT 'ID único del job (snake_case)',
+    job_id VARCHAR(100) NOT NULL UNIQUE COMMENT 'ID único del job o de la instancia (job:nombre)',
+    job_class VARCHAR(100) COMMENT 'Job registrado que ejecuta la instancia',
+    shard SMALLINT COMMENT 'Shard del reparto entre schedulers: CRC32(job_id) % NUM_SHARDS',
     job_name VARCHAR(255) NOT NULL COMMENT 'Nombre legible del job',
     description TEXT COMMENT 'Descripción del job',
     config_json LONGTEXT COMMENT 'Configuración JSON específica del job',
@@ -33,16 +35,186 @@ CREATE TABLE scheduled_jobs (
     next_run DATETIME COMMENT 'Próxima ejecución programada',
     last_status ENUM('success', 'failed', 'running', 'pending') COMMENT 'Estado de la última ejecución',
     last_output TEXT COMMENT 'Salida de la última ejecución (se sobrescribe)',
+    locked_by VARCHAR(255) COMMENT 'Proceso/nodo que tiene reclamado el job',
+    locked_until DATETIME COMMENT 'Expiración del lease de ejecución',
+    retry_attempt INT NOT NULL DEFAULT 0 COMMENT 'Intentos fallidos consecutivos con reintento pendiente',
+    started_at DATETIME COMMENT 'Inicio de la ejecución en curso',
+    heartbeat_at DATETIME COMMENT 'Último heartbeat de la ejecución en curso',
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'Fecha de creación',
     updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Fecha de actualización',
     
     INDEX idx_job_id (job_id),
     INDEX idx_next_run (next_run),
-    INDEX idx_is_active (is_active)
+    INDEX idx_is_active (is_active),
+    INDEX idx_due (is_active, next_run) COMMENT 'Selección de jobs vencidos por rango',
+    INDEX idx_class (job_class, job_id) COMMENT 'Instancias de un job, paginadas por job_id',
+    INDEX idx_shard_due (shard, is_active, next_run) COMMENT 'Jobs vencidos de los shards de un scheduler',
+    INDEX idx_running (last_status, heartbeat_at) COMMENT 'Ejecuciones en curso sin heartbeat reciente (reaper)'
 ) ENGINE=InnoDB 
   DEFAULT CHARSET=utf8mb4 
   COLLATE=utf8mb4_unicode_ci 
-  COMMENT='Jobs programados del sistema';
+  COMMENT='Jobs programados del sistema (una fila por instancia)';
+
+-- ====================================================================
+-- TABLA: job_runs (historial append-only, una fila por ejecución)
+-- ====================================================================
+
+DROP TABLE IF EXISTS job_runs;
+
+CREATE TABLE job_runs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID de la ejecución',
+    job_id VARCHAR(100) NOT NULL COMMENT 'ID del job ejecutado',
+    node_id VARCHAR(255) COMMENT 'Proceso/nodo que lo ejecutó',
+    started_at DATETIME NOT NULL COMMENT 'Inicio de la ejecución',
+    finished_at DATETIME COMMENT 'Fin de la ejecución',
+    duration_seconds DOUBLE COMMENT 'Duración en segundos',
+    status VARCHAR(20) NOT NULL COMMENT 'Estado final',
+    attempt INT NOT NULL DEFAULT 1 COMMENT 'Número de intento (1 = primera ejecución)',
+    output TEXT COMMENT 'Resumen de la salida o del error (truncado)',
+    cpu_seconds DOUBLE COMMENT 'Tiempo de CPU de los threads del job',
+    peak_rss_mb DOUBLE COMMENT 'Pico de memoria de la ejecución en modo process (MB)',
+    sql_count INT COMMENT 'Sentencias SQL ejecutadas',
+    sql_seconds DOUBLE COMMENT 'Tiempo total en sentencias SQL',
+    rows_touched BIGINT COMMENT 'Filas devueltas o modificadas',
+    
+    INDEX idx_job_started (job_id, started_at),
+    INDEX idx_started (started_at)
+) ENGINE=InnoDB 
+  DEFAULT CHARSET=utf8mb4 
+  COLLATE=utf8mb4_unicode_ci 
+  COMMENT='Historial de ejecuciones (retención limitada)';
+
+-- ====================================================================
+-- TABLA: job_run_daily (agregado diario de ejecuciones compactadas)
+-- ====================================================================
+
+DROP TABLE IF EXISTS job_run_daily;
+
+CREATE TABLE job_run_daily (
+    job_id VARCHAR(100) NOT NULL COMMENT 'ID del job',
+    day DATE NOT NULL COMMENT 'Día agregado',
+    runs INT NOT NULL DEFAULT 0 COMMENT 'Número de ejecuciones',
+    failures INT NOT NULL DEFAULT 0 COMMENT 'Ejecuciones fallidas',
+    total_duration_seconds DOUBLE NOT NULL DEFAULT 0 COMMENT 'Suma de duraciones',
+    max_duration_seconds DOUBLE NOT NULL DEFAULT 0 COMMENT 'Duración máxima',
+    
+    PRIMARY KEY (job_id, day)
+) ENGINE=InnoDB 
+  DEFAULT CHARSET=utf8mb4 
+  COLLATE=utf8mb4_unicode_ci 
+  COMMENT='Historial de ejecuciones compactado por día';
+
+-- ====================================================================
+-- TABLA: scheduler_nodes (procesos scheduler vivos, para repartir shards)
+-- ====================================================================
+
+DROP TABLE IF EXISTS scheduler_nodes;
+
+CREATE TABLE scheduler_nodes (
+    node_id VARCHAR(255) NOT NULL PRIMARY KEY COMMENT 'Proceso/nodo scheduler',
+    started_at DATETIME NOT NULL COMMENT 'Alta del nodo',
+    heartbeat_at DATETIME NOT NULL COMMENT 'Último heartbeat del nodo',
+    
+    INDEX idx_heartbeat (heartbeat_at)
+) ENGINE=InnoDB 
+  DEFAULT CHARSET=utf8mb4 
+  COLLATE=utf8mb4_unicode_ci 
+  COMMENT='Schedulers activos; los shards se reparten entre los que tienen heartbeat reciente';
+
+-- ====================================================================
+-- TABLA: job_checkpoints (punto de reanudación de ejecuciones largas)
+-- ====================================================================
+
+DROP TABLE IF EXISTS job_checkpoints;
+
+CREATE TABLE job_checkpoints (
+    job_id VARCHAR(100) NOT NULL PRIMARY KEY COMMENT 'Instancia programada (job o job:instancia)',
+    config_hash CHAR(64) NOT NULL COMMENT 'SHA-256 de la configuración con la que se guardó',
+    state_json LONGTEXT COMMENT 'Estado del checkpoint (cursor, offset...) en JSON',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Primer checkpoint de la ejecución',
+    updated_at DATETIME COMMENT 'Último checkpoint confirmado'
+) ENGINE=InnoDB 
+  DEFAULT CHARSET=utf8mb4 
+  COLLATE=utf8mb4_unicode_ci 
+  COMMENT='Checkpoints de ejecuciones no terminadas; se borran al terminar con éxito';
+
+-- ====================================================================
+-- MIGRACIÓN DESDE LA VERSIÓN INICIAL (sin borrar datos)
+-- ====================================================================
+--
+-- Para una base de datos creada con la versión original de este fichero
+-- (solo scheduled_jobs, sin leases ni historial). Lleva el esquema al
+-- estado actual en un solo paso; ejecutar estas sentencias en lugar de
+-- las DROP/CREATE de arriba.
+--
+-- ALTER TABLE scheduled_jobs
+--     MODIFY COLUMN job_id VARCHAR(100) NOT NULL COMMENT 'ID único del job o de la instancia (job:nombre)',
+--     ADD COLUMN job_class VARCHAR(100) COMMENT 'Job registrado que ejecuta la instancia' AFTER job_id,
+--     ADD COLUMN shard SMALLINT COMMENT 'Shard del reparto entre schedulers: CRC32(job_id) % NUM_SHARDS' AFTER job_class,
+--     ADD COLUMN locked_by VARCHAR(255) COMMENT 'Proceso/nodo que tiene reclamado el job' AFTER last_output,
+--     ADD COLUMN locked_until DATETIME COMMENT 'Expiración del lease de ejecución' AFTER locked_by,
+--     ADD COLUMN retry_attempt INT NOT NULL DEFAULT 0 COMMENT 'Intentos fallidos consecutivos con reintento pendiente' AFTER locked_until,
+--     ADD COLUMN started_at DATETIME COMMENT 'Inicio de la ejecución en curso' AFTER retry_attempt,
+--     ADD COLUMN heartbeat_at DATETIME COMMENT 'Último heartbeat de la ejecución en curso' AFTER started_at,
+--     ADD INDEX idx_due (is_active, next_run) COMMENT 'Selección de jobs vencidos por rango',
+--     ADD INDEX idx_class (job_class, job_id) COMMENT 'Instancias de un job, paginadas por job_id',
+--     ADD INDEX idx_shard_due (shard, is_active, next_run) COMMENT 'Jobs vencidos de los shards de un scheduler',
+--     ADD INDEX idx_running (last_status, heartbeat_at) COMMENT 'Ejecuciones en curso sin heartbeat reciente (reaper)',
+--     COMMENT = 'Jobs programados del sistema (una fila por instancia)';
+--
+-- UPDATE scheduled_jobs
+-- SET job_class = job_id,
+--     shard = CRC32(job_id) % 256
+-- WHERE job_class IS NULL OR shard IS NULL;
+--
+-- CREATE TABLE IF NOT EXISTS job_runs (
+--     id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID de la ejecución',
+--     job_id VARCHAR(100) NOT NULL COMMENT 'ID del job ejecutado',
+--     node_id VARCHAR(255) COMMENT 'Proceso/nodo que lo ejecutó',
+--     started_at DATETIME NOT NULL COMMENT 'Inicio de la ejecución',
+--     finished_at DATETIME COMMENT 'Fin de la ejecución',
+--     duration_seconds DOUBLE COMMENT 'Duración en segundos',
+--     status VARCHAR(20) NOT NULL COMMENT 'Estado final',
+--     attempt INT NOT NULL DEFAULT 1 COMMENT 'Número de intento (1 = primera ejecución)',
+--     output TEXT COMMENT 'Resumen de la salida o del error (truncado)',
+--     cpu_seconds DOUBLE COMMENT 'Tiempo de CPU de los threads del job',
+--     peak_rss_mb DOUBLE COMMENT 'Pico de memoria de la ejecución en modo process (MB)',
+--     sql_count INT COMMENT 'Sentencias SQL ejecutadas',
+--     sql_seconds DOUBLE COMMENT 'Tiempo total en sentencias SQL',
+--     rows_touched BIGINT COMMENT 'Filas devueltas o modificadas',
+--     INDEX idx_job_started (job_id, started_at),
+--     INDEX idx_started (started_at)
+-- ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+--   COMMENT='Historial de ejecuciones (retención limitada)';
+--
+-- CREATE TABLE IF NOT EXISTS job_run_daily (
+--     job_id VARCHAR(100) NOT NULL COMMENT 'ID del job',
+--     day DATE NOT NULL COMMENT 'Día agregado',
+--     runs INT NOT NULL DEFAULT 0 COMMENT 'Número de ejecuciones',
+--     failures INT NOT NULL DEFAULT 0 COMMENT 'Ejecuciones fallidas',
+--     total_duration_seconds DOUBLE NOT NULL DEFAULT 0 COMMENT 'Suma de duraciones',
+--     max_duration_seconds DOUBLE NOT NULL DEFAULT 0 COMMENT 'Duración máxima',
+--     PRIMARY KEY (job_id, day)
+-- ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+--   COMMENT='Historial de ejecuciones compactado por día';
+--
+-- CREATE TABLE IF NOT EXISTS scheduler_nodes (
+--     node_id VARCHAR(255) NOT NULL PRIMARY KEY COMMENT 'Proceso/nodo scheduler',
+--     started_at DATETIME NOT NULL COMMENT 'Alta del nodo',
+--     heartbeat_at DATETIME NOT NULL COMMENT 'Último heartbeat del nodo',
+--     INDEX idx_heartbeat (heartbeat_at)
+-- ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+--   COMMENT='Schedulers activos; los shards se reparten entre los que tienen heartbeat reciente';
+--
+-- CREATE TABLE IF NOT EXISTS job_checkpoints (
+--     job_id VARCHAR(100) NOT NULL PRIMARY KEY COMMENT 'Instancia programada (job o job:instancia)',
+--     config_hash CHAR(64) NOT NULL COMMENT 'SHA-256 de la configuración con la que se guardó',
+--     state_json LONGTEXT COMMENT 'Estado del checkpoint (cursor, offset...) en JSON',
+--     created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Primer checkpoint de la ejecución',
+--     updated_at DATETIME COMMENT 'Último checkpoint confirmado'
+-- ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+--   COMMENT='Checkpoints de ejecuciones no terminadas; se borran al terminar con éxito';
+--
 
 -- ====================================================================
 -- DATOS DE EJEMPLO
@@ -50,6 +222,7 @@ CREATE TABLE scheduled_jobs (
 
 INSERT INTO scheduled_jobs (
     job_id, 
+    job_class,
     job_name, 
     description, 
     config_json,
@@ -57,6 +230,7 @@ INSERT INTO scheduled_jobs (
     schedule_value,
     is_active
 ) VALUES (
+    'example_job',
     'example_job',
     'Job de Ejemplo',
     'Un job de demostración que procesa datos según la configuración',
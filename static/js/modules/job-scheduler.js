@@ -8,13 +8,20 @@ class JobSchedulerModule extends BaseModule {
             color: 'linear-gradient(135deg, #ff9a9e 0%, #fecfef 100%)',
             endpoint: '/api/job-scheduler',
             description: 'Gestión y programación de scripts automáticos',
-            size: 'large',
-            refreshInterval: 10000 // Actualizar cada 30 segundos
+            size: 'large'
         });
         
         this.selectedJob = null;
         this.jobs = [];
         this.scheduledJobs = [];
+        // /scheduled se pagina: `after` de la siguiente página (null si no hay más)
+        this.scheduledNextAfter = null;
+        this.scheduledPageSize = 500;
+        this.eventSource = null;
+        this.partitionProgress = {};
+        // Recarga periódica de respaldo: SSE solo trae los eventos de este proceso
+        this.resyncTimer = null;
+        this.resyncIntervalMs = 60000;
     }
 
     async init(container) {
@@ -23,6 +30,152 @@ class JobSchedulerModule extends BaseModule {
         await this.loadData();
         await this.loadJobs();
         this.render();
+        
+        // Los cambios de estado llegan por SSE, con una recarga de respaldo
+        this.connectEvents();
+    }
+
+    connectEvents() {
+        if (this.eventSource) {
+            this.eventSource.close();
+        }
+        
+        // EventSource se reconecta solo si se corta la conexión
+        this.eventSource = new EventSource(`${this.endpoint}/events`);
+        
+        // Solo llegan los eventos del proceso al que está conectado el stream:
+        // los jobs que ejecutan otros workers o nodos, y los eventos perdidos
+        // mientras estaba desconectado, se ven al recargar la lista al
+        // (re)conectar y cada resyncIntervalMs
+        this.eventSource.addEventListener('open', () => this.resync());
+        clearInterval(this.resyncTimer);
+        this.resyncTimer = setInterval(() => this.resync(), this.resyncIntervalMs);
+        
+        this.eventSource.addEventListener('job_status', (e) => {
+            this.onJobStatus(JSON.parse(e.data));
+        });
+        
+        this.eventSource.addEventListener('job_progress', (e) => {
+            const progress = JSON.parse(e.data);
+            this.partitionProgress[progress.job_id] = progress;
+            if (this.selectedJob?.job_id === progress.job_id) {
+                this.renderPreservingForm();
+            }
+        });
+        
+        this.eventSource.addEventListener('job_config', async () => {
+            await this.loadJobs();
+            this.renderPreservingForm();
+        });
+    }
+
+    async resync() {
+        await this.loadJobs();
+        
+        const scheduled = this.scheduledJobs.find(j => j.job_id === this.selectedJob?.job_id);
+        if (scheduled) {
+            ['last_status', 'last_run', 'next_run'].forEach(key => this.selectedJob[key] = scheduled[key]);
+        }
+        this.renderPreservingForm();
+    }
+
+    async onJobStatus(event) {
+        const fields = ['last_status', 'last_run', 'next_run'].filter(key => key in event);
+        
+        const scheduled = this.scheduledJobs.find(j => j.job_id === event.job_id);
+        if (scheduled) {
+            fields.forEach(key => scheduled[key] = event[key]);
+        }
+        
+        if (this.selectedJob?.job_id === event.job_id) {
+            fields.forEach(key => this.selectedJob[key] = event[key]);
+            
+            // Al terminar, recargar la salida solo del job que se está viendo
+            if (event.last_status !== 'running') {
+                const config = await this.loadJobConfig(event.job_id);
+                if (config) {
+                    this.selectedJob.last_output = config.last_output;
+                }
+            }
+        }
+        
+        this.renderPreservingForm();
+    }
+
+    renderResources(job) {
+        let resources = null;
+        try {
+            resources = job.last_output ? JSON.parse(job.last_output).resources : null;
+        } catch (error) {
+            return '';
+        }
+        const parts = this.formatResources(resources);
+        if (!parts.length) {
+            return '';
+        }
+        
+        return `
+            <div class="status-row">
+                <span>Recursos:</span>
+                <span>${parts.join(' · ')}</span>
+            </div>
+        `;
+    }
+
+    renderPartitionProgress(jobId) {
+        const progress = this.partitionProgress[jobId];
+        if (!progress) {
+            return '';
+        }
+        
+        const percent = progress.total ? Math.round((progress.done + progress.failed) * 100 / progress.total) : 100;
+        return `
+            <div class="status-section">
+                <h3><i class="fas fa-layer-group"></i> Particiones</h3>
+                <div class="status-info">
+                    <div class="status-row">
+                        <span>Progreso:</span>
+                        <span>${progress.done}/${progress.total} (${percent}%)${progress.running ? ` · ${progress.running} en curso` : ''}</span>
+                    </div>
+                    ${progress.failed ? `
+                        <div class="status-row">
+                            <span>Fallidas:</span>
+                            <span class="job-status failed">${progress.failed}</span>
+                        </div>
+                    ` : ''}
+                </div>
+            </div>
+        `;
+    }
+
+    renderPreservingForm() {
+        // Re-renderizar sin perder lo que el usuario está editando
+        const ids = ['job-config-editor', 'schedule-type', 'schedule-value'];
+        const values = {};
+        ids.forEach(id => {
+            const el = document.getElementById(id);
+            if (el) values[id] = el.value;
+        });
+        const isActive = document.getElementById('is-active')?.checked;
+        
+        this.render();
+        
+        Object.entries(values).forEach(([id, value]) => {
+            const el = document.getElementById(id);
+            if (el) el.value = value;
+        });
+        const activeEl = document.getElementById('is-active');
+        if (activeEl && isActive !== undefined) activeEl.checked = isActive;
+    }
+
+    destroy() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+        clearInterval(this.resyncTimer);
+        this.resyncTimer = null;
+        super.destroy();
     }
 
     async loadJobs() {
@@ -30,9 +183,30 @@ class JobSchedulerModule extends BaseModule {
             const response = await fetch(`${this.endpoint}/jobs`);
             this.jobs = await response.json();
             
-            // Cargar jobs programados
-            const scheduledResponse = await fetch(`${this.endpoint}/scheduled`);
-            this.scheduledJobs = await scheduledResponse.json();
+            // Cargar jobs programados: la primera página, o tantas filas como ya se mostraban
+            const limit = Math.max(this.scheduledPageSize, this.scheduledJobs.length);
+            const page = await this.fetchScheduledPage('', limit);
+            this.scheduledJobs = page.jobs;
+            this.scheduledNextAfter = page.next_after;
+        } catch (error) {
+            console.error('Error cargando jobs:', error);
+        }
+    }
+
+    async fetchScheduledPage(after, limit) {
+        const params = new URLSearchParams({ after, limit });
+        const response = await fetch(`${this.endpoint}/scheduled?${params}`);
+        return await response.json();
+    }
+
+    async loadMoreScheduled() {
+        if (!this.scheduledNextAfter) return;
+        
+        try {
+            const page = await this.fetchScheduledPage(this.scheduledNextAfter, this.scheduledPageSize);
+            this.scheduledJobs = this.scheduledJobs.concat(page.jobs);
+            this.scheduledNextAfter = page.next_after;
+            this.renderPreservingForm();
         } catch (error) {
             console.error('Error cargando jobs:', error);
         }
@@ -144,6 +318,18 @@ class JobSchedulerModule extends BaseModule {
                     </div>
                 ` : ''}
                 
+                <!-- Más páginas de jobs programados -->
+                ${this.scheduledNextAfter ? `
+                    <div class="scheduled-jobs-section" style="margin-top: 2rem; text-align: center;">
+                        <p style="margin-bottom: 1rem; color: var(--text-secondary);">
+                            Mostrando los primeros ${this.scheduledJobs.length} jobs programados (por ID)
+                        </p>
+                        <button class="btn" onclick="jobScheduler.loadMoreScheduled()">
+                            <i class="fas fa-chevron-down"></i> Cargar más
+                        </button>
+                    </div>
+                ` : ''}
+                
                 ${this.scheduledJobs.length === 0 ? `
                     <div class="no-scheduled">
                         <i class="fas fa-inbox" style="font-size: 3rem; margin-bottom: 1rem; opacity: 0.5;"></i>
@@ -197,6 +383,11 @@ class JobSchedulerModule extends BaseModule {
                         <p>${job.description}</p>
                     </div>
                     <div class="header-actions">
+                        ${job.last_status === 'running' ? `
+                            <button class="btn" style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);" onclick="jobScheduler.cancelJob()">
+                                <i class="fas fa-stop"></i> Cancelar
+                            </button>
+                        ` : ''}
                         <button class="btn btn-primary" onclick="jobScheduler.executeJob()">
                             <i class="fas fa-play"></i> Ejecutar Ahora
                         </button>
@@ -207,6 +398,8 @@ class JobSchedulerModule extends BaseModule {
                 </div>
                 
                 <div class="job-detail-content">
+                    ${this.renderPartitionProgress(job.job_id)}
+                    
                     <!-- Estado actual -->
                     ${job.last_run ? `
                         <div class="status-section">
@@ -220,6 +413,7 @@ class JobSchedulerModule extends BaseModule {
                                     <span>Fecha:</span>
                                     <span>${this.formatDateTime(job.last_run)}</span>
                                 </div>
+                                ${this.renderResources(job)}
                                 ${job.last_output ? `
                                     <div class="status-output">
                                         <button class="btn-small" onclick="jobScheduler.showLastOutput()">
@@ -332,23 +526,36 @@ class JobSchedulerModule extends BaseModule {
             
             const result = await response.json();
             if (result.status === 'started') {
+                // El estado se actualiza al llegar los eventos SSE
                 this.showNotification('Job iniciado correctamente', 'success');
-                
-                // Recargar estado después de 3 segundos
-                setTimeout(() => {
-                    this.loadJobConfig(this.selectedJob.job_id).then(config => {
-                        if (config) {
-                            this.selectedJob = { ...this.selectedJob, ...config };
-                            this.render();
-                        }
-                    });
-                }, 3000);
+            } else {
+                // p.ej. 503 si la cola de ejecución está llena
+                this.showNotification(result.detail || 'Error ejecutando job', 'error');
             }
         } catch (error) {
             this.showNotification('Error ejecutando job', 'error');
         }
     }
 
+    async cancelJob() {
+        if (!this.selectedJob) return;
+        
+        try {
+            const response = await fetch(`${this.endpoint}/jobs/${this.selectedJob.job_id}/cancel`, {
+                method: 'POST'
+            });
+            
+            const result = await response.json();
+            if (result.status === 'cancelling') {
+                this.showNotification('Cancelación solicitada', 'success');
+            } else {
+                this.showNotification(result.detail || 'No se pudo cancelar el job', 'error');
+            }
+        } catch (error) {
+            this.showNotification('Error cancelando job', 'error');
+        }
+    }
+
     async saveConfig() {
         if (!this.selectedJob) return;
         
@@ -474,14 +681,31 @@ class JobSchedulerModule extends BaseModule {
         }
     }
 
+    formatResources(resources) {
+        const parts = [];
+        if (!resources) {
+            return parts;
+        }
+        // != null descarta tanto null como los campos ausentes (undefined): las
+        // ejecuciones async no miden CPU y solo las de modo process miden memoria
+        if (resources.cpu_seconds != null) parts.push(`CPU ${resources.cpu_seconds}s`);
+        if (resources.peak_rss_mb != null) parts.push(`RSS ${resources.peak_rss_mb} MB`);
+        if (resources.sql_count != null) parts.push(`${resources.sql_count} SQL (${resources.sql_seconds}s)`);
+        if (resources.rows_touched != null) parts.push(`${resources.rows_touched} filas`);
+        return parts;
+    }
+
     showLastOutput() {
         if (!this.selectedJob?.last_output) return;
         
         try {
             const output = JSON.parse(this.selectedJob.last_output);
+            const resources = this.formatResources(output.resources);
             const message = `Última ejecución: ${output.status}\n` +
                            `Fecha: ${output.timestamp}\n` +
-                           `Duración: ${output.duration_seconds}s\n\n` +
+                           `Duración: ${output.duration_seconds}s\n` +
+                           (resources.length ? `Recursos: ${resources.join(' · ')}\n` : '') +
+                           `\n` +
                            (output.summary ? `Salida:\n${output.summary}` : '') +
                            (output.error ? `\nError: ${output.error}` : '');
             
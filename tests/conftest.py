@@ -0,0 +1,120 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Tablas del scheduler en SQLite: mismas columnas que sql/job_scheduler_tables.sql
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE scheduled_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id VARCHAR(100) NOT NULL UNIQUE,
+        job_class VARCHAR(100),
+        shard SMALLINT,
+        job_name VARCHAR(255) NOT NULL,
+        description TEXT,
+        config_json TEXT,
+        schedule_type VARCHAR(20) DEFAULT 'manual',
+        schedule_value VARCHAR(100),
+        is_active BOOLEAN DEFAULT 1,
+        last_run DATETIME,
+        next_run DATETIME,
+        last_status VARCHAR(20),
+        last_output TEXT,
+        locked_by VARCHAR(255),
+        locked_until DATETIME,
+        retry_attempt INT NOT NULL DEFAULT 0,
+        started_at DATETIME,
+        heartbeat_at DATETIME,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE job_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id VARCHAR(100) NOT NULL,
+        node_id VARCHAR(255),
+        started_at DATETIME NOT NULL,
+        finished_at DATETIME,
+        duration_seconds DOUBLE,
+        status VARCHAR(20) NOT NULL,
+        attempt INT NOT NULL DEFAULT 1,
+        output TEXT,
+        cpu_seconds DOUBLE,
+        peak_rss_mb DOUBLE,
+        sql_count INT,
+        sql_seconds DOUBLE,
+        rows_touched BIGINT
+    )
+    """,
+    """
+    CREATE TABLE job_run_daily (
+        job_id VARCHAR(100) NOT NULL,
+        day DATE NOT NULL,
+        runs INT NOT NULL DEFAULT 0,
+        failures INT NOT NULL DEFAULT 0,
+        total_duration_seconds DOUBLE NOT NULL DEFAULT 0,
+        max_duration_seconds DOUBLE NOT NULL DEFAULT 0,
+        PRIMARY KEY (job_id, day)
+    )
+    """,
+    """
+    CREATE TABLE scheduler_nodes (
+        node_id VARCHAR(255) NOT NULL PRIMARY KEY,
+        started_at DATETIME NOT NULL,
+        heartbeat_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE job_checkpoints (
+        job_id VARCHAR(100) NOT NULL PRIMARY KEY,
+        config_hash CHAR(64) NOT NULL,
+        state_json TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME
+    )
+    """
+]
+
+
+def create_schema(engine):
+    """Crea las tablas del scheduler en un engine SQLite vacío"""
+    with engine.begin() as connection:
+        for statement in SQLITE_SCHEMA:
+            connection.execute(text(statement))
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    """
+    SQLite en un fichero temporal con las tablas del scheduler
+
+    database.engine y database.SessionLocal apuntan a él durante el test, así
+    que el código que abre sesiones con `from database import SessionLocal`
+    también lo usa.
+    """
+    import database
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'scheduler.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    create_schema(engine)
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    import database
+    return database.SessionLocal
@@ -0,0 +1,66 @@
+# tests/test_accounting.py
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from modules.scheduler.accounting import ResourceMeter, current_rss_mb, install_sql_listeners, reset_peak_rss
+
+
+def insert_rows(db, prefix, count):
+    db.execute(
+        text("INSERT INTO job_run_daily (job_id, day) VALUES (:job_id, '2024-01-01')"),
+        [{"job_id": f"{prefix}-{i}"} for i in range(count)]
+    )
+
+
+def select_one(session_factory):
+    with session_factory() as db:
+        db.execute(text("SELECT 1"))
+
+
+def test_meter_counts_only_sql_of_its_own_block(session_factory):
+    install_sql_listeners()
+    meter = ResourceMeter()
+    db = session_factory()
+    try:
+        insert_rows(db, "antes", 2)
+        with meter.track():
+            insert_rows(db, "medido", 3)
+            db.execute(text("UPDATE job_run_daily SET runs = 1"))
+            # Otro thread con su propia sesión no se atribuye a este medidor
+            other = threading.Thread(target=select_one, args=(session_factory,))
+            other.start()
+            other.join()
+        db.execute(text("SELECT COUNT(*) FROM job_run_daily"))
+        db.commit()
+    finally:
+        db.close()
+
+    resources = meter.to_dict()
+    assert (resources["sql_count"], resources["rows_touched"]) == (2, 8)
+    assert resources["sql_seconds"] >= 0
+    assert resources["cpu_seconds"] is not None
+
+
+def test_merge_adds_partition_resources():
+    meter = ResourceMeter()
+    meter.merge({"cpu_seconds": 1.5, "peak_rss_mb": 80.0, "sql_count": 2, "sql_seconds": 0.5, "rows_touched": 10})
+    meter.merge({"cpu_seconds": None, "peak_rss_mb": 120.0, "sql_count": 1, "sql_seconds": 0.25, "rows_touched": 0})
+    assert meter.to_dict() == {
+        "cpu_seconds": 1.5, "peak_rss_mb": 120.0, "sql_count": 3, "sql_seconds": 0.75, "rows_touched": 10
+    }
+
+
+def test_peak_memory_is_only_measured_per_run_when_asked():
+    with ResourceMeter().track() as thread_mode:
+        pass
+    assert thread_mode.to_dict()["peak_rss_mb"] is None
+
+    if not reset_peak_rss():
+        pytest.skip("el sistema no permite reiniciar el pico de memoria")
+    before = current_rss_mb()
+    with ResourceMeter().track(memory=True) as process_mode:
+        block = bytearray(64 * 1024 * 1024)
+        del block
+    assert process_mode.peak_rss_mb >= before + 48
@@ -0,0 +1,42 @@
+# tests/test_async_runner.py
+import asyncio
+
+import pytest
+
+from modules.scheduler.async_runner import AsyncJobRunner
+from modules.scheduler.executor import ExecutorFullError
+
+
+def test_jobs_share_the_loop_up_to_max_concurrency():
+    runner = AsyncJobRunner(max_concurrency=2)
+    runner.start()
+    state = {"running": 0, "peak": 0}
+
+    async def io_job(value):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.05)
+        state["running"] -= 1
+        return value * 2
+
+    futures = [runner.submit(io_job, i) for i in range(5)]
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6, 8]
+    assert state["peak"] == 2
+    assert runner.get_stats() == {"max_concurrency": 2, "running": 0, "waiting": 0, "completed": 5}
+
+
+def test_submit_beyond_max_pending_raises_and_errors_do_not_stop_the_loop():
+    runner = AsyncJobRunner(max_pending=1)
+    runner.start()
+
+    async def broken():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("fallo de prueba")
+
+    first = runner.submit(broken)
+    with pytest.raises(ExecutorFullError):
+        runner.submit(broken)
+    # El error se registra y no se propaga: el loop sigue aceptando jobs
+    assert first.result(timeout=5) is None
+    assert runner.submit(asyncio.sleep, 0, "ok").result(timeout=5) == "ok"
+    assert runner.get_stats()["completed"] == 2
@@ -0,0 +1,172 @@
+# tests/test_base_job.py
+import threading
+
+from sqlalchemy import text
+
+from modules.jobs.base_job import BaseJob, CancellationToken, PartitionedJob
+
+
+class LoopJob(BaseJob):
+    """Job que itera comprobando la cancelación; con cancel_at se cancela a sí mismo a mitad"""
+
+    cancel_at = None
+    token = None
+
+    def get_job_id(self):
+        return "loop"
+
+    def get_name(self):
+        return "Loop"
+
+    def get_description(self):
+        return ""
+
+    def validate_config(self, config):
+        if config.get("iterations", 1) < 1:
+            return False, "iterations debe ser positivo"
+        return True, None
+
+    def execute(self, config, db):
+        for i in range(config.get("iterations", 1)):
+            self.check_cancelled()
+            if i == self.cancel_at:
+                self.token.cancel("prueba")
+        return {"output": "fin"}
+
+
+class CheckpointJob(BaseJob):
+    """Procesa items guardando checkpoint tras cada uno; con stop_at devuelve status failed a mitad"""
+
+    processed = []
+    stop_at = None
+
+    def get_job_id(self):
+        return "checkpoint"
+
+    def get_name(self):
+        return "Checkpoint"
+
+    def get_description(self):
+        return ""
+
+    def execute(self, config, db):
+        checkpoint = self.checkpoint()
+        for item in range(checkpoint.get("next", 0), config["items"]):
+            if item == self.stop_at:
+                return {"status": "failed", "error": "origen no disponible"}
+            self.processed.append(item)
+            checkpoint.update(next=item + 1)
+            db.commit()
+        return {"output": "fin"}
+
+
+class SumJob(PartitionedJob):
+    def get_job_id(self):
+        return "sum"
+
+    def get_name(self):
+        return "Sum"
+
+    def get_description(self):
+        return ""
+
+    def get_partitions(self, config):
+        return [{"start": start, "end": start + 10} for start in range(0, config["total"], 10)]
+
+    def execute_partition(self, config, partition, db):
+        if partition["start"] == config.get("fail_at"):
+            raise ValueError("partición rota")
+        return {"total": sum(range(partition["start"], partition["end"]))}
+
+    def reduce(self, config, results):
+        return {"total": sum(result["total"] for result in results)}
+
+
+def test_run_wraps_success_and_errors():
+    job = LoopJob()
+    result = job.run('{"iterations": 3}', None)
+    assert result["status"] == "success"
+    assert result["output"] == "fin"
+
+    invalid = job.run('{"iterations": 0}', None)
+    assert invalid["status"] == "failed"
+    assert "iterations" in invalid["error"]
+
+    broken = job.run("{no es json", None)
+    assert broken["status"] == "failed"
+
+
+def test_cancellation_token_stops_execute():
+    job = LoopJob()
+    job.token = token = CancellationToken()
+    job.cancel_at = 3
+    result = job.run('{"iterations": 10}', None, token)
+    assert result["status"] == "failed"
+    assert "cancelada" in result["error"]
+    assert token.cancelled and token.reason == "prueba"
+
+
+def test_token_callbacks_run_once_even_if_late():
+    token = CancellationToken()
+    calls = []
+    token.add_callback(lambda: calls.append("early"))
+    token.cancel("uno")
+    token.cancel("dos")
+    token.add_callback(lambda: calls.append("late"))
+    assert calls == ["early", "late"]
+    assert token.reason == "uno"
+
+
+def test_cancellation_is_per_thread():
+    job = LoopJob()
+    cancelled = CancellationToken()
+    cancelled.cancel()
+    results = {}
+
+    def run(name, token):
+        results[name] = job.run('{"iterations": 2}', None, token)
+
+    threads = [
+        threading.Thread(target=run, args=("cancelled", cancelled)),
+        threading.Thread(target=run, args=("free", CancellationToken()))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results["cancelled"]["status"] == "failed"
+    assert results["free"]["status"] == "success"
+
+
+def test_partitioned_job_map_reduce():
+    job = SumJob()
+    assert job.run('{"total": 100}', None)["total"] == sum(range(100))
+
+    partition = job.run_partition('{"total": 100, "fail_at": 20}', {"start": 20, "end": 30}, None)
+    assert partition["status"] == "failed"
+    assert "partición rota" in partition["error"]
+    assert job.to_dict()["partitioned"] is True
+
+
+def stored_checkpoint(db):
+    return db.execute(text("SELECT state_json FROM job_checkpoints WHERE job_id = 'checkpoint'")).scalar()
+
+
+def test_failed_status_keeps_checkpoint_and_next_run_resumes(session_factory):
+    job = CheckpointJob()
+    job.processed = []
+    job.stop_at = 3
+    db = session_factory()
+    try:
+        failed = job.run('{"items": 5}', db, instance_id="checkpoint")
+        assert failed["status"] == "failed"
+        assert stored_checkpoint(db) == '{"next": 3}'
+
+        job.stop_at = None
+        resumed = job.run('{"items": 5}', db, instance_id="checkpoint")
+        assert resumed["status"] == "success"
+        assert resumed["resumed_from_checkpoint"] is True
+        assert job.processed == [0, 1, 2, 3, 4]
+        assert stored_checkpoint(db) is None
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+# tests/test_claims.py
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from modules.job_scheduler_module import JobSchedulerModule
+
+
+def insert_due_job(engine, job_id="test", next_run=None):
+    with engine.begin() as connection:
+        connection.execute(
+            text("""
+                INSERT INTO scheduled_jobs (job_id, job_class, shard, job_name, config_json,
+                                            schedule_type, schedule_value, is_active, next_run)
+                VALUES (:job_id, 'test', 0, 'Test', '{}', 'interval', '5', 1, :next_run)
+            """),
+            {"job_id": job_id, "next_run": next_run or datetime.now() - timedelta(seconds=1)}
+        )
+
+
+def test_two_claimers_race_for_one_row_and_one_wins(db_engine):
+    insert_due_job(db_engine)
+    nodes = [JobSchedulerModule(), JobSchedulerModule()]
+    barrier = threading.Barrier(len(nodes))
+    results = {}
+
+    def claim(node):
+        barrier.wait()
+        results[node.node_id] = node._with_session(node._begin_execution, "test", True)
+
+    threads = [threading.Thread(target=claim, args=(node,)) for node in nodes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [node_id for node_id, (claimed, _) in results.items() if claimed]
+    assert len(winners) == 1
+    with db_engine.connect() as connection:
+        owner, status = connection.execute(
+            text("SELECT locked_by, last_status FROM scheduled_jobs WHERE job_id = 'test'")
+        ).fetchone()
+    assert (owner, status) == (winners[0], "running")
+    # SQLite devuelve los DATETIME como cadena: el schedule ya llega convertido
+    for _, schedule in results.values():
+        assert isinstance(schedule[4], datetime)
+
+
+def test_claim_respects_a_live_lease_and_a_future_next_run(db_engine):
+    insert_due_job(db_engine, "test", datetime.now() + timedelta(minutes=5))
+    node = JobSchedulerModule()
+    assert node._with_session(node._begin_execution, "test", True)[0] is False
+    # Una ejecución manual no mira next_run, pero sí el lease
+    assert node._with_session(node._begin_execution, "test", False)[0] is True
+    other = JobSchedulerModule()
+    assert other._with_session(other._begin_execution, "test", False)[0] is False
+
+
+def insert_stale_run(engine, job_id, shard, heartbeat_at):
+    with engine.begin() as connection:
+        connection.execute(
+            text("""
+                INSERT INTO scheduled_jobs (job_id, job_class, shard, job_name, config_json, schedule_type,
+                                            schedule_value, is_active, next_run, last_status, locked_by,
+                                            locked_until, started_at, heartbeat_at)
+                VALUES (:job_id, 'test', :shard, 'Test', '{}', 'interval', '5', 1, :heartbeat_at, 'running',
+                        'nodo-caido', :locked_until, :heartbeat_at, :heartbeat_at)
+            """),
+            {
+                "job_id": job_id, "shard": shard, "heartbeat_at": heartbeat_at,
+                "locked_until": heartbeat_at + timedelta(seconds=JobSchedulerModule.LEASE_SECONDS)
+            }
+        )
+
+
+def statuses(engine):
+    with engine.connect() as connection:
+        return dict(connection.execute(text("SELECT job_id, last_status FROM scheduled_jobs")).fetchall())
+
+
+def test_reaper_recovers_only_stale_runs_of_owned_shards(db_engine):
+    stale = datetime.now() - timedelta(minutes=5)
+    insert_stale_run(db_engine, "test:propio", 1, stale)
+    insert_stale_run(db_engine, "test:ajeno", 2, stale)
+    insert_stale_run(db_engine, "test:vivo", 1, datetime.now())
+    node = JobSchedulerModule()
+    node.shards._owned = {1}
+
+    node._reap_stale_runs()
+    assert statuses(db_engine) == {"test:propio": "failed", "test:ajeno": "running", "test:vivo": "running"}
+    node.run_history.flush()
+    with db_engine.connect() as connection:
+        assert connection.execute(text("SELECT job_id, node_id, status FROM job_runs")).fetchall() == [
+            ("test:propio", "nodo-caido", "failed")
+        ]
+
+
+def test_reaper_runs_on_its_own_interval(db_engine):
+    node = JobSchedulerModule()
+    calls = []
+    node._reap_stale_runs = lambda: calls.append(1)
+    node._load_due_jobs = lambda: None
+    node._refill()
+    node._refill()
+    assert len(calls) == 1
+    node._next_reap = 0.0
+    node._refill()
+    assert len(calls) == 2
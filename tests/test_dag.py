@@ -0,0 +1,30 @@
+# tests/test_dag.py
+import pytest
+
+from modules.scheduler.dag import JobGraph
+
+
+def test_topological_order_and_edges():
+    graph = JobGraph({"extract": (), "transform": ("extract",), "load": ("transform",), "report": ("extract",)})
+    assert graph.order.index("extract") < graph.order.index("transform") < graph.order.index("load")
+    assert sorted(graph.downstream("extract")) == ["report", "transform"]
+    assert graph.upstream("load") == ["transform"]
+    assert ("extract", "report") in graph.edges()
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="circulares"):
+        JobGraph({"a": ("b",), "b": ("c",), "c": ("a",)})
+
+
+def test_unknown_dependencies_are_reported_not_linked():
+    graph = JobGraph({"a": ("missing_job",)})
+    assert graph.missing == {"missing_job"}
+    assert graph.upstream("a") == []
+
+
+def test_critical_path_follows_longest_branch():
+    graph = JobGraph({"start": (), "fast": ("start",), "slow": ("start",), "end": ("fast", "slow")})
+    path, total = graph.critical_path({"start": 1, "fast": 2, "slow": 10, "end": 1})
+    assert path == ["start", "slow", "end"]
+    assert total == 12
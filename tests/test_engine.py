@@ -0,0 +1,133 @@
+# tests/test_engine.py
+from datetime import datetime, timedelta
+import threading
+import time
+
+from modules.scheduler.engine import SchedulerEngine
+
+
+class Recorder:
+    """on_due que anota el orden de disparo y avisa al llegar a `expected`"""
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.fired = []
+        self.done = threading.Event()
+
+    def __call__(self, entry):
+        self.fired.append(entry.job_id)
+        if len(self.fired) >= self.expected:
+            self.done.set()
+
+
+def soon(ms):
+    return datetime.now() + timedelta(milliseconds=ms)
+
+
+def test_fires_in_next_run_order():
+    recorder = Recorder(3)
+    engine = SchedulerEngine(on_due=recorder)
+    engine.start()
+    try:
+        engine.upsert("c", "interval", "1", None, soon(150))
+        engine.upsert("a", "interval", "1", None, soon(50))
+        engine.upsert("b", "interval", "1", None, soon(100))
+        assert recorder.done.wait(2)
+    finally:
+        engine.stop()
+    assert recorder.fired == ["a", "b", "c"]
+
+
+def test_upsert_replaces_previous_entry():
+    recorder = Recorder(2)
+    engine = SchedulerEngine(on_due=recorder)
+    engine.start()
+    try:
+        engine.upsert("moved", "interval", "1", None, soon(30))
+        engine.upsert("other", "interval", "1", None, soon(100))
+        # La entrada antigua queda obsoleta en el heap y no debe dispararse
+        engine.upsert("moved", "interval", "1", None, soon(200))
+        assert recorder.done.wait(2)
+    finally:
+        engine.stop()
+    assert recorder.fired == ["other", "moved"]
+
+
+def test_removed_and_running_jobs_do_not_fire():
+    recorder = Recorder(1)
+    engine = SchedulerEngine(on_due=recorder)
+    engine.upsert("removed", "interval", "1", None, soon(20))
+    engine.upsert("running", "interval", "1", None, soon(20))
+    engine.upsert("due", "interval", "1", None, soon(60))
+    engine.remove("removed")
+    engine.mark_running("running")
+    engine.start()
+    try:
+        assert recorder.done.wait(2)
+        time.sleep(0.1)
+    finally:
+        engine.stop()
+    assert recorder.fired == ["due"]
+
+
+def test_mark_finished_reschedules_and_none_drops():
+    recorder = Recorder(2)
+    engine = SchedulerEngine(on_due=recorder)
+    engine.start()
+    try:
+        engine.upsert("job", "interval", "1", None, soon(10))
+        for _ in range(100):
+            if recorder.fired:
+                break
+            time.sleep(0.01)
+        engine.mark_finished("job", soon(30))
+        assert recorder.done.wait(2)
+        engine.mark_finished("job", None)
+    finally:
+        engine.stop()
+    assert recorder.fired == ["job", "job"]
+    assert engine.get_status()["scheduled_jobs"] == 0
+
+
+def test_defer_keeps_entry_and_fires_later():
+    recorder = Recorder(1)
+    engine = SchedulerEngine(on_due=recorder)
+    engine.upsert("job", "interval", "1", None, soon(-10))
+    engine.defer("job", soon(80))
+    started = time.monotonic()
+    engine.start()
+    try:
+        assert recorder.done.wait(2)
+    finally:
+        engine.stop()
+    assert time.monotonic() - started >= 0.07
+
+
+def test_retain_drops_jobs_of_other_shards():
+    engine = SchedulerEngine(on_due=lambda entry: None)
+    for job_id in ("keep:1", "drop:1", "keep:2"):
+        engine.upsert(job_id, "interval", "1", None, soon(60000))
+    assert engine.retain(lambda job_id: job_id.startswith("keep")) == 1
+    assert engine.get_status()["scheduled_jobs"] == 2
+
+
+def test_refill_runs_on_start_and_on_request():
+    calls = []
+    refilled = threading.Event()
+
+    def refill():
+        calls.append(time.monotonic())
+        if len(calls) >= 2:
+            refilled.set()
+
+    engine = SchedulerEngine(on_due=lambda entry: None, refill=refill, refill_interval=3600)
+    engine.start()
+    try:
+        for _ in range(100):
+            if calls:
+                break
+            time.sleep(0.01)
+        engine.request_refill()
+        assert refilled.wait(2)
+    finally:
+        engine.stop()
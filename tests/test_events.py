@@ -0,0 +1,89 @@
+# tests/test_events.py
+import asyncio
+import json
+import threading
+
+from modules.job_scheduler_module import JobSchedulerModule
+from modules.scheduler.events import EventBroadcaster
+
+
+def test_publish_from_another_thread_reaches_every_subscriber():
+    broadcaster = EventBroadcaster()
+
+    async def receive():
+        queues = [broadcaster.subscribe(), broadcaster.subscribe()]
+        publisher = threading.Thread(target=broadcaster.publish, args=("job_status", {"job_id": "informe"}))
+        publisher.start()
+        events = [await asyncio.wait_for(queue.get(), 2) for queue in queues]
+        publisher.join()
+        return events
+
+    events = asyncio.run(receive())
+    assert [event["job_id"] for event in events] == ["informe", "informe"]
+    assert all(event["type"] == "job_status" and "timestamp" in event for event in events)
+    assert broadcaster.get_stats()["published"] == 1
+
+
+def test_unsubscribed_and_slow_clients_do_not_block_publish():
+    broadcaster = EventBroadcaster(max_queue_size=2)
+
+    async def publish_to_slow_client():
+        slow, gone = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.unsubscribe(gone)
+        for i in range(5):
+            broadcaster.publish("job_progress", {"job_id": "informe", "done": i})
+        await asyncio.sleep(0)
+        return [slow.get_nowait()["done"] for _ in range(slow.qsize())], gone.qsize()
+
+    received, gone_size = asyncio.run(publish_to_slow_client())
+    assert (received, gone_size) == ([0, 1], 0)
+    assert broadcaster.get_stats() == {"subscribers": 1, "published": 5, "dropped": 3}
+
+
+def test_closed_loop_subscriber_is_dropped_on_publish():
+    broadcaster = EventBroadcaster()
+
+    async def subscribe():
+        broadcaster.subscribe()
+
+    asyncio.run(subscribe())
+    broadcaster.publish("job_status", {"job_id": "informe"})
+    assert broadcaster.get_stats()["subscribers"] == 0
+
+
+class DisconnectingRequest:
+    """Request mínima para el endpoint SSE: se desconecta tras `checks` comprobaciones"""
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    async def is_disconnected(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+def test_events_endpoint_streams_published_events(db_engine):
+    node = JobSchedulerModule()
+    node.SSE_KEEPALIVE_SECONDS = 0.05
+    endpoint = next(route.endpoint for route in node.router.routes if route.path.endswith("/events"))
+
+    async def read_stream():
+        response = await endpoint(DisconnectingRequest(checks=2))
+        chunks = response.body_iterator
+        retry = await chunks.__anext__()
+        node.events.publish("job_status", {"job_id": "informe", "last_status": "running"})
+        event = await chunks.__anext__()
+        keepalive = await chunks.__anext__()
+        rest = [chunk async for chunk in chunks]
+        return response.media_type, [retry, event, keepalive], rest
+
+    media_type, chunks, rest = asyncio.run(read_stream())
+    assert media_type == "text/event-stream"
+    assert chunks[0] == "retry: 5000\n\n"
+    header, data = chunks[1].rstrip("\n").split("\n")
+    assert header == "event: job_status"
+    assert json.loads(data[len("data: "):])["last_status"] == "running"
+    assert chunks[2] == ": keepalive\n\n"
+    # Al desconectarse el cliente se cierra el stream y se libera su cola
+    assert rest == []
+    assert node.events.get_stats()["subscribers"] == 0
@@ -0,0 +1,281 @@
+# tests/test_execution.py
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from modules.job_scheduler_module import JobSchedulerModule
+from modules.jobs.base_job import BaseJob, CancellationToken, PartitionedJob
+from modules.scheduler import RateLimit, RetryPolicy
+
+
+class SimpleJob(BaseJob):
+    """Job configurable por atributos de clase para las pruebas del módulo"""
+
+    job_id = "simple"
+    fail = False
+    sleep = 0.0
+    cooperative = True
+    executions = 0
+
+    def get_job_id(self):
+        return self.job_id
+
+    def get_name(self):
+        return self.job_id
+
+    def get_description(self):
+        return ""
+
+    def execute(self, config, db):
+        type(self).executions += 1
+        deadline = time.monotonic() + self.sleep
+        while time.monotonic() < deadline:
+            if self.cooperative:
+                self.check_cancelled()
+            time.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("fallo de prueba")
+        return {"output": config.get("value", "ok")}
+
+
+def make_job(name, **attrs):
+    return type(f"{name.title()}Job", (SimpleJob,), {"job_id": name, "executions": 0, **attrs})()
+
+
+class NapJob(SimpleJob):
+    """Job con `async def execute` que duerme en el event loop"""
+
+    job_id = "nap"
+
+    async def execute(self, config, db):
+        type(self).executions += 1
+        await asyncio.sleep(self.sleep)
+        return {"output": config.get("value", "ok"), "with_session": db is not None}
+
+
+class SquaresJob(PartitionedJob):
+    max_parallel_partitions = 2
+
+    def get_job_id(self):
+        return "squares"
+
+    def get_name(self):
+        return "Squares"
+
+    def get_description(self):
+        return ""
+
+    def get_partitions(self, config):
+        return list(range(config["count"]))
+
+    def execute_partition(self, config, partition, db):
+        if partition == config.get("fail_at"):
+            raise ValueError("partición rota")
+        return {"value": partition * partition}
+
+    def reduce(self, config, results):
+        return {"total": sum(result["value"] for result in results)}
+
+
+@pytest.fixture
+def node(db_engine):
+    node = JobSchedulerModule()
+    node.CANCEL_POLL_SECONDS = 0.02
+    yield node
+    node.partition_executor.shutdown(wait=False)
+
+
+def insert_job(engine, job_id, schedule_type="interval", schedule_value="60"):
+    with engine.begin() as connection:
+        connection.execute(
+            text("""
+                INSERT INTO scheduled_jobs (job_id, job_class, shard, job_name, config_json,
+                                            schedule_type, schedule_value, is_active, next_run)
+                VALUES (:job_id, :job_id, 0, :job_id, '{}', :schedule_type, :schedule_value, 1, :next_run)
+            """),
+            {"job_id": job_id, "schedule_type": schedule_type, "schedule_value": schedule_value,
+             "next_run": datetime.now()}
+        )
+
+
+def job_row(engine, job_id):
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT last_status, retry_attempt, next_run, last_output FROM scheduled_jobs WHERE job_id = :job_id"),
+            {"job_id": job_id}
+        ).fetchone()
+
+
+def test_failed_runs_retry_with_backoff_until_max_attempts(node, db_engine):
+    node.register_job(make_job("flaky", fail=True, retry_policy=RetryPolicy(max_attempts=3, backoff_seconds=10, jitter=0)))
+    insert_job(db_engine, "flaky")
+
+    for attempt, delay in ((1, 10), (2, 20)):
+        before = datetime.now()
+        node._execute_job_sync("flaky", "{}")
+        status, retry_attempt, next_run, _ = job_row(db_engine, "flaky")
+        assert (status, retry_attempt) == ("failed", attempt)
+        assert timedelta(seconds=delay) <= datetime.fromisoformat(next_run) - before < timedelta(seconds=delay + 5)
+
+    # Tercer intento fallido: sin más reintentos, vuelve al schedule normal
+    node._execute_job_sync("flaky", "{}")
+    status, retry_attempt, next_run, _ = job_row(db_engine, "flaky")
+    assert (status, retry_attempt) == ("failed", 0)
+    assert datetime.fromisoformat(next_run) - datetime.now() > timedelta(minutes=59)
+
+
+def test_timeout_cancels_cooperative_job(node):
+    job = make_job("slow", sleep=5.0, timeout_seconds=0.1)
+    result = node._run_in_thread(job, "{}", CancellationToken())
+    assert result["status"] == "failed"
+    assert "timeout" in result["error"]
+    assert node._abandoned_threads == 0
+
+
+def test_unresponsive_job_is_abandoned_after_grace(node):
+    node.CANCEL_GRACE_SECONDS = 0.1
+    job = make_job("stuck", sleep=0.5, cooperative=False)
+    token = CancellationToken()
+    token.cancel("cancelado por el usuario")
+    result = node._run_in_thread(job, "{}", token)
+    assert result["status"] == "failed"
+    assert "abandonada" in result["error"]
+    assert node._abandoned_threads == 1
+    assert node._has_zombies("stuck")
+
+    deadline = time.monotonic() + 5
+    while node._has_zombies("stuck") and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not node._has_zombies("stuck")
+
+
+def lease_owner(engine, job_id):
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT locked_by FROM scheduled_jobs WHERE job_id = :job_id"), {"job_id": job_id}
+        ).scalar()
+
+
+def test_abandoned_thread_keeps_the_lease_until_it_finishes(node, db_engine):
+    node.CANCEL_GRACE_SECONDS = 0.05
+    job = make_job("zombie", sleep=0.5, cooperative=False, timeout_seconds=0.05)
+    node.register_job(job)
+    insert_job(db_engine, "zombie")
+
+    node._execute_job_sync("zombie", "{}")
+    assert job_row(db_engine, "zombie")[0] == "failed"
+    # El thread sigue vivo: conserva el lease, los heartbeats lo renuevan y no se relanza
+    assert lease_owner(db_engine, "zombie") == node.node_id
+    assert "zombie" in node._active_job_ids()
+    assert "zombie" not in node.scheduler._entries
+    node._execute_job_sync("zombie", "{}")
+    assert type(job).executions == 1
+
+    deadline = time.monotonic() + 5
+    while "zombie" not in node.scheduler._entries and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert node._zombies == {}
+    assert lease_owner(db_engine, "zombie") is None
+    assert node.scheduler._entries["zombie"].next_run == datetime.fromisoformat(job_row(db_engine, "zombie")[2])
+
+
+def test_async_job_runs_on_the_event_loop_and_times_out(node, db_engine, monkeypatch):
+    # Sin aiomysql los jobs async se ejecutan sin sesión de BD
+    monkeypatch.setattr("database.AsyncSessionLocal", None)
+    node.async_runner.start()
+    node.register_job(NapJob())
+    insert_job(db_engine, "nap", "manual", None)
+    assert NapJob().is_async
+
+    node.async_runner.submit(node._execute_job_async, "nap", '{"value": 7}').result(timeout=5)
+    status, _, _, output = job_row(db_engine, "nap")
+    assert status == "success"
+    assert (json.loads(output)["summary"], json.loads(output)["with_session"]) == ("7", False)
+
+    node.register_job(type("SlowNapJob", (NapJob,), {"sleep": 5.0, "timeout_seconds": 0.1})())
+    started = time.monotonic()
+    node.async_runner.submit(node._execute_job_async, "nap", "{}").result(timeout=5)
+    assert time.monotonic() - started < 2
+    status, _, _, output = job_row(db_engine, "nap")
+    assert status == "failed"
+    assert "Timeout" in json.loads(output)["error"]
+    assert node.async_runner.get_stats()["running"] == 0
+
+
+def test_partitions_run_in_parallel_and_reduce(node):
+    job = SquaresJob()
+    result = node._run_partitioned(job, "squares", '{"count": 6}', CancellationToken())
+    assert result["status"] == "success"
+    assert result["total"] == sum(i * i for i in range(6))
+    summary = node._partition_progress["squares"].summary()
+    assert (summary["done"], summary["failed"], summary["finished"]) == (6, 0, True)
+
+    failed = node._run_partitioned(job, "squares", '{"count": 6, "fail_at": 4}', CancellationToken())
+    assert failed["status"] == "failed"
+    assert failed["completed_partitions"] == 5
+    assert [f["index"] for f in failed["failed_partitions"]] == [4]
+
+
+def test_downstream_runs_once_all_upstreams_succeed(node, session_factory):
+    for name, upstream in (("extract", ()), ("load", ()), ("report", ("extract", "load"))):
+        node.register_job(make_job(name, depends_on=upstream))
+    submitted = []
+    node._submit_job = lambda job_id, config_json, scheduled=False: submitted.append(job_id)
+
+    db = session_factory()
+    try:
+        node._trigger_downstream(db, "extract")
+        assert submitted == []
+        node._trigger_downstream(db, "load")
+        assert submitted == ["report"]
+        # Vuelve a lanzarse solo cuando todos sus upstream tienen un éxito posterior
+        node._trigger_downstream(db, "load")
+        assert submitted == ["report"]
+        node._trigger_downstream(db, "extract")
+        assert submitted == ["report", "report"]
+    finally:
+        db.close()
+
+
+def test_rate_limited_downstream_is_deferred_in_the_heap(node, db_engine, session_factory):
+    node.register_job(make_job("extract"))
+    node.register_job(make_job("report", depends_on=("extract",), rate_limit=RateLimit(rate_per_minute=1)))
+    insert_job(db_engine, "report", "manual", None)
+    with db_engine.begin() as connection:
+        connection.execute(text("UPDATE scheduled_jobs SET next_run = NULL WHERE job_id = 'report'"))
+    submitted = []
+    node._submit_job = lambda job_id, config_json, scheduled=False: submitted.append(job_id)
+
+    db = session_factory()
+    try:
+        before = datetime.now()
+        node._trigger_downstream(db, "extract")
+        node._trigger_downstream(db, "extract")
+    finally:
+        db.close()
+
+    # Sin token el dependiente no se encola: queda en el heap hasta que haya uno
+    assert submitted == ["report"]
+    assert node._rate_limited == 1
+    next_run = datetime.fromisoformat(job_row(db_engine, "report")[2])
+    assert timedelta(seconds=55) < next_run - before < timedelta(seconds=61)
+    assert node.scheduler._entries["report"].next_run == next_run
+
+
+def test_cached_result_skips_execution_for_same_config(node, db_engine):
+    job = make_job("cached", cache_ttl_seconds=60)
+    node.register_job(job)
+    insert_job(db_engine, "cached", "manual", None)
+
+    node._execute_job_sync("cached", '{"value": 1}')
+    node._execute_job_sync("cached", '{ "value" : 1 }')
+    assert type(job).executions == 1
+    assert json.loads(job_row(db_engine, "cached")[3])["cached"] is True
+
+    node._execute_job_sync("cached", '{"value": 2}')
+    assert type(job).executions == 2
+    assert node.result_cache.get_stats()["hits"] == 1
@@ -0,0 +1,76 @@
+# tests/test_fair_queue.py
+import queue
+import time
+from collections import Counter
+
+import pytest
+
+from modules.scheduler.fair_queue import FairQueue
+from modules.scheduler.policies import FairShare
+
+
+def drain(fair_queue, count, seconds=1.0):
+    """Saca `count` elementos completando cada uno con la duración indicada"""
+    items = []
+    for _ in range(count):
+        item, _, ticket = fair_queue.get()
+        fair_queue.complete(ticket, seconds)
+        items.append(item)
+    return items
+
+
+def test_higher_priority_class_is_served_first():
+    fair_queue = FairQueue(maxsize=10)
+    fair_queue.put_nowait("low", "a", FairShare(priority="low"))
+    fair_queue.put_nowait("normal", "b", FairShare())
+    fair_queue.put_nowait("high", "c", FairShare(priority="high"))
+    assert drain(fair_queue, 3) == ["high", "normal", "low"]
+
+
+def test_groups_share_by_weight():
+    fair_queue = FairQueue(maxsize=1000)
+    for i in range(300):
+        fair_queue.put_nowait(("heavy", i), "heavy", FairShare(weight=2))
+        fair_queue.put_nowait(("light", i), "light", FairShare(weight=1))
+    served = Counter(group for group, _ in drain(fair_queue, 300))
+    # Con la misma duración por ejecución el grupo de weight 2 recibe el doble
+    assert served["heavy"] == pytest.approx(200, abs=3)
+    assert served["light"] == pytest.approx(100, abs=3)
+
+
+def test_long_running_group_does_not_monopolize():
+    fair_queue = FairQueue(maxsize=1000)
+    for i in range(100):
+        fair_queue.put_nowait(("slow", i), "slow", FairShare())
+        fair_queue.put_nowait(("fast", i), "fast", FairShare())
+    served = Counter()
+    for _ in range(60):
+        (group, _), _, ticket = fair_queue.get()
+        fair_queue.complete(ticket, 10.0 if group == "slow" else 1.0)
+        served[group] += 1
+    assert served["fast"] > served["slow"] * 5
+
+
+def test_fifo_within_group():
+    fair_queue = FairQueue(maxsize=10)
+    for i in range(5):
+        fair_queue.put_nowait(i, "group", FairShare())
+    assert drain(fair_queue, 5) == [0, 1, 2, 3, 4]
+
+
+def test_starving_item_is_promoted():
+    fair_queue = FairQueue(maxsize=10, starvation_seconds=0.05)
+    fair_queue.put_nowait("old-low", "a", FairShare(priority="low"))
+    time.sleep(0.1)
+    fair_queue.put_nowait("new-high", "b", FairShare(priority="high"))
+    assert drain(fair_queue, 2) == ["old-low", "new-high"]
+    assert fair_queue.get_stats()["starvation_promotions"] == 1
+
+
+def test_full_queue_rejects():
+    fair_queue = FairQueue(maxsize=2)
+    fair_queue.put_nowait(1, "a", FairShare())
+    fair_queue.put_nowait(2, "a", FairShare())
+    with pytest.raises(queue.Full):
+        fair_queue.put_nowait(3, "b", FairShare())
+    assert fair_queue.get_stats()["depth_by_priority"] == {"high": 0, "normal": 2, "low": 0}
@@ -0,0 +1,89 @@
+# tests/test_history.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from modules.scheduler.history import RunHistoryWriter
+
+
+def record_old_runs(writer, count, job_id="job", days_ago=40):
+    started = datetime.now() - timedelta(days=days_ago)
+    for i in range(count):
+        writer.record({
+            "job_id": job_id, "node_id": "n1", "started_at": started, "finished_at": started,
+            "duration_seconds": float(i), "status": "failed" if i % 2 else "success", "attempt": 1,
+            "output": None, "cpu_seconds": None, "peak_rss_mb": None, "sql_count": None,
+            "sql_seconds": None, "rows_touched": None
+        })
+    writer.flush()
+
+
+def daily_rows(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT job_id, runs, failures, total_duration_seconds, max_duration_seconds FROM job_run_daily")
+        ).fetchall()
+
+
+def count_runs(engine):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT COUNT(*) FROM job_runs")).scalar()
+
+
+def test_compact_aggregates_and_deletes_in_batches(db_engine, session_factory):
+    writer = RunHistoryWriter(session_factory, retention_days=30, compact_batch_size=3)
+    record_old_runs(writer, 7)
+    record_old_runs(writer, 2, days_ago=1)
+    writer.compact()
+
+    assert daily_rows(db_engine) == [("job", 7, 3, 21.0, 6.0)]
+    assert count_runs(db_engine) == 2
+    assert writer.get_stats()["compacted"] == 7
+
+
+class InterleavedSession:
+    """Sesión que, tras leer el lote, deja que otro compactador termine antes de seguir"""
+
+    def __init__(self, session, interleave):
+        self._session = session
+        self._interleave = interleave
+
+    def execute(self, statement, *args, **kwargs):
+        result = self._session.execute(statement, *args, **kwargs)
+        if self._interleave and str(statement).lstrip().startswith("SELECT"):
+            interleave, self._interleave = self._interleave, None
+            frozen = result.freeze()
+            interleave()
+            return frozen()
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def test_concurrent_compactions_do_not_double_count(db_engine, session_factory):
+    other = RunHistoryWriter(session_factory, retention_days=30)
+    record_old_runs(other, 5)
+    pending = [other.compact]
+
+    def interleaved_sessions():
+        return InterleavedSession(session_factory(), pending.pop() if pending else None)
+
+    writer = RunHistoryWriter(interleaved_sessions, retention_days=30)
+    writer.compact()
+
+    assert daily_rows(db_engine) == [("job", 5, 2, 10.0, 4.0)]
+    assert count_runs(db_engine) == 0
+    assert other.get_stats()["compacted"] == 5
+    assert writer.get_stats()["compacted"] == 0
+    assert writer.get_stats()["compact_conflicts"] == 1
+
+
+def test_compact_adds_to_an_existing_day(db_engine, session_factory):
+    writer = RunHistoryWriter(session_factory, retention_days=30)
+    record_old_runs(writer, 2)
+    writer.compact()
+    record_old_runs(writer, 3)
+    writer.compact()
+
+    assert daily_rows(db_engine) == [("job", 5, 2, 4.0, 2.0)]
@@ -0,0 +1,76 @@
+# tests/test_job_data.py
+import pytest
+from sqlalchemy import event, text
+
+from modules.jobs.job_data import BatchWriter, execute_batches, iter_rows, stream_rows
+
+INSERT = "INSERT INTO destino (id, total) VALUES (:id, :total)"
+
+
+@pytest.fixture
+def db(db_engine, session_factory):
+    with db_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE destino (id INTEGER PRIMARY KEY, total INTEGER)"))
+    db = session_factory()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def round_trips(db_engine):
+    """Filas de cada INSERT en destino enviado a la BD (un elemento por viaje)"""
+    calls = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO destino"):
+            calls.append(len(parameters) if executemany else 1)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    yield calls
+    event.remove(db_engine, "before_cursor_execute", record)
+
+
+def totals(db):
+    return db.execute(text("SELECT id, total FROM destino ORDER BY id")).fetchall()
+
+
+def test_stream_rows_yields_chunks_of_chunk_size(db):
+    execute_batches(db, INSERT, [{"id": i, "total": i * 10} for i in range(7)])
+    chunks = list(stream_rows(db, "SELECT id FROM destino WHERE id >= :first ORDER BY id", {"first": 1}, chunk_size=3))
+    assert [[row.id for row in chunk] for chunk in chunks] == [[1, 2, 3], [4, 5, 6]]
+    assert [row.total for row in iter_rows(db, text("SELECT total FROM destino ORDER BY id"), chunk_size=2)] == [
+        i * 10 for i in range(7)
+    ]
+    with pytest.raises(ValueError):
+        next(stream_rows(db, "SELECT id FROM destino", chunk_size=0))
+
+
+def test_execute_batches_sends_one_executemany_per_batch(db, round_trips):
+    rows = [{"id": i, "total": i} for i in range(5)]
+    assert execute_batches(db, INSERT, rows, batch_size=2) == 5
+    assert round_trips == [2, 2, 1]
+    # No hace commit: el job decide cuándo confirmar
+    db.rollback()
+    assert totals(db) == []
+
+
+def test_batch_writer_flushes_full_batches_and_the_rest_on_exit(db, round_trips):
+    with BatchWriter(db, INSERT, batch_size=3) as writer:
+        for i in range(7):
+            writer.add({"id": i, "total": i})
+        assert (writer.written, round_trips) == (6, [3, 3])
+    assert (writer.written, round_trips) == (7, [3, 3, 1])
+    db.commit()
+    assert len(totals(db)) == 7
+
+
+def test_batch_writer_discards_pending_rows_on_error(db, round_trips):
+    with pytest.raises(RuntimeError):
+        with BatchWriter(db, INSERT, batch_size=3, commit_every_batch=True) as writer:
+            for i in range(4):
+                writer.add({"id": i, "total": i})
+            raise RuntimeError("fallo de prueba")
+    assert (writer.written, round_trips) == (3, [3])
+    # El lote completo ya se confirmó con commit_every_batch
+    db.rollback()
+    assert [row.id for row in totals(db)] == [0, 1, 2]
@@ -0,0 +1,71 @@
+# tests/test_metrics.py
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from metrics import Counter, Gauge, Histogram, MetricsRegistry, _Metric
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry()
+    runs = registry.register(Counter("job_runs_total", "Ejecuciones", ["job", "status"]))
+    depth = registry.register(Gauge("queue_depth", "Profundidad de la cola"))
+    latency = registry.register(Histogram("tick_seconds", "Duración del tick", ["phase"], buckets=(0.1, 1.0)))
+    runs.inc(job='informe "diario"', status="success")
+    runs.inc(2, job='informe "diario"', status="success")
+    depth.set(7)
+    latency.observe(0.05, phase="dispatch")
+    latency.observe(0.5, phase="dispatch")
+
+    assert registry.render().splitlines() == [
+        "# HELP job_runs_total Ejecuciones",
+        "# TYPE job_runs_total counter",
+        'job_runs_total{job="informe \\"diario\\"",status="success"} 3',
+        "# HELP queue_depth Profundidad de la cola",
+        "# TYPE queue_depth gauge",
+        "queue_depth 7",
+        "# HELP tick_seconds Duración del tick",
+        "# TYPE tick_seconds histogram",
+        'tick_seconds_bucket{phase="dispatch",le="0.1"} 1',
+        'tick_seconds_bucket{phase="dispatch",le="1.0"} 2',
+        'tick_seconds_bucket{phase="dispatch",le="+Inf"} 2',
+        'tick_seconds_sum{phase="dispatch"} 0.55',
+        'tick_seconds_count{phase="dispatch"} 2',
+    ]
+
+
+def test_collected_values_and_duplicate_registration():
+    registry = MetricsRegistry()
+    pool = Gauge("pool", "Conexiones", ["state"], collect=lambda: [({"state": "checked_out"}, 2)])
+    assert registry.register(pool) is pool
+    assert registry.register(Gauge("pool", "Otra")) is pool
+    broken = registry.register(Gauge("broken", "Falla al calcularse", collect=lambda: 1 / 0))
+    assert 'pool{state="checked_out"} 2' in registry.render()
+    assert broken.render() == ["# HELP broken Falla al calcularse", "# TYPE broken gauge"]
+
+
+def test_metric_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("sin_tipo", "Sin muestras")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # app monta static/ y templates/ con rutas relativas
+    monkeypatch.chdir(ROOT)
+    import app
+    return TestClient(app.app)
+
+
+def test_http_requests_are_labelled_by_route_template(client):
+    for job_id in ("informe", "informe:cliente_42"):
+        assert client.delete(f"/api/job-scheduler/jobs/{job_id}/cache").status_code == 200
+    assert client.get("/no-existe").status_code == 404
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="DELETE",route="/api/job-scheduler/jobs/{job_id}/cache",status="200"} 2' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert "cliente_42" not in body
@@ -0,0 +1,48 @@
+# tests/test_policies.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from modules.scheduler.policies import FairShare, MisfirePolicy, RateLimit, RetryPolicy, TokenBucket
+
+
+def test_retry_policy_attempts_and_backoff():
+    policy = RetryPolicy(max_attempts=3, backoff_seconds=10, max_backoff_seconds=25, jitter=0)
+    assert policy.should_retry(1)
+    assert policy.should_retry(2)
+    assert not policy.should_retry(3)
+    assert [policy.delay_for(attempt) for attempt in (1, 2, 3)] == [10, 20, 25]
+
+
+def test_retry_policy_jitter_stays_in_range():
+    policy = RetryPolicy(backoff_seconds=100, jitter=0.2)
+    delays = [policy.delay_for(1) for _ in range(200)]
+    assert all(80 <= delay <= 120 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_misfire_policy():
+    now = datetime(2024, 1, 1, 12, 0)
+    policy = MisfirePolicy(mode="skip", grace_seconds=60)
+    assert not policy.is_misfire(now - timedelta(seconds=30), now)
+    assert policy.is_misfire(now - timedelta(seconds=90), now)
+    with pytest.raises(ValueError):
+        MisfirePolicy(mode="otro")
+
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket(RateLimit(rate_per_minute=60, burst=2))
+    assert bucket.try_acquire() == (True, 0.0)
+    assert bucket.try_acquire() == (True, 0.0)
+    acquired, wait = bucket.try_acquire()
+    assert not acquired
+    assert 0 < wait <= 1.0
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        RateLimit(rate_per_minute=0)
+    with pytest.raises(ValueError):
+        FairShare(priority="urgent")
+    with pytest.raises(ValueError):
+        FairShare(weight=0)
@@ -0,0 +1,151 @@
+# tests/test_process_pool.py
+import json
+import os
+import subprocess
+import sys
+
+from modules.scheduler.process_pool import ProcessJobPool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Job CPU-bound de prueba: devuelve el pid del proceso que lo ejecuta
+PROCESS_JOB = '''
+import os
+import time
+from modules.jobs.base_job import BaseJob
+
+
+class PidJob(BaseJob):
+    execution_mode = "process"
+
+    def get_job_id(self):
+        return "pid_job"
+
+    def get_name(self):
+        return "Pid Job"
+
+    def get_description(self):
+        return ""
+
+    def execute(self, config, db):
+        time.sleep(config.get("sleep", 0))
+        if config.get("marker"):
+            with open(config["marker"], "w") as marker:
+                marker.write(str(os.getpid()))
+        return {"pid": os.getpid()}
+'''
+
+# Script principal que, como `python app.py`, monta la aplicación al importarse.
+# Los workers lo vuelven a importar como __mp_main__; cada JobSchedulerModule
+# construido o arrancado en cualquier proceso deja su pid en un fichero.
+LAUNCHER = '''
+import json
+import os
+import sys
+import time
+
+sys.path[:0] = [{root!r}, {here!r}]
+os.chdir({root!r})
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+import database
+
+database.engine = create_engine({url!r}, connect_args={{"check_same_thread": False, "timeout": 30}})
+database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=database.engine)
+
+from modules.job_scheduler_module import JobSchedulerModule
+
+def _logged(method, log):
+    def wrapper(self, *args, **kwargs):
+        with open(log, "a") as f:
+            f.write(f"{{os.getpid()}}\\n")
+        return method(self, *args, **kwargs)
+    return wrapper
+
+JobSchedulerModule.__init__ = _logged(JobSchedulerModule.__init__, {constructed!r})
+JobSchedulerModule._start_scheduler = _logged(JobSchedulerModule._start_scheduler, {started!r})
+
+import app
+
+if __name__ == "__main__":
+    from fastapi.testclient import TestClient
+    from pid_job import PidJob
+
+    app.job_scheduler.register_job(PidJob())
+    with TestClient(app.app) as client:
+        response = client.post(
+            "/api/job-scheduler/jobs/pid_job/execute",
+            json={{"job_id": "pid_job", "config_json": json.dumps({{"marker": {marker!r}}})}}
+        )
+        assert response.status_code == 200, response.text
+        deadline = time.monotonic() + 120
+        while not os.path.exists({marker!r}) and time.monotonic() < deadline:
+            time.sleep(0.2)
+        with database.engine.connect() as connection:
+            nodes = connection.execute(text("SELECT COUNT(*) FROM scheduler_nodes")).scalar()
+        print("RESULT " + json.dumps({{"pid": os.getpid(), "nodes": nodes}}))
+'''
+
+
+def write_job_module(path):
+    (path / "pid_job.py").write_text(PROCESS_JOB)
+
+
+def test_pool_runs_job_in_another_process(tmp_path, monkeypatch):
+    write_job_module(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pool = ProcessJobPool(max_workers=1, max_runs_per_worker=2)
+    pool.start([("pid_job", "PidJob")])
+    try:
+        pids = [pool.run("pid_job", "PidJob", "{}")["pid"] for _ in range(3)]
+    finally:
+        pool.shutdown()
+    assert os.getpid() not in pids
+    # Tras 2 ejecuciones el worker se recicla y lo sustituye otro proceso
+    assert pids[0] == pids[1] != pids[2]
+    assert pool.get_stats()["recycled_workers"] == 1
+
+
+def test_pool_timeout_kills_worker(tmp_path, monkeypatch):
+    write_job_module(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pool = ProcessJobPool(max_workers=1)
+    pool.start([("pid_job", "PidJob")])
+    try:
+        result = pool.run("pid_job", "PidJob", '{"sleep": 30}', timeout=0.5)
+        assert result["status"] == "failed"
+        assert "Timeout" in result["error"]
+        assert pool.run("pid_job", "PidJob", "{}")["status"] == "success"
+    finally:
+        pool.shutdown()
+    assert pool.get_stats()["killed_workers"] == 1
+
+
+def test_process_job_does_not_start_a_scheduler_per_worker(tmp_path, db_engine):
+    write_job_module(tmp_path)
+    paths = {name: str(tmp_path / name) for name in ("constructed.log", "started.log", "marker")}
+    launcher = tmp_path / "launcher.py"
+    launcher.write_text(LAUNCHER.format(
+        root=ROOT, here=str(tmp_path), url=str(db_engine.url),
+        constructed=paths["constructed.log"], started=paths["started.log"], marker=paths["marker"]
+    ))
+
+    completed = subprocess.run(
+        [sys.executable, str(launcher)], cwd=str(tmp_path), capture_output=True, text=True, timeout=300
+    )
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    line = next(line for line in completed.stdout.splitlines() if line.startswith("RESULT "))
+    result = json.loads(line[len("RESULT "):])
+
+    with open(paths["marker"]) as marker:
+        job_pid = int(marker.read())
+    with open(paths["constructed.log"]) as log:
+        constructed = log.read().split()
+    with open(paths["started.log"]) as log:
+        started = log.read().split()
+
+    assert job_pid != result["pid"]
+    assert constructed == [str(result["pid"])]
+    assert started == [str(result["pid"])]
+    assert result["nodes"] == 1
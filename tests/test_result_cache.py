@@ -0,0 +1,43 @@
+# tests/test_result_cache.py
+import time
+
+from modules.scheduler.result_cache import ResultCache, config_hash
+
+
+def test_config_hash_is_canonical():
+    assert config_hash('{"a": 1, "b": [1, 2]}') == config_hash('{"b":[1,2],"a":1}')
+    assert config_hash('{"a": 1}') != config_hash('{"a": 2}')
+    assert config_hash("") == config_hash("{}")
+    assert config_hash("no es json") is None
+
+
+def test_hit_miss_and_ttl():
+    cache = ResultCache()
+    key = config_hash("{}")
+    assert cache.get("job", key) is None
+    cache.put("job", key, {"status": "success"}, ttl_seconds=0.05)
+    assert cache.get("job", key) == {"status": "success"}
+    time.sleep(0.06)
+    assert cache.get("job", key) is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 2, 1)
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("job", "a", {"n": 1}, 60)
+    cache.put("job", "b", {"n": 2}, 60)
+    cache.get("job", "a")
+    cache.put("job", "c", {"n": 3}, 60)
+    assert cache.get("job", "b") is None
+    assert cache.get("job", "a") == {"n": 1}
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_invalidate_only_that_job():
+    cache = ResultCache()
+    cache.put("job", "a", {}, 60)
+    cache.put("job", "b", {}, 60)
+    cache.put("other", "a", {}, 60)
+    assert cache.invalidate("job") == 2
+    assert cache.get("other", "a") == {}
@@ -0,0 +1,73 @@
+# tests/test_scheduler_module.py
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from modules.job_scheduler_module import JobSchedulerModule
+
+
+def count_nodes(engine):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT COUNT(*) FROM scheduler_nodes")).scalar()
+
+
+def test_scheduler_starts_with_the_app_not_on_import(db_engine):
+    import app
+
+    scheduler = app.job_scheduler
+    assert not scheduler.scheduler_running
+    assert count_nodes(db_engine) == 0
+
+    with TestClient(app.app) as client:
+        assert scheduler.scheduler_running
+        assert count_nodes(db_engine) == 1
+        assert client.get("/api/job-scheduler/scheduler/status").json()["running"] is True
+
+    assert not scheduler.scheduler_running
+    assert count_nodes(db_engine) == 0
+
+
+def test_fire_histogram_only_scans_jobs_due_in_the_window(db_engine):
+    now = datetime.now().replace(second=0, microsecond=0)
+    with db_engine.begin() as connection:
+        for job_id, next_run in (("test:a", now + timedelta(minutes=1)), ("test:b", now + timedelta(days=2))):
+            connection.execute(
+                text("""
+                    INSERT INTO scheduled_jobs (job_id, job_class, shard, job_name, schedule_type,
+                                                schedule_value, is_active, next_run)
+                    VALUES (:job_id, 'test', 0, 'Test', 'interval', '5', 1, :next_run)
+                """),
+                {"job_id": job_id, "next_run": next_run}
+            )
+    api = FastAPI()
+    api.include_router(JobSchedulerModule().router)
+    client = TestClient(api)
+
+    histogram = client.get("/api/job-scheduler/scheduled/histogram", params={"window_minutes": 30}).json()
+    assert (histogram["jobs"], histogram["fires"], histogram["truncated"]) == (1, 6, False)
+    assert client.get("/api/job-scheduler/scheduled/histogram", params={"window_minutes": 1441}).status_code == 422
+
+
+def test_scheduled_list_pages_by_job_id(db_engine):
+    with db_engine.begin() as connection:
+        for job_id in ("test:c", "test:a", "test:e", "test:b", "test:d"):
+            connection.execute(
+                text("""
+                    INSERT INTO scheduled_jobs (job_id, job_class, shard, job_name, schedule_type,
+                                                schedule_value, is_active)
+                    VALUES (:job_id, 'test', 0, 'Test', 'manual', NULL, :is_active)
+                """),
+                {"job_id": job_id, "is_active": job_id != "test:b"}
+            )
+    api = FastAPI()
+    api.include_router(JobSchedulerModule().router)
+    client = TestClient(api)
+
+    pages, after = [], ""
+    while after is not None:
+        page = client.get("/api/job-scheduler/scheduled", params={"after": after, "limit": 2}).json()
+        pages.append([job["job_id"] for job in page["jobs"]])
+        after = page["next_after"]
+    assert pages == [["test:a", "test:b"], ["test:c", "test:d"], ["test:e"]]
@@ -0,0 +1,81 @@
+# tests/test_schedules.py
+from datetime import datetime, timedelta
+
+from croniter import croniter
+
+from modules.scheduler.schedules import (
+    CronSchedule, calculate_next_run, get_cron_schedule, missed_runs, predict_fire_times, spread_offset
+)
+
+
+def test_cron_matches_croniter():
+    start = datetime(2024, 3, 1, 10, 7, 30)
+    for expression in ("*/5 * * * *", "0 9 * * 1-5", "15 3 * * 0"):
+        dt = start
+        for _ in range(200):
+            expected = croniter(expression, dt).get_next(datetime)
+            assert calculate_next_run("cron", expression, dt) == expected
+            dt = expected
+
+
+def test_cron_window_handles_out_of_order_lookups():
+    schedule = get_cron_schedule("*/10 * * * *")
+    late = datetime(2024, 3, 2, 0, 0)
+    early = datetime(2024, 3, 1, 0, 0)
+    assert schedule.next_after(late) == datetime(2024, 3, 2, 0, 10)
+    assert schedule.next_after(early) == datetime(2024, 3, 1, 0, 10)
+    assert schedule.next_after(late + timedelta(minutes=5)) == datetime(2024, 3, 2, 0, 10)
+
+
+class CountingSchedule(CronSchedule):
+    builds = 0
+
+    def occurrences(self, start, count):
+        self.builds += 1
+        return super().occurrences(start, count)
+
+
+def test_cron_windows_survive_interleaved_lookups_and_sweeps():
+    schedule = CountingSchedule("*/5 * * * *")
+    old, now = datetime(2024, 1, 1, 12, 0), datetime(2024, 3, 1, 12, 0)
+    sweep = now
+    for i in range(300):
+        for dt in (old + timedelta(seconds=37 * i), now - timedelta(seconds=11 * i), sweep):
+            assert schedule.next_after(dt) == croniter("*/5 * * * *", dt).get_next(datetime)
+        sweep = schedule.next_after(sweep)
+    # Una reconstrucción por cada ~48 ocurrencias recorridas, no una por consulta
+    assert schedule.builds < 20
+    assert len(schedule._windows) <= schedule.max_windows
+
+
+def test_relative_schedules():
+    last = datetime(2024, 3, 1, 10, 0)
+    assert calculate_next_run("interval", "15", last) == last + timedelta(minutes=15)
+    assert calculate_next_run("daily", None, last) == last + timedelta(days=1)
+    assert calculate_next_run("weekly", None, last) == last + timedelta(weeks=1)
+    assert calculate_next_run("manual", None, last) is None
+    assert calculate_next_run("cron", "no es cron", last) is None
+
+
+def test_spread_offset_is_stable_and_shifts_cron():
+    offset = spread_offset("informe:cliente_42", 60)
+    assert offset == spread_offset("informe:cliente_42", 60)
+    assert 0 <= offset < 60
+    assert spread_offset("x", 0) == 0.0
+    last = datetime(2024, 3, 1, 10, 0, 30)
+    shifted = calculate_next_run("cron", "* * * * *", last, offset_seconds=45)
+    assert shifted == datetime(2024, 3, 1, 10, 0, 45)
+
+
+def test_missed_runs_keeps_most_recent():
+    first = datetime(2024, 3, 1, 0, 0)
+    now = datetime(2024, 3, 1, 1, 0)
+    slots = missed_runs("interval", "10", first, now, limit=3)
+    assert slots == [datetime(2024, 3, 1, 0, 40), datetime(2024, 3, 1, 0, 50), datetime(2024, 3, 1, 1, 0)]
+
+
+def test_predict_fire_times_until_and_limit():
+    start = datetime(2024, 3, 1, 0, 0)
+    fires = predict_fire_times("cron", "*/15 * * * *", start, start + timedelta(hours=1))
+    assert fires == [start + timedelta(minutes=15 * i) for i in range(5)]
+    assert len(predict_fire_times("interval", "1", start, start + timedelta(days=1), limit=10)) == 10
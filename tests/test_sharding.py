@@ -0,0 +1,77 @@
+# tests/test_sharding.py
+from sqlalchemy import text
+
+from modules.scheduler.sharding import ShardCoordinator, assign_shards, shard_of
+
+
+def test_shard_of_matches_mysql_crc32():
+    # SELECT CRC32('MySQL') devuelve 3259397556 (ejemplo de la documentación de MySQL)
+    assert shard_of("MySQL", 2 ** 32) == 3259397556
+    assert shard_of("MySQL", 256) == 3259397556 % 256
+    assert all(0 <= shard_of(f"job:{i}", 16) < 16 for i in range(1000))
+
+
+def test_assign_shards_covers_every_shard_once():
+    assignment = assign_shards(["a", "b", "c"], 256)
+    assert sorted(assignment) == list(range(256))
+    assert set(assignment.values()) == {"a", "b", "c"}
+    assert assign_shards([], 256) == {}
+
+
+def test_assign_shards_moves_only_the_new_nodes_share():
+    before = assign_shards(["a", "b", "c"], 256)
+    after = assign_shards(["a", "b", "c", "d"], 256)
+    moved = [shard for shard in before if before[shard] != after[shard]]
+    # Solo cambian de dueño los shards que gana el nodo nuevo
+    assert all(after[shard] == "d" for shard in moved)
+    assert 30 < len(moved) < 100
+
+
+def test_single_node_owns_everything(session_factory):
+    coordinator = ShardCoordinator(session_factory, "node-a", num_shards=64)
+    coordinator.beat()
+    assert coordinator.owned_shards() is None
+    assert coordinator.owns("any-job")
+
+
+def test_nodes_split_shards_without_overlap(session_factory):
+    changes = []
+    a = ShardCoordinator(session_factory, "node-a", num_shards=64, on_change=changes.append)
+    b = ShardCoordinator(session_factory, "node-b", num_shards=64)
+    a.beat()
+    b.beat()
+    a.beat()
+
+    owned_a, owned_b = set(a.owned_shards()), set(b.owned_shards())
+    assert owned_a.isdisjoint(owned_b)
+    assert owned_a | owned_b == set(range(64))
+    assert changes and changes[-1] == owned_a
+    for i in range(200):
+        job_id = f"informe:{i}"
+        assert a.owns(job_id) != b.owns(job_id)
+
+
+def test_stopped_node_releases_its_shards(session_factory):
+    a = ShardCoordinator(session_factory, "node-a", num_shards=64)
+    b = ShardCoordinator(session_factory, "node-b", num_shards=64)
+    a.beat()
+    b.beat()
+    b.stop()
+    a.beat()
+    assert a.owned_shards() is None
+    with session_factory() as db:
+        nodes = [row[0] for row in db.execute(text("SELECT node_id FROM scheduler_nodes")).fetchall()]
+    assert nodes == ["node-a"]
+
+
+def test_expired_heartbeat_leaves_the_group(session_factory):
+    a = ShardCoordinator(session_factory, "node-a", num_shards=64, ttl=60)
+    with session_factory() as db:
+        db.execute(text("""
+            INSERT INTO scheduler_nodes (node_id, started_at, heartbeat_at)
+            VALUES ('dead-node', '2000-01-01 00:00:00', '2000-01-01 00:00:00')
+        """))
+        db.commit()
+    a.beat()
+    assert a.owned_shards() is None
+    assert a.get_stats()["nodes"] == ["node-a"]